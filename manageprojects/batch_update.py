@@ -0,0 +1,306 @@
+"""
+    Update many managed projects at once.
+"""
+
+import glob
+import io
+import logging
+import os
+import sys
+import tomllib
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git
+from rich import print
+from rich.table import Table
+
+from manageprojects.cookiecutter_api import get_repo_path
+from manageprojects.cookiecutter_templates import update_managed_project
+from manageprojects.data_classes import BatchUpdateResult, BatchUpdateTask, ManageProjectsMeta
+from manageprojects.utilities.pyproject_toml import PyProjectToml, load_toml
+
+
+logger = logging.getLogger(__name__)
+
+UPDATED = 'updated'
+UP_TO_DATE = 'up to date'
+CONFLICTED = 'conflicted'
+FAILED = 'failed'
+STATUSES = (UPDATED, UP_TO_DATE, CONFLICTED, FAILED)
+STATUS_STYLES = {UPDATED: 'green', UP_TO_DATE: 'cyan', CONFLICTED: 'yellow', FAILED: 'red'}
+
+SKIP_DIR_NAMES = {'__pycache__', 'node_modules'}
+
+
+def is_managed_project(pyproject_toml: Path) -> bool:
+    """
+    Has the given "pyproject.toml" a [manageprojects] table?
+    """
+    try:
+        data = load_toml(pyproject_toml)
+    except (OSError, tomllib.TOMLDecodeError) as err:
+        logger.warning('Skip %s: %s', pyproject_toml, err)
+        return False
+    return 'manageprojects' in data
+
+
+def walk_managed_projects(root: Path) -> Iterable[Path]:
+    """
+    Yield all managed project directories below `root`.
+    Don't descend into found projects, hidden directories and cookiecutter template directories.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        if 'pyproject.toml' in filenames and is_managed_project(Path(dirpath, 'pyproject.toml')):
+            yield Path(dirpath)
+            dirnames[:] = []
+            continue
+        dirnames[:] = sorted(
+            name
+            for name in dirnames
+            if not name.startswith('.') and name not in SKIP_DIR_NAMES and '{{' not in name
+        )
+
+
+def find_managed_projects(sources: Iterable[str]) -> list[Path]:
+    """
+    Collect managed projects from project paths, "pyproject.toml" files, glob patterns or root directories.
+    """
+    projects = {}
+    for source in sources:
+        source = os.path.expanduser(source)
+        if any(char in source for char in '*?['):
+            paths = [Path(path) for path in sorted(glob.glob(source, recursive=True))]
+        else:
+            paths = [Path(source)]
+
+        for path in paths:
+            path = path.resolve()
+            if path.is_file():
+                if path.name == 'pyproject.toml' and is_managed_project(path):
+                    projects[path.parent] = None
+                continue
+            if path.is_dir():
+                for project_path in walk_managed_projects(path):
+                    projects[project_path] = None
+            else:
+                logger.warning('Skip non existing path: %s', path)
+
+    return list(projects)
+
+
+def get_template_base(repo_path: Path, directory: str | None) -> Path:
+    """
+    Remove the cookiecutter directory from the resolved template path.
+
+    >>> get_template_base(Path('/foo/bar/template'), 'template')
+    PosixPath('/foo/bar')
+    >>> get_template_base(Path('/foo/bar'), None)
+    PosixPath('/foo/bar')
+    """
+    if directory:
+        parts = Path(directory).parts
+        assert repo_path.parts[-len(parts) :] == parts, f'{repo_path=} does not end with {directory=}'
+        return Path(*repo_path.parts[: -len(parts)])
+    return repo_path
+
+
+def build_tasks(
+    *,
+    project_paths: Iterable[Path],
+    overwrite: bool,
+    password: str | None,
+    config_file: Path | None,
+    cleanup: bool,
+    builtin_diff: bool,
+    render_cache: bool,
+) -> tuple[list[BatchUpdateTask], list[BatchUpdateResult]]:
+    """
+    Group the projects by template and resolve every template repository only once.
+    Returns the update tasks and the results for projects that fail already here.
+    """
+    groups: dict[str, list[tuple[Path, ManageProjectsMeta]]] = {}
+    failed = []
+    for project_path in project_paths:
+        try:
+            meta = PyProjectToml(project_path=project_path).get_mp_meta()
+            assert meta.cookiecutter_template, f'Missing template in {project_path / "pyproject.toml"}'
+        except Exception as err:  # noqa: BLE001
+            failed.append(BatchUpdateResult(project_path=project_path, status=FAILED, message=str(err)))
+            continue
+        groups.setdefault(meta.cookiecutter_template, []).append((project_path, meta))
+
+    tasks = []
+    for template, projects in groups.items():
+        directory = projects[0][1].cookiecutter_directory
+        print(f'Resolve template {template} for {len(projects)} project(s)...')
+        try:
+            repo_path = get_repo_path(
+                template=template,
+                directory=directory,
+                password=password,
+                config_file=config_file,
+            )
+            git = Git(cwd=repo_path, detect_root=True)
+            if git.status(verbose=False):
+                raise AssertionError(f'Template repository {git.cwd} has uncommitted changes')
+        except (Exception, SystemExit) as err:  # noqa: BLE001
+            for project_path, _meta in projects:
+                failed.append(
+                    BatchUpdateResult(project_path=project_path, status=FAILED, message=f'Template error: {err}')
+                )
+            continue
+
+        template_subdir = get_template_base(repo_path, directory).relative_to(git.cwd)
+        for project_path, _meta in projects:
+            tasks.append(
+                BatchUpdateTask(
+                    project_path=project_path,
+                    template_root=git.cwd,
+                    template_subdir=template_subdir,
+                    overwrite=overwrite,
+                    password=password,
+                    config_file=config_file,
+                    cleanup=cleanup,
+                    builtin_diff=builtin_diff,
+                    render_cache=render_cache,
+                )
+            )
+    return tasks, failed
+
+
+def update_project_task(task: BatchUpdateTask) -> BatchUpdateResult:
+    """
+    Update one project from the already resolved template checkout.
+    The old revision is rendered from a snapshot of the template repository pool,
+    so parallel updates don't interfere.
+    Runs in a worker process: All output is captured and returned in the result.
+    """
+    project_path = task.project_path
+    from_rev = None
+    output = io.StringIO()
+    with redirect_stdout(output), redirect_stderr(output):
+        try:
+            meta = PyProjectToml(project_path=project_path).get_mp_meta()
+            from_rev = meta.get_last_git_hash()
+            rej_files = set(project_path.rglob('*.rej'))
+
+            result = update_managed_project(
+                project_path=project_path,
+                overwrite=task.overwrite,
+                password=task.password,
+                config_file=task.config_file,
+                cleanup=task.cleanup,
+                input=False,
+                builtin_diff=task.builtin_diff,
+                render_cache=task.render_cache,
+                template_path=task.template_root / task.template_subdir,
+            )
+        except SystemExit as err:
+            return BatchUpdateResult(
+                project_path=project_path,
+                status=FAILED,
+                from_rev=from_rev,
+                message=f'Aborted with exit code {err.code}',
+                output=output.getvalue(),
+            )
+        except Exception as err:
+            logger.exception('Update %s failed', project_path)
+            return BatchUpdateResult(
+                project_path=project_path,
+                status=FAILED,
+                from_rev=from_rev,
+                message=f'{type(err).__name__}: {err}',
+                output=output.getvalue(),
+            )
+
+    if not result:
+        return BatchUpdateResult(
+            project_path=project_path, status=UP_TO_DATE, from_rev=from_rev, to_rev=from_rev, output=output.getvalue()
+        )
+
+    if new_rej_files := set(project_path.rglob('*.rej')) - rej_files:
+        status = CONFLICTED
+        message = f'{len(new_rej_files)} file(s) with rejected hunks (*.rej)'
+    else:
+        status = UPDATED
+        message = ''
+    return BatchUpdateResult(
+        project_path=project_path,
+        status=status,
+        from_rev=from_rev,
+        to_rev=result.to_rev,
+        message=message,
+        output=output.getvalue(),
+    )
+
+
+def print_summary(results: list[BatchUpdateResult]) -> None:
+    table = Table(title='Update summary')
+    table.add_column('Project')
+    table.add_column('Status')
+    table.add_column('Revision')
+    table.add_column('Message')
+    for result in results:
+        style = STATUS_STYLES[result.status]
+        if result.to_rev and result.to_rev != result.from_rev:
+            revision = f'{result.from_rev} -> {result.to_rev}'
+        else:
+            revision = result.from_rev or ''
+        table.add_row(str(result.project_path), f'[{style}]{result.status}', revision, result.message)
+    print(table)
+
+    counts = ', '.join(f'{sum(result.status == status for result in results)} {status}' for status in STATUSES)
+    print(f'{len(results)} project(s): {counts}')
+
+
+def update_managed_projects(
+    *,
+    sources: Iterable[str],  # Project paths, glob patterns or root directories
+    jobs: int = 0,  # Number of worker processes, 0 = number of CPUs
+    overwrite: bool = False,  # Don't apply git patches -> Just overwrite all template files!
+    password: str | None = None,
+    config_file: Path | None = None,  # CookieCutter config file
+    cleanup: bool = True,  # Remove temp files if not exceptions happens
+    builtin_diff: bool = False,  # Create the patches without a temporary git repository
+    render_cache: bool = True,  # Reuse cached renders of the same template revision and context
+    verbose: bool = False,  # Print the output of all updates, not only of the failed/conflicted ones
+) -> list[BatchUpdateResult]:
+    """
+    Update many managed projects: Resolve every template once and update the projects in parallel.
+    """
+    project_paths = find_managed_projects(sources)
+    print(f'Found {len(project_paths)} managed project(s)')
+
+    tasks, results = build_tasks(
+        project_paths=project_paths,
+        overwrite=overwrite,
+        password=password,
+        config_file=config_file,
+        cleanup=cleanup,
+        builtin_diff=builtin_diff,
+        render_cache=render_cache,
+    )
+
+    def report(result: BatchUpdateResult):
+        print(f'\n[bold]{result.project_path}[/bold]: {result.status}')
+        if result.output and (verbose or result.status in (CONFLICTED, FAILED)):
+            sys.stdout.write(result.output)
+        results.append(result)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        for task in tasks:
+            report(update_project_task(task))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+            futures = [executor.submit(update_project_task, task) for task in tasks]
+            for future in as_completed(futures):
+                report(future.result())
+
+    results.sort(key=lambda result: str(result.project_path))
+    print()
+    print_summary(results)
+    return results
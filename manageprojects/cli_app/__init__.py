@@ -7,12 +7,12 @@ import sys
 from collections.abc import Sequence
 
 from cli_base.autodiscover import import_all_files
-from cli_base.cli_tools.version_info import print_version
 from rich import print  # noqa
 from tyro.extras import SubcommandApp
 
 import manageprojects
 from manageprojects import constants
+from manageprojects.utilities.profiling import enable_profiling, parse_profile_args
 
 
 logger = logging.getLogger(__name__)
@@ -31,7 +31,16 @@ def version():
 
 
 def main(args: Sequence[str] | None = None):
+    # Imported here, because the git tools are not needed to just import the CLI app:
+    from cli_base.cli_tools.version_info import print_version
+
     print_version(manageprojects)
+
+    # Global options for all commands: "--profile" and "--profile-trace <file>"
+    args, profile, trace_path = parse_profile_args(sys.argv[1:] if args is None else args)
+    if profile:
+        enable_profiling(trace_path=trace_path)
+
     app.cli(
         prog='manageprojects',  # Enforce program name if pipx used
         description=constants.CLI_EPILOG,
@@ -1,5 +1,9 @@
 """
     CLI for usage
+
+    Only the command signatures are defined here. The implementations (and their heavy
+    dependencies like cookiecutter, tomlkit, git tools etc.) are imported when a command runs,
+    to keep the CLI startup fast, e.g.: if called from git hooks.
 """
 
 from __future__ import annotations
@@ -11,8 +15,6 @@ import sys
 from pathlib import Path
 from typing import Annotated
 
-from bx_py_utils.path import assert_is_dir
-from cli_base.cli_tools.subprocess_utils import verbose_check_call
 from cli_base.tyro_commands import TyroVerbosityArgType
 from rich import print
 from tyro.conf import arg
@@ -22,15 +24,6 @@ from manageprojects.constants import (
     FORMAT_PY_FILE_DEFAULT_MAX_LINE_LENGTH,
     FORMAT_PY_FILE_DEFAULT_MIN_PYTHON_VERSION,
 )
-from manageprojects.cookiecutter_templates import (
-    clone_managed_project,
-    reverse_managed_project,
-    start_managed_project,
-    update_managed_project,
-)
-from manageprojects.data_classes import CookiecutterResult
-from manageprojects.format_file import format_sources
-from manageprojects.utilities.log_utils import log_config
 
 
 logger = logging.getLogger(__name__)
@@ -88,6 +81,9 @@ def start_project(
 
     manageprojects start-project https://github.com/jedie/cookiecutter_templates/ --directory piptools-python ~/foobar/
     """
+    from manageprojects.cookiecutter_templates import start_managed_project
+    from manageprojects.utilities.log_utils import log_config
+
     log_config(verbosity, log_in_file=True)
     print(f'Start project with template: {template!r}')
     print(f'Destination: {output_dir}')
@@ -98,7 +94,7 @@ def start_project(
         print(f'Error: Destination parent "{output_dir.parent}" does not exists')
         sys.exit(1)
 
-    result: CookiecutterResult = start_managed_project(
+    result = start_managed_project(
         template=template,
         checkout=checkout,
         output_dir=output_dir,
@@ -133,6 +129,20 @@ def update_project(
         bool,
         arg(help='Cleanup created temporary files'),
     ] = True,
+    builtin_diff: Annotated[
+        bool,
+        arg(
+            help=(
+                'Create the patch by comparing the compiled template trees directly,'
+                ' instead of committing both revisions into a temporary git repository.'
+                ' Only used if the project is not updated by overwrite.'
+            )
+        ),
+    ] = False,
+    render_cache: Annotated[
+        bool,
+        arg(help='Reuse cached renders of the same template revision and context from the user cache directory'),
+    ] = True,
     #
     # Cookiecutter options:
     input: Annotated[
@@ -155,6 +165,9 @@ def update_project(
 
     manageprojects update-project ~/foo/bar/
     """
+    from manageprojects.cookiecutter_templates import update_managed_project
+    from manageprojects.utilities.log_utils import log_config
+
     log_config(verbosity, log_in_file=True)
     print(f'Update project: "{project_path}"...')
     update_managed_project(
@@ -164,10 +177,83 @@ def update_project(
         config_file=config_file,
         cleanup=cleanup,
         input=input,
+        builtin_diff=builtin_diff,
+        render_cache=render_cache,
     )
     print(f'Managed project "{project_path}" updated, ok.')
 
 
+@app.command
+def update_projects(
+    sources: Annotated[
+        tuple[str, ...],
+        arg(help='Project paths, glob patterns or root directories that will be searched for managed projects'),
+    ],
+    /,
+    verbosity: TyroVerbosityArgType,
+    jobs: Annotated[
+        int,
+        arg(help='Number of projects that will be updated in parallel (0 = number of CPUs)'),
+    ] = 0,
+    overwrite: Annotated[
+        bool,
+        arg(
+            help=(
+                'Overwrite all Cookiecutter template files to the last template state and'
+                ' do not apply the changes via git patches.'
+                ' Projects that git repro is not in a clean state will fail.'
+            )
+        ),
+    ] = True,
+    cleanup: Annotated[
+        bool,
+        arg(help='Cleanup created temporary files'),
+    ] = True,
+    builtin_diff: Annotated[
+        bool,
+        arg(help='Create the patches by comparing the compiled template trees directly'),
+    ] = False,
+    render_cache: Annotated[
+        bool,
+        arg(help='Reuse cached renders of the same template revision and context from the user cache directory'),
+    ] = True,
+    #
+    # Cookiecutter options:
+    password: Annotated[
+        str | None,
+        arg(help='Cookiecutter Option: Password to use when extracting the repository'),
+    ] = None,
+    config_file: Annotated[
+        Path | None,
+        arg(help='Cookiecutter Option: Optional path to "cookiecutter_config.yaml"'),
+    ] = None,
+):
+    """
+    Update many existing projects in parallel.
+
+    e.g. update all managed projects below ~/repos/:
+
+    manageprojects update-projects ~/repos/ --jobs 4
+    """
+    from manageprojects.batch_update import CONFLICTED, FAILED, update_managed_projects
+    from manageprojects.utilities.log_utils import log_config
+
+    log_config(verbosity, log_in_file=True)
+    results = update_managed_projects(
+        sources=sources,
+        jobs=jobs,
+        overwrite=overwrite,
+        password=password,
+        config_file=config_file,
+        cleanup=cleanup,
+        builtin_diff=builtin_diff,
+        render_cache=render_cache,
+        verbose=verbosity > 0,
+    )
+    if any(result.status in (CONFLICTED, FAILED) for result in results):
+        sys.exit(1)
+
+
 @app.command
 def clone_project(
     project_path: Annotated[
@@ -206,6 +292,9 @@ def clone_project(
 
     manageprojects clone-project ~/foo/bar ~/cloned/
     """
+    from manageprojects.cookiecutter_templates import clone_managed_project
+    from manageprojects.utilities.log_utils import log_config
+
     log_config(verbosity=verbosity)
     return clone_managed_project(
         project_path=project_path,
@@ -224,6 +313,10 @@ def reverse(
     /,
     verbosity: TyroVerbosityArgType,
     overwrite: Annotated[bool, arg(help='Overwrite existing files.')] = False,
+    jobs: Annotated[
+        int,
+        arg(help='Number of worker processes to convert the files, 0 = number of CPUs'),
+    ] = 0,
 ):
     """
     Create a cookiecutter template from a managed project.
@@ -232,12 +325,16 @@ def reverse(
 
     manageprojects reverse ~/my_managed_project/ ~/my_new_cookiecutter_template/
     """
+    from manageprojects.cookiecutter_templates import reverse_managed_project
+    from manageprojects.utilities.log_utils import log_config
+
     log_config(verbosity)
     return reverse_managed_project(
         project_path=project_path,
         destination=destination,
         overwrite=overwrite,
         verbosity=verbosity,
+        jobs=jobs,
     )
 
 
@@ -255,6 +352,9 @@ def wiggle(
 
     manageprojects wiggle ~/my_managed_project/
     """
+    from bx_py_utils.path import assert_is_dir
+    from cli_base.cli_tools.subprocess_utils import verbose_check_call
+
     wiggle_bin = shutil.which('wiggle')
     if not wiggle_bin:
         print('Error: "wiggle" can not be found!')
@@ -307,6 +407,14 @@ def format_file(
             )
         ),
     ] = 1,
+    jobs: Annotated[
+        int,
+        arg(help='Number of worker processes to format the changed files of a directory, 0 = number of CPUs'),
+    ] = 0,
+    server: Annotated[
+        bool,
+        arg(help='Use a running "format-file-server" (Formats locally, if no server is running)'),
+    ] = False,
 ):
     """
     Format and check the given python source code file with ruff, codespell and mypy.
@@ -316,15 +424,76 @@ def format_file(
     The optional fallback values will be only used, if we can't get them from the project meta files
     like ".editorconfig" and "pyproject.toml"
     """
+    from manageprojects.utilities.log_utils import log_config
+
     log_config(verbosity=verbosity, log_in_file=False)
+    if server:
+        from manageprojects.format_file_client import format_via_server, get_socket_path
+
+        try:
+            socket_path = get_socket_path()
+        except PermissionError as err:
+            print(f'[yellow]{err} -> format locally')
+        else:
+            if format_via_server(
+                socket_path=socket_path,
+                file_path=file_path,
+                default_min_py_version=py_version,
+                default_max_line_length=max_line_length,
+                max_distance=max_distance,
+                jobs=jobs,
+            ):
+                return
+            print('[yellow]No format-file server running -> format locally')
+
+    from manageprojects.format_file import format_sources
+
     format_sources(
         file_path=file_path,
         default_min_py_version=py_version,
         default_max_line_length=max_line_length,
         max_distance=max_distance,
+        jobs=jobs,
     )
 
 
+@app.command
+def format_file_server(
+    verbosity: TyroVerbosityArgType,
+    socket_path: Annotated[
+        Path | None,
+        arg(help='Unix socket path (default: in $XDG_RUNTIME_DIR or a private directory in the temp directory)'),
+    ] = None,
+    idle_timeout: Annotated[
+        float,
+        arg(help='Stop the server after this number of seconds without a request, 0 = run forever'),
+    ] = 0,
+    stop: Annotated[
+        bool,
+        arg(help='Stop the running server'),
+    ] = False,
+):
+    """
+    Run a long-lived "format-file" server, that caches the project config.
+    Use it via: "manageprojects format-file --server <file>"
+    """
+    from manageprojects.format_file_client import get_socket_path
+    from manageprojects.format_file_server import run_server, stop_server
+    from manageprojects.utilities.log_utils import log_config
+
+    log_config(verbosity=verbosity, log_in_file=False)
+    if not socket_path:
+        try:
+            socket_path = get_socket_path()
+        except PermissionError as err:
+            print(f'[red]Error: {err}')
+            sys.exit(1)
+    if stop:
+        stop_server(socket_path)
+    else:
+        run_server(socket_path, idle_timeout=idle_timeout)
+
+
 @app.command
 def version():
     """Print version and exit"""
@@ -0,0 +1,365 @@
+import contextlib
+import datetime
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+from collections.abc import Generator
+from pathlib import Path
+from typing import Annotated
+
+import yaml
+from bx_py_utils.test_utils.redirect import RedirectOut
+from cli_base.cli_tools.git import Git
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.verbosity import setup_logging
+from cli_base.tyro_commands import TyroVerbosityArgType
+from packaging.version import Version
+from rich import print
+from rich.table import Table
+from tyro.conf import arg
+
+import manageprojects
+from manageprojects.cli_dev import PACKAGE_ROOT, app
+from manageprojects.cookiecutter_templates import (
+    clone_managed_project,
+    reverse_managed_project,
+    start_managed_project,
+    update_managed_project,
+)
+from manageprojects.format_file import Config, PyProjectInfo, ToolsExecutor, format_ranges
+from manageprojects.setup_python import probe_platform
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+def make_unformatted_source(hunks: int) -> tuple[str, list[tuple[int, int]]]:
+    """
+    Create a python source with `hunks` badly formatted functions.
+    Returns the source and the line ranges of the "changed" lines.
+    """
+    lines = []
+    ranges = []
+    for number in range(hunks):
+        ranges.append((len(lines) + 2, len(lines) + 3))
+        lines += [
+            f'def func_{number}( a,b ):',
+            f"    return {{  'a':a, 'b' :b, 'number':{number} }}",
+            '',
+            '',
+        ]
+    return '\n'.join(lines) + '\n', ranges
+
+
+def time_format_ranges(*, temp_path: Path, source: str, ranges: list, single_pass: bool, repeat: int) -> tuple:
+    config = Config(git_info=None, pyproject_info=PyProjectInfo(py_min_ver=Version('3.12')), max_line_length=119)
+    tools_executor = ToolsExecutor(cwd=temp_path)
+    file_path = Path('benchmark.py')
+
+    durations = []
+    for _ in range(repeat):
+        Path(temp_path, file_path).write_text(source)
+        start = time.monotonic()
+        with RedirectOut():
+            format_ranges(tools_executor, file_path, config, ranges, single_pass=single_pass)
+        durations.append(time.monotonic() - start)
+    return min(durations), Path(temp_path, file_path).read_text()
+
+
+@app.command
+def benchmark_format_file(
+    verbosity: TyroVerbosityArgType,
+    hunks: Annotated[
+        tuple[int, ...],
+        arg(help='Number of changed hunks in the synthetic source files'),
+    ] = (1, 10, 100),
+    repeat: Annotated[
+        int,
+        arg(help='Number of runs per file, the fastest run is displayed'),
+    ] = 3,
+):
+    """
+    Compare "format-file" range formatting: range by range vs. all ranges in a single pass
+    """
+    setup_logging(verbosity=verbosity)
+
+    table = Table(title='Format changed ranges')
+    table.add_column('Hunks', justify='right')
+    table.add_column('Range by range', justify='right')
+    table.add_column('Single pass', justify='right')
+    table.add_column('Speedup', justify='right')
+    with TemporaryDirectory(prefix='manageprojects_benchmark_') as temp_path:
+        shutil.copy(PACKAGE_ROOT / 'pyproject.toml', temp_path)
+        for hunk_count in hunks:
+            source, ranges = make_unformatted_source(hunk_count)
+            print(f'Format {hunk_count} hunk(s)...')
+            ranged_duration, ranged_result = time_format_ranges(
+                temp_path=temp_path, source=source, ranges=ranges, single_pass=False, repeat=repeat
+            )
+            single_duration, single_result = time_format_ranges(
+                temp_path=temp_path, source=source, ranges=ranges, single_pass=True, repeat=repeat
+            )
+            assert single_result == ranged_result, f'Different results with {hunk_count} hunks!'
+            assert single_result != source, 'Nothing formatted?!?'
+            table.add_row(
+                str(hunk_count),
+                f'{ranged_duration:.3f}s',
+                f'{single_duration:.3f}s',
+                f'{ranged_duration / single_duration:.1f}x',
+            )
+    print(table)
+
+
+BENCHMARK_RESULTS_PATH = PACKAGE_ROOT / '.benchmarks'
+
+
+def make_synthetic_template(
+    template_path: Path,
+    *,
+    files: int,  # Number of files in the project template
+    depth: int,  # Max. directory depth in the project template
+    file_size: int,  # Size of every file in bytes
+    binary_ratio: float,  # Ratio of binary files (0.0 - 1.0)
+    variables: int,  # Number of cookiecutter context variables
+) -> list[Path]:
+    """
+    Create a cookiecutter template with generated files and returns the paths of all text files.
+    Uses a fixed random seed, so the same parameters always create the same template.
+    """
+    rng = random.Random(files)
+    context = {'project_name': 'benchmark_project'}
+    context.update({f'var_{number}': f'Value number {number}' for number in range(variables)})
+    template_path.mkdir(parents=True)
+    Path(template_path, 'cookiecutter.json').write_text(json.dumps(context, indent=4))
+
+    project_path = template_path / '{{cookiecutter.project_name}}'
+    text_paths = []
+    for number in range(files):
+        dir_path = project_path.joinpath(*(f'dir_{number % (level + 2)}' for level in range(number % (depth + 1))))
+        dir_path.mkdir(parents=True, exist_ok=True)
+        if rng.random() < binary_ratio:
+            Path(dir_path, f'file_{number}.bin').write_bytes(rng.randbytes(file_size))
+            continue
+
+        lines = []
+        size = 0
+        while size < file_size:
+            line = f'File {number} line {len(lines)}: {{{{ cookiecutter.var_{len(lines) % max(variables, 1)} }}}}'
+            if not variables:
+                line = f'File {number} line {len(lines)}'
+            lines.append(line)
+            size += len(line) + 1
+        file_path = dir_path / f'file_{number}.txt'
+        file_path.write_text('\n'.join(lines) + '\n')
+        text_paths.append(file_path)
+    return text_paths
+
+
+@contextlib.contextmanager
+def timed(timings: dict, name: str, verbose: bool) -> Generator[None, None, None]:
+    print(f'{name}...', end=' ', flush=True)
+    start = time.monotonic()
+    try:
+        with contextlib.nullcontext() if verbose else RedirectOut():
+            yield
+    finally:
+        timings[name] = time.monotonic() - start
+        print(f'{timings[name]:.3f}s')
+
+
+def print_comparison(*, timings: dict, compare: Path, max_slowdown: float) -> bool:
+    """
+    Print the timings compared with a previous result file. Returns False on regressions.
+    """
+    previous = json.loads(compare.read_text())
+    print(f'Compare with {compare} (created: {previous["created"]})')
+    if previous['parameters'] != timings['parameters']:
+        print(f'[yellow]Warning: Different parameters: {previous["parameters"]}')
+
+    table = Table(title='Comparison')
+    table.add_column('Operation')
+    table.add_column('Previous', justify='right')
+    table.add_column('Current', justify='right')
+    table.add_column('Ratio', justify='right')
+    ok = True
+    for name, duration in timings['timings'].items():
+        previous_duration = previous['timings'].get(name)
+        if not previous_duration:
+            table.add_row(name, '-', f'{duration:.3f}s', '-')
+            continue
+        ratio = duration / previous_duration
+        if max_slowdown and ratio > max_slowdown:
+            ok = False
+            ratio_str = f'[red]{ratio:.2f}'
+        else:
+            ratio_str = f'{ratio:.2f}'
+        table.add_row(name, f'{previous_duration:.3f}s', f'{duration:.3f}s', ratio_str)
+    print(table)
+    return ok
+
+
+@app.command
+def benchmark(
+    verbosity: TyroVerbosityArgType,
+    files: Annotated[int, arg(help='Number of files in the synthetic template')] = 100,
+    depth: Annotated[int, arg(help='Max. directory depth in the synthetic template')] = 3,
+    file_size: Annotated[int, arg(help='Size of every generated file in bytes')] = 4096,
+    binary_ratio: Annotated[float, arg(help='Ratio of binary files (0.0 - 1.0)')] = 0.1,
+    variables: Annotated[int, arg(help='Number of cookiecutter context variables')] = 20,
+    changed_ratio: Annotated[float, arg(help='Ratio of text files changed in the new template revision')] = 0.2,
+    output: Annotated[
+        Path | None,
+        arg(help='JSON result file (default: .benchmarks/<timestamp>.json)'),
+    ] = None,
+    compare: Annotated[
+        Path | None,
+        arg(help='Compare the timings with this previous JSON result file'),
+    ] = None,
+    max_slowdown: Annotated[
+        float,
+        arg(help='Exit with 1 if a operation is slower than this factor compared with --compare (0 = disabled)'),
+    ] = 0.0,
+):
+    """
+    Benchmark start, update (patch and overwrite), clone and reverse with a synthetic template
+    """
+    setup_logging(verbosity=verbosity)
+    verbose = verbosity > 1
+    parameters = {
+        'files': files,
+        'depth': depth,
+        'file_size': file_size,
+        'binary_ratio': binary_ratio,
+        'variables': variables,
+        'changed_ratio': changed_ratio,
+    }
+    print(f'Benchmark with: {parameters}')
+
+    timings: dict[str, float] = {}
+    with TemporaryDirectory(prefix='manageprojects_benchmark_') as temp_path:
+        # Don't touch the user's cookiecutter directories:
+        config_file = temp_path / 'cookiecutter_config.yaml'
+        config_file.write_text(
+            yaml.dump({'cookiecutters_dir': str(temp_path / 'cookiecutters'), 'replay_dir': str(temp_path / 'replay')})
+        )
+
+        template_path = temp_path / 'template'
+        with RedirectOut():
+            text_paths = make_synthetic_template(
+                template_path,
+                files=files,
+                depth=depth,
+                file_size=file_size,
+                binary_ratio=binary_ratio,
+                variables=variables,
+            )
+            template_git, _ = init_git(template_path, comment='Template revision 1')
+
+        project_path = temp_path / 'projects' / 'benchmark_project'
+        with timed(timings, 'start_managed_project', verbose):
+            start_managed_project(
+                template=str(template_path), output_dir=project_path.parent, input=False, config_file=config_file
+            )
+        clone_path = temp_path / 'clone' / 'benchmark_project'
+        with timed(timings, 'clone_managed_project', verbose):
+            clone_managed_project(project_path=project_path, destination=clone_path.parent, config_file=config_file)
+        with RedirectOut():
+            init_git(project_path)
+            init_git(clone_path)
+
+            rng = random.Random(len(text_paths))
+            for file_path in rng.sample(text_paths, k=int(len(text_paths) * changed_ratio)):
+                file_path.write_text(f'Changed in revision 2\n{file_path.read_text()}')
+            template_git.add('.', verbose=False)
+            template_git.commit('Template revision 2', verbose=False)
+
+        for name, path, overwrite in (
+            ('update_managed_project (patch)', project_path, False),
+            ('update_managed_project (overwrite)', clone_path, True),
+        ):
+            with timed(timings, name, verbose):
+                update_managed_project(
+                    project_path=path,
+                    overwrite=overwrite,
+                    config_file=config_file,
+                    render_cache=False,
+                )
+            git = Git(cwd=path, detect_root=True)
+            assert git.status(verbose=False), f'{name}: Nothing changed in {path}'
+
+        with timed(timings, 'reverse_managed_project', verbose):
+            reverse_managed_project(project_path=project_path, destination=temp_path / 'reversed')
+
+    result = {
+        'created': datetime.datetime.now(tz=datetime.UTC).isoformat(),
+        'manageprojects': manageprojects.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_arch': probe_platform().arch,
+        'parameters': parameters,
+        'timings': timings,
+    }
+    if output is None:
+        output = BENCHMARK_RESULTS_PATH / f'{datetime.datetime.now(tz=datetime.UTC):%Y%m%d_%H%M%S}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=4))
+    print(f'Results written to: {output}')
+
+    if compare and not print_comparison(timings=result, compare=compare, max_slowdown=max_slowdown):
+        print(f'[red]Regression: Slower than {max_slowdown}x')
+        sys.exit(1)
+
+
+def get_import_time(module: str) -> float:
+    """
+    Returns the cumulative import time of `module` in seconds, measured in a fresh interpreter.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in process.stderr.splitlines():
+        # e.g.: "import time:      3157 |      93360 | manageprojects.cli_app"
+        _, _, cumulative, name = line.replace('|', ':').split(':')
+        if name.strip() == module:
+            return int(cumulative) / 1_000_000
+    raise AssertionError(f'Import of {module} not found in:\n{process.stderr}')
+
+
+@app.command
+def benchmark_startup(
+    verbosity: TyroVerbosityArgType,
+    repeat: Annotated[int, arg(help='Number of runs, the fastest run is used')] = 5,
+    threshold: Annotated[
+        float,
+        arg(help='Exit with 1 if "manageprojects version" takes longer (in seconds, 0 = disabled)'),
+    ] = 1.0,
+):
+    """
+    Measure the startup time of the app CLI: Import time and "manageprojects version" call
+    """
+    setup_logging(verbosity=verbosity)
+
+    import_time = min(get_import_time('manageprojects.cli_app') for _ in range(repeat))
+
+    durations = []
+    for _ in range(repeat):
+        start = time.monotonic()
+        subprocess.run([sys.executable, '-m', 'manageprojects', 'version'], capture_output=True, check=True)
+        durations.append(time.monotonic() - start)
+    cli_time = min(durations)
+
+    table = Table(title=f'App CLI startup (fastest of {repeat} runs)')
+    table.add_column('Operation')
+    table.add_column('Duration', justify='right')
+    table.add_row('import manageprojects.cli_app', f'{import_time:.3f}s')
+    table.add_row('manageprojects version', f'{cli_time:.3f}s')
+    print(table)
+
+    if threshold and cli_time > threshold:
+        print(f'[red]Regression: "manageprojects version" takes longer than {threshold}s')
+        sys.exit(1)
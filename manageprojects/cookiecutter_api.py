@@ -6,15 +6,19 @@ from bx_py_utils.path import assert_is_dir
 from cli_base.cli_tools.git import Git
 from cookiecutter.config import get_user_config
 from cookiecutter.main import cookiecutter
-from cookiecutter.repository import determine_repo_dir
+from cookiecutter.repository import determine_repo_dir, expand_abbreviations, is_repo_url, is_zip_file
 
 from manageprojects.utilities.cookiecutter_utils import GenerateFilesWrapper
 from manageprojects.utilities.log_utils import log_func_call
+from manageprojects.utilities.profiling import phase
+from manageprojects.utilities.render_cache import RenderCache
+from manageprojects.utilities.template_pool import POOL_DIR_NAME, TemplateRepoPool
 
 
 logger = logging.getLogger(__name__)
 
 
+@phase('resolve template')
 def get_repo_path(
     *,
     template: str,  # CookieCutter Template path or GitHub url
@@ -24,7 +28,11 @@ def get_repo_path(
     config_file: Path | None = None,  # Optional path to 'cookiecutter_config.yaml'
 ) -> Path:
     """
-    Checkout the cookiecutter template and reset it to `checkout` if needed.
+    Returns the path of the cookiecutter template in the requested `checkout` revision.
+
+    Git repository urls are mirrored in a repository pool and every revision is a separate
+    snapshot, so nothing is reset. Also a `checkout` of a local git repository is a snapshot,
+    so the local working copy is never changed.
     """
     if directory:
         assert '://' not in directory
@@ -36,33 +44,35 @@ def get_repo_path(
         config_file=config_file,
         default_config=None,
     )
-    repo_dir, _cleanup = determine_repo_dir(
-        template=template,
-        directory=directory,
-        abbreviations=config_dict['abbreviations'],
-        clone_to_dir=config_dict['cookiecutters_dir'],
-        checkout=checkout,
-        no_input=True,
-        password=password,
-    )
-    logger.debug('repo_dir: %s', repo_dir)
-
-    repo_path = Path(repo_dir)
-    assert_is_dir(repo_path)
+    pool = TemplateRepoPool(pool_path=Path(config_dict['cookiecutters_dir']) / POOL_DIR_NAME)
 
-    if checkout is not None:
-        # Cookiecutter will only checkout a specific commit, if `template` is a repro url!
-
-        git = Git(cwd=repo_path, detect_root=True)
-        assert repo_path.is_relative_to(git.cwd), f'Git repro {git.cwd} is not {repo_path}'
-        # assert git.cwd == repo_path, f'Git repro {git.cwd} is not {repo_path}'
-        current_hash = git.get_current_hash(verbose=True)
-        if current_hash != checkout:
-            git.reset(commit=checkout, verbose=True)
+    url = expand_abbreviations(template, config_dict['abbreviations'])
+    if is_repo_url(url) and not is_zip_file(url) and not url.startswith('hg+'):
+        repo_path = pool.checkout_url(url=url.removeprefix('git+'), revision=checkout)
+        if directory:
+            repo_path = repo_path / directory
+    else:
+        repo_dir, _cleanup = determine_repo_dir(
+            template=template,
+            directory=directory,
+            abbreviations=config_dict['abbreviations'],
+            clone_to_dir=config_dict['cookiecutters_dir'],
+            checkout=checkout,
+            no_input=True,
+            password=password,
+        )
+        repo_path = Path(repo_dir)
+        if checkout is not None and not is_zip_file(url):
+            git = Git(cwd=repo_path, detect_root=True)
+            snapshot_path = pool.checkout_local(git=git, revision=checkout)
+            repo_path = snapshot_path / repo_path.resolve().relative_to(git.cwd.resolve())
 
+    logger.debug('repo_path: %s', repo_path)
+    assert_is_dir(repo_path)
     return repo_path
 
 
+@phase('render template')
 def execute_cookiecutter(
     *,
     template: str,  # CookieCutter Template path or GitHub url
@@ -74,35 +84,50 @@ def execute_cookiecutter(
     checkout: str | None = None,  # Optional branch, tag or commit ID to checkout after clone
     password: str | None = None,  # Optional password to use when extracting the repository
     config_file: Path | None = None,  # Optional path to 'cookiecutter_config.yaml'
+    render_cache: bool = False,  # Reuse a cached render? Only for temporary output, because files are hardlinked!
+    repo_path: Path | None = None,  # Already resolved template path, e.g.: from get_repo_path()
 ) -> tuple[dict, Path, Path]:
     """
     "Just" run cookiecutter
     """
-    repo_path = get_repo_path(
-        template=template,
-        directory=directory,
-        checkout=checkout,
-        password=password,
-        config_file=config_file,
-    )
+    if repo_path is None:
+        repo_path = get_repo_path(
+            template=template,
+            directory=directory,
+            checkout=checkout,
+            password=password,
+            config_file=config_file,
+        )
+
+    cache = cache_key = None
+    if render_cache and no_input and not replay:
+        cache = RenderCache()
+        cache_key = cache.get_key(repo_path=repo_path, extra_context=extra_context)
+        if cache_key and (cached := cache.get(key=cache_key, output_dir=output_dir)):
+            cookiecutter_context, destination_path = cached
+            return cookiecutter_context, destination_path, repo_path
+
     generate_files_wrapper = GenerateFilesWrapper()
     with patch('cookiecutter.main.generate_files', generate_files_wrapper):
         destination = log_func_call(
             logger=logger,
             func=cookiecutter,
-            template=template,
-            directory=directory,
+            template=str(repo_path),  # The checkout is already done by get_repo_path()
             output_dir=output_dir,
             no_input=no_input,
             extra_context=extra_context,
             replay=replay,
-            checkout=checkout,
-            password=password,
             config_file=config_file,
         )
     cookiecutter_context = generate_files_wrapper.context
+    # Store the origin template information and not the path of the checkout:
+    cookiecutter_context['cookiecutter'].update(_template=template, _checkout=checkout)
     logger.info('Cookiecutter context: %r', cookiecutter_context)
     destination_path = Path(destination)
     assert_is_dir(destination_path)
     logger.info('Cookiecutter generated here: %r', destination_path)
+
+    if cache_key:
+        cache.store(key=cache_key, context=cookiecutter_context, destination_path=destination_path)
+
     return cookiecutter_context, destination_path, repo_path
@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import codecs
+import functools
+import itertools
+import os
+import re
 import shutil
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
 from bx_py_utils.path import assert_is_dir
 from cli_base.cli_tools.git import Git
 from rich import print
 from rich.pretty import pprint
 
+from manageprojects.utilities.file_copy import CopyStats, copy_file
+
+
+SNIFF_SIZE = 8 * 1024  # Bytes to read for the binary file detection
+CHUNK_SIZE = 1024 * 1024  # Characters to read at once from text files
+CONVERT_CHUNKSIZE = 16  # Number of files per worker process task
+
 
 def iter_context(*, context: dict, prefix='') -> Generator[tuple[str, Any], None, None]:
     for key, value in context.items():
@@ -28,21 +41,53 @@ def generate_reverse_info(*, cookiecutter_context: dict) -> tuple:
     return tuple(reverse_info)
 
 
+@functools.lru_cache(maxsize=16)
+def compile_reverse_info(str_pairs: tuple[tuple[str, str], ...]) -> tuple[re.Pattern, dict[str, str]] | None:
+    """
+    Compile all replacements into one regex alternation, to replace all values in a single scan.
+    The alternatives are sorted longest first, so the longest value wins at every position.
+
+    >>> pattern, replacements = compile_reverse_info((('foo', '{{ a }}'), ('foobar', '{{ b }}')))
+    >>> pattern.pattern
+    'foobar|foo'
+    """
+    replacements = {}
+    for src_str, dst_str in str_pairs:
+        if src_str:
+            replacements.setdefault(src_str, dst_str)
+    if not replacements:
+        return None
+    pattern = re.compile('|'.join(re.escape(src_str) for src_str in sorted(replacements, key=len, reverse=True)))
+    return pattern, replacements
+
+
 def replace_str(content: str, reverse_info: tuple, verbosity: int = 0) -> str:
-    origin_content = content
+    """
+    Replace all context values with the cookiecutter variables in one pass.
+
+    >>> replace_str('foo bar', reverse_info=(('foo bar', '{{ a }}'), ('a', '{{ b }}')))
+    '{{ a }}'
+    """
+    str_pairs = []
     for src_str, dst_str in reverse_info:
         if isinstance(src_str, str) and isinstance(dst_str, str):
-            content = content.replace(src_str, dst_str)
+            str_pairs.append((src_str, dst_str))
         elif verbosity > 2:
             if not isinstance(src_str, str):
                 print(f'Ignore {src_str=} for {content=}')
             if not isinstance(dst_str, str):
                 print(f'Ignore {dst_str=} for {content=}')
 
-    if verbosity > 2 and content != origin_content:
-        print(f'Convert: {origin_content} -> {content}')
+    compiled = compile_reverse_info(tuple(str_pairs))
+    if compiled is None:
+        return content
+    pattern, replacements = compiled
+    new_content = pattern.sub(lambda match: replacements[match.group()], content)
 
-    return content
+    if verbosity > 2 and new_content != content:
+        print(f'Convert: {content} -> {new_content}')
+
+    return new_content
 
 
 def replace_path(*, path: Path, reverse_info: tuple, verbosity: int = 0) -> Path:
@@ -67,20 +112,73 @@ def build_dst_path(
     return destination / new_path
 
 
-def copy_replaced(src_path, dst_path, reverse_info: tuple, verbosity: int = 0):
+def is_binary_file(file_path: Path) -> bool:
+    """
+    Sniff only the first chunk of the file: Binary if it contains NUL bytes or is not UTF-8.
+    """
+    with file_path.open('rb') as f:
+        head = f.read(SNIFF_SIZE)
+    if b'\0' in head:
+        return True
+    try:
+        codecs.getincrementaldecoder('UTF-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def replace_stream(src_file: TextIO, dst_file: TextIO, *, pattern: re.Pattern, replacements: dict, chunk_size: int):
+    """
+    Replace in chunks, without reading the whole file. The tail of every chunk that
+    may be the start of a value is carried over to the next chunk.
+    """
+    overlap = max(len(src_str) for src_str in replacements) - 1
+    carry = ''
+    while True:
+        chunk = src_file.read(chunk_size)
+        buffer = carry + chunk
+        # Matches that start before safe_end are complete in this buffer:
+        safe_end = max(len(buffer) - overlap, 0) if chunk else len(buffer)
+        pos = 0
+        for match in pattern.finditer(buffer):
+            if match.start() >= safe_end:
+                break
+            dst_file.write(buffer[pos : match.start()])
+            dst_file.write(replacements[match.group()])
+            pos = match.end()
+        end = max(pos, safe_end)
+        dst_file.write(buffer[pos:end])
+        carry = buffer[end:]
+        if not chunk:
+            break
+
+
+def copy_replaced(src_path: Path, dst_path: Path, reverse_info: tuple, chunk_size: int = CHUNK_SIZE) -> str | None:
+    """
+    Copy the file and replace all context values in text files.
+    Returns None for text files, or the copy method (see file_copy.copy_file) of a binary file.
+    """
     dst_parent = dst_path.parent
     dst_parent.mkdir(parents=True, exist_ok=True)
 
-    try:
-        content = src_path.read_text(encoding='UTF-8')
-    except UnicodeDecodeError as err:
-        # XXX: Detect binary files in a other way
-        print(f'[yellow]Warning: {err} for file {src_path}')
-        print('copy as binary file')
-        shutil.copy2(src_path, dst_path)
-    else:
-        content = replace_str(content, reverse_info=reverse_info, verbosity=verbosity)
-        dst_path.write_text(content, encoding='UTF-8')
+    if not is_binary_file(src_path):
+        str_pairs = tuple(pair for pair in reverse_info if isinstance(pair[0], str) and isinstance(pair[1], str))
+        compiled = compile_reverse_info(str_pairs)
+        try:
+            with src_path.open(encoding='UTF-8') as src_file, dst_path.open('w', encoding='UTF-8') as dst_file:
+                if compiled is None:
+                    shutil.copyfileobj(src_file, dst_file, chunk_size)
+                else:
+                    pattern, replacements = compiled
+                    replace_stream(
+                        src_file, dst_file, pattern=pattern, replacements=replacements, chunk_size=chunk_size
+                    )
+        except UnicodeDecodeError:
+            pass  # Not UTF-8 behind the sniffed chunk
+        else:
+            return None
+
+    return copy_file(src_path, dst_path, metadata=True)
 
 
 def create_cookiecutter_template(
@@ -90,6 +188,7 @@ def create_cookiecutter_template(
     cookiecutter_context: dict,
     overwrite: bool = False,
     verbosity: int = 0,
+    jobs: int = 0,  # Number of worker processes, 0 = number of CPUs
 ):
     source_path = source_path.resolve()
     assert_is_dir(source_path)
@@ -104,6 +203,8 @@ def create_cookiecutter_template(
     git = Git(cwd=source_path, detect_root=True)
     file_paths = git.ls_files(verbose=True)
 
+    src_paths = []
+    dst_paths = []
     for item in file_paths:
         if verbosity > 1:
             print(f'Convert: {item}')
@@ -117,7 +218,28 @@ def create_cookiecutter_template(
         if item.is_dir():
             dst_path.mkdir(parents=True, exist_ok=True)
         elif item.is_file():
-            print(item.relative_to(source_path), '->', dst_path)
-            copy_replaced(src_path=item, dst_path=dst_path, reverse_info=reverse_info, verbosity=verbosity)
+            src_paths.append(item)
+            dst_paths.append(dst_path)
         else:
             print(f'Ignore: {item}')
+
+    copy_stats = CopyStats()
+
+    def report(results: Iterable[str | None]):
+        for src_path, dst_path, copy_method in zip(src_paths, dst_paths, results):
+            print(src_path.relative_to(source_path), '->', dst_path)
+            if copy_method:
+                print(f'[yellow]Binary file {src_path}: {copy_method} without replacements')
+                copy_stats.add(copy_method, src_path.stat().st_size)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(src_paths) <= 1:
+        report(map(copy_replaced, src_paths, dst_paths, itertools.repeat(reverse_info)))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(src_paths))) as executor:
+            report(
+                executor.map(
+                    copy_replaced, src_paths, dst_paths, itertools.repeat(reverse_info), chunksize=CONVERT_CHUNKSIZE
+                )
+            )
+    print(f'Binary files: {copy_stats}')
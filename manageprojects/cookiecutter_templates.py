@@ -15,15 +15,18 @@ from manageprojects.data_classes import (
     GenerateTemplatePatchResult,
     ManageProjectsMeta,
     OverwriteResult,
+    UnchangedTemplateResult,
 )
 from manageprojects.overwrite import overwrite_project
 from manageprojects.patching import generate_template_patch
+from manageprojects.utilities.profiling import phase
 from manageprojects.utilities.pyproject_toml import PyProjectToml, update_pyproject_toml
 
 
 logger = logging.getLogger(__name__)
 
 
+@phase('start managed project')
 def start_managed_project(
     *,
     template: str,  # CookieCutter Template path or GitHub url
@@ -83,6 +86,7 @@ def start_managed_project(
     )
 
 
+@phase('update managed project')
 def update_managed_project(
     project_path: Path,
     overwrite: bool = False,  # Don't apply git patches -> Just overwrite all template files!
@@ -90,7 +94,10 @@ def update_managed_project(
     config_file: Path | None = None,  # CookieCutter config file
     cleanup: bool = True,  # Remove temp files if not exceptions happens
     input: bool = False,  # Prompt the user at command line for manual configuration?
-) -> GenerateTemplatePatchResult | None:
+    builtin_diff: bool = False,  # Create the patch without a temporary git repository
+    render_cache: bool = True,  # Reuse cached renders of the same template revision and context
+    template_path: Path | None = None,  # Use this local template checkout instead of "cookiecutter_template"
+) -> GenerateTemplatePatchResult | OverwriteResult | UnchangedTemplateResult | None:
     """
     Update a existing project by apply git patch from cookiecutter template changes.
     """
@@ -111,6 +118,9 @@ def update_managed_project(
 
     cookiecutter_template = meta.cookiecutter_template
     assert cookiecutter_template, f'Missing template in {toml.path}'
+    if template_path:
+        logger.info('Use template checkout %s instead of %s', template_path, cookiecutter_template)
+        cookiecutter_template = str(template_path)
 
     if overwrite:
         # Don't apply git patches -> Just overwrite all template files:
@@ -125,6 +135,7 @@ def update_managed_project(
             config_file=config_file,
             cleanup=cleanup,
             no_input=not input,
+            render_cache=render_cache,
         )
         if not result:
             logger.info('Project is up-to-date, no changed to applied.')
@@ -143,40 +154,48 @@ def update_managed_project(
             config_file=config_file,
             cleanup=cleanup,
             no_input=not input,
+            builtin_diff=builtin_diff,
+            render_cache=render_cache,
         )
         if not result:
             logger.info('No git patch was created, nothing to apply.')
             return None
-        assert isinstance(result, GenerateTemplatePatchResult)
-
-        #############################################################################
-        # Apply the patch
-
-        patch_file_path = result.patch_file_path
-        try:
-            git.apply(patch_path=patch_file_path)
-        except subprocess.CalledProcessError as err:
-            print(err.stdout)
-            if err.returncode == 1:
-                print()
-                print('Seems that the patch was not applied correctly!')
-                print('Hint: run wiggle on the project:')
-                print()
-                print(f'./cli.py wiggle {project_path}')
-                print()
+        if isinstance(result, UnchangedTemplateResult):
+            logger.info('Template files are unchanged, only the new revision will be recorded.')
+        else:
+            assert isinstance(result, GenerateTemplatePatchResult)
+
+            #############################################################################
+            # Apply the patch
+
+            patch_file_path = result.patch_file_path
+            try:
+                with phase('git apply'):
+                    git.apply(patch_path=patch_file_path)
+            except subprocess.CalledProcessError as err:
+                print(err.stdout)
+                if err.returncode == 1:
+                    print()
+                    print('Seems that the patch was not applied correctly!')
+                    print('Hint: run wiggle on the project:')
+                    print()
+                    print(f'./cli.py wiggle {project_path}')
+                    print()
 
     #############################################################################
     # Update "pyproject.toml" with applied patch information
-    update_pyproject_toml(
-        old_mp_table=old_mp_table,
-        project_path=project_path,
-        git_hash=result.to_rev,
-        dt=result.to_commit_date,
-    )
+    with phase('update pyproject.toml'):
+        update_pyproject_toml(
+            old_mp_table=old_mp_table,
+            project_path=project_path,
+            git_hash=result.to_rev,
+            dt=result.to_commit_date,
+        )
 
     return result
 
 
+@phase('clone managed project')
 def clone_managed_project(
     project_path: Path,
     destination: Path,
@@ -251,12 +270,14 @@ def clone_managed_project(
     return result
 
 
+@phase('reverse managed project')
 def reverse_managed_project(
     *,
     project_path: Path,
     destination: Path,
     overwrite: bool = False,
     verbosity: int = 0,
+    jobs: int = 0,  # Number of worker processes, 0 = number of CPUs
 ):
     """
     Create a cookiecutter template from a managed project.
@@ -278,4 +299,5 @@ def reverse_managed_project(
         cookiecutter_context=cookiecutter_context,
         overwrite=overwrite,
         verbosity=verbosity,
+        jobs=jobs,
     )
@@ -62,4 +62,45 @@ class GenerateTemplatePatchResult(ResultBase):
 
 @dataclasses.dataclass
 class OverwriteResult(ResultBase):
-    pass
+    locally_modified: list[Path] = dataclasses.field(default_factory=list)  # Overwritten files with local changes
+
+
+@dataclasses.dataclass
+class UnchangedTemplateResult(ResultBase):
+    """
+    The template revision changed, but none of the files used for rendering.
+    """
+
+    repo_path: Path  # Cookiecutter template path
+    from_rev: str
+
+
+@dataclasses.dataclass
+class BatchUpdateTask:
+    """
+    Update one managed project from a shared template checkout
+    """
+
+    project_path: Path
+    template_root: Path  # Git root of the already resolved template checkout
+    template_subdir: Path  # Template path relative to the git root, without the cookiecutter directory
+    overwrite: bool
+    password: str | None
+    config_file: Path | None
+    cleanup: bool
+    builtin_diff: bool
+    render_cache: bool
+
+
+@dataclasses.dataclass
+class BatchUpdateResult:
+    """
+    Result of one project update via "update-projects"
+    """
+
+    project_path: Path
+    status: str  # One of manageprojects.batch_update.STATUSES
+    from_rev: str | None = None
+    to_rev: str | None = None
+    message: str = ''
+    output: str = ''  # Captured stdout/stderr of the update
@@ -1,6 +1,12 @@
 import dataclasses
+import io
 import logging
+import os
 import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from functools import partial
 from pathlib import Path
 
 from bx_py_utils.dict_utils import dict_get
@@ -13,9 +19,13 @@ from rich import print
 from rich.console import Console
 from rich.pretty import pprint
 
-from manageprojects.constants import FORMAT_PY_FILE_DEFAULT_MAX_LINE_LENGTH, FORMAT_PY_FILE_DEFAULT_MIN_PYTHON_VERSION
+from manageprojects.constants import (
+    FORMAT_PY_FILE_DEFAULT_MAX_LINE_LENGTH,
+    FORMAT_PY_FILE_DEFAULT_MIN_PYTHON_VERSION,
+    PY_BIN_PATH,
+)
 from manageprojects.exceptions import NoPyProjectTomlFound
-from manageprojects.utilities.pyproject_toml import TomlDocument, get_pyproject_toml
+from manageprojects.utilities.pyproject_toml import get_pyproject_toml_path, load_toml
 
 
 logger = logging.getLogger(__name__)
@@ -109,14 +119,14 @@ def get_pyproject_info(file_path: Path, default_min_py_version: str) -> PyProjec
     )
 
     try:
-        toml_document: TomlDocument = get_pyproject_toml(file_path=file_path)
+        pyproject_toml_path = get_pyproject_toml_path(file_path=file_path)
     except NoPyProjectTomlFound as err:
         print(err)
         print('Cannot detect the minimal Python version')
         return pyproject_info
 
-    pyproject_info.pyproject_toml_path = toml_document.file_path
-    data = toml_document.doc.unwrap()  # TOMLDocument -> dict
+    pyproject_info.pyproject_toml_path = pyproject_toml_path
+    data = load_toml(pyproject_toml_path)
 
     if raw_py_ver_req := dict_get(data, 'project', 'requires-python'):
         # [project]
@@ -218,13 +228,169 @@ def merge_ranges(ranges: list, max_distance: int = 1) -> list:
     return merged
 
 
-def format_only_changed_lines(tools_executor, file_path, config: Config, max_distance: int = 1):
-    # Use darker after v3 release, see: https://github.com/akaihola/darker/milestones
+def get_replacement(old_lines: list[bytes], new_lines: list[bytes]) -> tuple[int, int, list[bytes]] | None:
+    """
+    Returns the changed block as: (start, end, new lines), so that: old_lines[start:end] = new lines
 
-    git: Git = config.git_info.git
-    target = f'origin/{config.main_branch_name}'
+    >>> get_replacement([b'a', b'b', b'c'], [b'a', b'B', b'B', b'c'])
+    (1, 2, [b'B', b'B'])
+    >>> get_replacement([b'a', b'b'], [b'a', b'b']) is None
+    True
+    """
+    if old_lines == new_lines:
+        return None
 
-    git_diff_output = git.git_verbose_check_output('diff', target, '--unified=0', file_path)
+    max_length = min(len(old_lines), len(new_lines))
+    prefix = 0
+    while prefix < max_length and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < max_length - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+    return prefix, len(old_lines) - suffix, new_lines[prefix : len(new_lines) - suffix]
+
+
+def splice_replacements(lines: list[bytes], replacements: list[tuple[int, int, list[bytes]]]) -> list[bytes] | None:
+    """
+    Apply all replacements at once. Returns None if two replacements overlap or touch each other,
+    because then the result may depend on the order of the formatting.
+
+    >>> splice_replacements([b'1', b'2', b'3', b'4'], [(3, 4, [b'four']), (0, 1, [b'one', b'eins'])])
+    [b'one', b'eins', b'2', b'3', b'four']
+    >>> splice_replacements([b'1', b'2', b'3'], [(0, 2, [b'x']), (2, 3, [b'y'])]) is None
+    True
+    """
+    result = []
+    position = 0
+    previous_end = -1
+    for start, end, new_lines in sorted(replacements, key=lambda replacement: replacement[:2]):
+        if start <= previous_end:
+            return None
+        result += lines[position:start]
+        result += new_lines
+        position = previous_end = end
+    result += lines[position:]
+    return result
+
+
+def ruff_format_range(
+    tools_executor: ToolsExecutor,
+    file_path: Path,
+    config: Config,
+    *,
+    content: bytes,
+    start: int,
+    end: int,
+) -> bytes | None:
+    """
+    Format one range of the given content via stdin. Returns the complete formatted content or None on errors.
+    """
+    env = os.environ.copy()
+    env.update(tools_executor.extra_env)
+    process = subprocess.run(
+        [
+            str(PY_BIN_PATH / 'ruff'),
+            'format',
+            '--target-version',
+            config.py_ver_str,
+            '--stdin-filename',
+            str(file_path),
+            f'--range={start}-{end}',
+            '-',
+        ],
+        input=content,
+        check=False,
+        capture_output=True,
+        cwd=tools_executor.cwd,
+        env=env,
+    )
+    if process.returncode:
+        logger.info('ruff format range %i-%i failed: %s', start, end, process.stderr)
+        return None
+    return process.stdout
+
+
+def format_ranges_single_pass(
+    tools_executor: ToolsExecutor,
+    file_path: Path,
+    config: Config,
+    ranges: list,
+    jobs: int = 0,  # Number of concurrent ruff calls, 0 = number of CPUs
+) -> bool:
+    """
+    Format all ranges concurrently against the same original content and splice the results together.
+    Ranges whose formatted blocks touch each other are formatted one after another (in reversed order),
+    so the result is always the same as formatting the file range by range.
+    Returns False if ruff failed, e.g.: syntax errors. The file is not changed in this case.
+    """
+    abs_file_path = tools_executor.cwd / file_path
+    content = abs_file_path.read_bytes()
+    old_lines = content.splitlines(keepends=True)
+
+    def format_range(range_info: tuple[int, int]) -> bytes | None:
+        start, end = range_info
+        return ruff_format_range(tools_executor, file_path, config, content=content, start=start, end=end)
+
+    max_workers = min(len(ranges), jobs or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outputs = list(executor.map(format_range, ranges))
+    if None in outputs:
+        return False
+
+    replacements = []
+    for output in outputs:
+        if replacement := get_replacement(old_lines, output.splitlines(keepends=True)):
+            replacements.append(replacement)
+    print(f'{len(ranges)} ranges formatted, {len(replacements)} changed', end=' - ')
+
+    if (new_lines := splice_replacements(old_lines, replacements)) is not None:
+        new_content = b''.join(new_lines)
+    else:
+        print('overlapping changes -> format range by range', end=' - ')
+        new_content = content
+        for start, end in reversed(ranges):
+            new_content = ruff_format_range(
+                tools_executor, file_path, config, content=new_content, start=start, end=end
+            )
+            if new_content is None:
+                return False
+
+    if new_content != content:
+        abs_file_path.write_bytes(new_content)
+    print('done.')
+    return True
+
+
+def format_ranges(tools_executor, file_path, config: Config, ranges: list, single_pass: bool = True, jobs: int = 0):
+    if single_pass and len(ranges) > 1:
+        print(f'Apply code formatter to {len(ranges)} changed ranges at once:', end=' ')
+        if format_ranges_single_pass(tools_executor, file_path, config, ranges, jobs=jobs):
+            return
+        print('ruff error -> format range by range.')
+
+    print('Apply code formatter only to changed lines (in reversed order):')
+    for start, end in reversed(ranges):
+        print(f'Processing range: {start} - {end}', end=' - ')
+        tools_executor.verbose_check_call(
+            'ruff',
+            'format',
+            '--target-version',
+            config.py_ver_str,
+            file_path,
+            f'--range={start}-{end}',
+            verbose=False,
+        )
+
+
+def format_diff_ranges(
+    tools_executor,
+    file_path,
+    config: Config,
+    git_diff_output: str,
+    max_distance: int = 1,
+    single_pass: bool = True,  # Format all changed ranges concurrently and write the file only once
+    jobs: int = 0,  # Number of concurrent ruff calls for the single pass, 0 = number of CPUs
+):
     logger.debug('Git diff output: %s', git_diff_output)
     ranges = parse_ranges(git_diff_output)
     print(f'All git diff code ranges: {ranges}')
@@ -241,20 +407,11 @@ def format_only_changed_lines(tools_executor, file_path, config: Config, max_dis
             verbose=False,
         )
     else:
-        print('Apply code formatter only to changed lines (in reversed order):')
         ranges = merge_ranges(ranges, max_distance=max_distance)
-        for start, end in reversed(ranges):
-            print(f'Processing range: {start} - {end}', end=' - ')
-            tools_executor.verbose_check_call(
-                'ruff',
-                'format',
-                '--target-version',
-                config.py_ver_str,
-                file_path,
-                f'--range={start}-{end}',
-                verbose=False,
-            )
+        format_ranges(tools_executor, file_path, config, ranges, single_pass=single_pass, jobs=jobs)
+
 
+def fix_imports(tools_executor, config: Config, *file_paths):
     print('\n\nFix imports and remove unused imports:')
     tools_executor.verbose_check_call(
         'ruff',
@@ -265,25 +422,60 @@ def format_only_changed_lines(tools_executor, file_path, config: Config, max_dis
         'I001,F401',  # I001: Import sorting (from isort) + F401: Unused imports (from pyflakes)
         '--fix',
         '--unsafe-fixes',
-        file_path,
+        *file_paths,
     )
 
 
-def run_file_check(tools_executor, file_path, config: Config):
+def format_only_changed_lines(
+    tools_executor,
+    file_path,
+    config: Config,
+    max_distance: int = 1,
+    single_pass: bool = True,  # Format all changed ranges concurrently and write the file only once
+):
+    # Use darker after v3 release, see: https://github.com/akaihola/darker/milestones
+
+    git: Git = config.git_info.git
+    target = f'origin/{config.main_branch_name}'
+
+    git_diff_output = git.git_verbose_check_output('diff', target, '--unified=0', file_path)
+    format_diff_ranges(tools_executor, file_path, config, git_diff_output, max_distance, single_pass)
+    fix_imports(tools_executor, config, file_path)
+
+
+def split_git_diff(git_diff_output: str) -> dict[str, str]:
+    r"""
+    Split the output of one `git diff` call into the diffs of every file.
+
+    >>> split_git_diff('diff --git a/a.py b/a.py\n@@ -1 +1 @@\ndiff --git a/b.py b/b.py\n@@ -2 +2 @@\n')
+    {'a.py': 'diff --git a/a.py b/a.py\n@@ -1 +1 @@\n', 'b.py': 'diff --git a/b.py b/b.py\n@@ -2 +2 @@\n'}
+    """
+    diffs = {}
+    file_path = None
+    for line in git_diff_output.splitlines(keepends=True):
+        if line.startswith('diff --git '):
+            file_path = line.rstrip('\n').rpartition(' b/')[2]
+            diffs[file_path] = ''
+        if file_path is not None:
+            diffs[file_path] += line
+    return diffs
+
+
+def run_file_check(tools_executor, config: Config, *file_paths):
     tools_executor.verbose_check_call(
         'ruff',
         'check',
         '--target-version',
         config.py_ver_str,
-        file_path,
+        *file_paths,
     )
 
 
-def run_codespell(tools_executor, file_path, config: Config):
-    tools_executor.verbose_check_call('codespell', file_path)
+def run_codespell(tools_executor, config: Config, *file_paths):
+    tools_executor.verbose_check_call('codespell', *file_paths)
 
 
-def run_ty(tools_executor, file_path, config: Config):
+def run_ty(tools_executor, config: Config, *file_paths):
     console = Console()
     if console.color_system:
         # It seems tha "ty" doesn't detect terminal colors properly, but Rich does it well
@@ -291,10 +483,25 @@ def run_ty(tools_executor, file_path, config: Config):
     else:
         extra_args = ()
 
-    tools_executor.verbose_check_call('ty', 'check', *extra_args, str(file_path))
+    tools_executor.verbose_check_call('ty', 'check', *extra_args, *(str(file_path) for file_path in file_paths))
 
 
-def format_one_file(*, config: Config, file_path: Path, max_distance: int, tools_executor: ToolsExecutor):
+def print_changed_info(abs_file_path: Path, old_content: bytes):
+    changed = old_content != abs_file_path.read_bytes()
+    if changed:
+        print(f'[green bold]*** File [blue]{abs_file_path}[/blue] successfully updated. ***')
+    else:
+        print(f'[green bold]*** File [blue]{abs_file_path}[/blue] needs to changes, ok. ***')
+
+
+def format_one_file(
+    *,
+    config: Config,
+    file_path: Path,
+    max_distance: int,
+    tools_executor: ToolsExecutor,
+    single_pass: bool = True,
+):
     if file_path.suffix.lower() != '.py':
         print('Skip non-Python file ;)')
         return
@@ -309,22 +516,127 @@ def format_one_file(*, config: Config, file_path: Path, max_distance: int, tools
 
     if config.main_branch_name:
         # We have a Git repository, so we can format only changed lines
-        format_only_changed_lines(tools_executor, file_path, config, max_distance=max_distance)
+        format_only_changed_lines(tools_executor, file_path, config, max_distance=max_distance, single_pass=single_pass)
     else:
         # Run full formatting the whole file
         format_complete_file(tools_executor, file_path, config)
 
-    run_file_check(tools_executor, file_path, config)
-    run_codespell(tools_executor, file_path, config)
-    run_ty(tools_executor, file_path, config)
+    run_file_check(tools_executor, config, file_path)
+    run_codespell(tools_executor, config, file_path)
+    run_ty(tools_executor, config, file_path)
 
     print('\n')
 
-    changed = old_content != abs_file_path.read_bytes()
-    if changed:
-        print(f'[green bold]*** File [blue]{abs_file_path}[/blue] successfully updated. ***')
+    print_changed_info(abs_file_path, old_content)
+
+
+class CapturingToolsExecutor(ToolsExecutor):
+    """
+    Print the tool output via Python, so that the output of a worker process can be captured.
+    """
+
+    def verbose_check_call(self, *args, **kwargs):
+        try:
+            output = self.verbose_check_output(*args, **kwargs)
+        except subprocess.CalledProcessError:
+            pass  # Info print with the output is already done
+        else:
+            sys.stdout.write(output)
+
+
+def format_file_changes(
+    file_info: tuple[Path, str | None],  # File path relative to the project root + git diff output
+    *,
+    config: Config,
+    max_distance: int,
+    single_pass: bool,
+    jobs: int,  # Number of concurrent ruff calls in this worker
+) -> str:
+    """
+    Format one file in a worker process and return the captured output.
+    Without a git diff output the complete file will be formatted.
+    """
+    file_path, git_diff_output = file_info
+    output = io.StringIO()
+    with redirect_stdout(output), redirect_stderr(output):
+        print(f'\n\nFormat changes in: {file_path}')
+        tools_executor = CapturingToolsExecutor(cwd=config.project_root_path)
+        if git_diff_output is None:
+            format_complete_file(tools_executor, file_path, config)
+        else:
+            format_diff_ranges(tools_executor, file_path, config, git_diff_output, max_distance, single_pass, jobs)
+    return output.getvalue()
+
+
+def format_changed_files(
+    *,
+    config: Config,
+    tools_executor: ToolsExecutor,
+    max_distance: int,
+    single_pass: bool = True,
+    jobs: int = 0,  # Number of worker processes, 0 = number of CPUs
+):
+    """
+    Format all changed files of the git repository:
+    Get all diffs with one git call, format the files in parallel
+    and run the checks once with all files.
+    """
+    print('\n\nFormat all changed files...')
+    git: Git = config.git_info.git
+    cwd = config.project_root_path
+
+    file_paths = []
+    for abs_file_path in git.changed_files(verbose=False):
+        if abs_file_path.suffix.lower() != '.py':
+            print(f'Skip non-Python file: {abs_file_path}')
+        elif not abs_file_path.is_file():
+            print(f'Skip removed file: {abs_file_path}')
+        else:
+            file_paths.append(abs_file_path.relative_to(cwd))
+    if not file_paths:
+        print('No changed Python files, ok.')
+        return
+
+    old_contents = {file_path: Path(cwd, file_path).read_bytes() for file_path in file_paths}
+
+    if config.main_branch_name:
+        # We have a Git repository, so we can format only changed lines
+        target = f'origin/{config.main_branch_name}'
+        git_diff_output = git.git_verbose_check_output('diff', '--no-renames', target, '--unified=0', '--', *file_paths)
+        diffs = split_git_diff(git_diff_output)
+        file_infos = [(file_path, diffs.get(file_path.as_posix(), '')) for file_path in file_paths]
     else:
-        print(f'[green bold]*** File [blue]{abs_file_path}[/blue] needs to changes, ok. ***')
+        file_infos = [(file_path, None) for file_path in file_paths]
+
+    # Split the jobs between the worker processes and the concurrent ruff calls of each worker,
+    # so that never more than `jobs` ruff processes run at the same time:
+    jobs = jobs or os.cpu_count() or 1
+    workers = min(jobs, len(file_infos))
+    worker = partial(
+        format_file_changes,
+        config=config,
+        max_distance=max_distance,
+        single_pass=single_pass,
+        jobs=jobs // workers,
+    )
+    if workers == 1:
+        for file_info in file_infos:
+            sys.stdout.write(worker(file_info))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for output in executor.map(worker, file_infos):
+                sys.stdout.write(output)
+
+    if config.main_branch_name:
+        fix_imports(tools_executor, config, *file_paths)
+
+    run_file_check(tools_executor, config, *file_paths)
+    run_codespell(tools_executor, config, *file_paths)
+    run_ty(tools_executor, config, *file_paths)
+
+    print('\n')
+    for file_path, old_content in old_contents.items():
+        print_changed_info(Path(cwd, file_path), old_content)
 
 
 def format_sources(
@@ -333,29 +645,29 @@ def format_sources(
     default_min_py_version: str,
     default_max_line_length: int,
     max_distance: int = 1,
+    jobs: int = 0,  # Number of worker processes to format changed files of a directory, 0 = number of CPUs
+    config: Config | None = None,  # e.g.: a cached config from the format-file server
+    tools_executor: ToolsExecutor | None = None,  # e.g.: CapturingToolsExecutor to capture the tool output
 ) -> None:
     file_path = file_path.resolve()
     print(f'\nApply code formatter to: {file_path}')
 
-    config = get_config(
-        file_path,
-        default_min_py_version=default_min_py_version,
-        default_max_line_length=default_max_line_length,
-    )
-    tools_executor = ToolsExecutor(cwd=config.project_root_path)
+    if config is None:
+        config = get_config(
+            file_path,
+            default_min_py_version=default_min_py_version,
+            default_max_line_length=default_max_line_length,
+        )
+    if tools_executor is None:
+        tools_executor = ToolsExecutor(cwd=config.project_root_path)
 
     if file_path.is_dir():
-        print('\n\nFormat all changed files...')
-        git: Git = config.git_info.git
-        changed_files = git.changed_files(verbose=False)
-        for file_path in changed_files:
-            print(f'\n\nFormat changes in: {file_path=}')
-            format_one_file(
-                config=config,
-                file_path=file_path,
-                max_distance=max_distance,
-                tools_executor=tools_executor,
-            )
+        format_changed_files(
+            config=config,
+            tools_executor=tools_executor,
+            max_distance=max_distance,
+            jobs=jobs,
+        )
     else:
         format_one_file(
             config=config,
@@ -0,0 +1,84 @@
+"""
+    Thin client for the "format-file-server".
+
+    Imports only the standard library, so an editor "on save" action doesn't pay
+    for the imports of the formatter code on every call.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import stat
+import sys
+import tempfile
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_ACTION = 'format'
+STOP_ACTION = 'stop'
+
+
+def get_socket_path() -> Path:
+    """
+    Default Unix socket path of the format-file server: Only accessible by the current user.
+    Without $XDG_RUNTIME_DIR the socket is in a private directory in the shared temp directory.
+    Raises PermissionError if this directory is not private, e.g.: created by a other user.
+    """
+    uid = os.getuid()
+    if runtime_dir := os.environ.get('XDG_RUNTIME_DIR'):
+        return Path(runtime_dir, f'manageprojects-format-file-{uid}.sock')
+
+    private_dir = Path(tempfile.gettempdir(), f'manageprojects-{uid}')
+    with contextlib.suppress(FileExistsError):
+        private_dir.mkdir(mode=0o700)
+    dir_stat = private_dir.lstat()
+    if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != uid or dir_stat.st_mode & 0o077:
+        raise PermissionError(f'Directory {private_dir} is not private to the current user (uid {uid})')
+    return private_dir / 'format-file.sock'
+
+
+def send_request(socket_path: Path, request: dict) -> dict:
+    """
+    Send one JSON request to the server and return the JSON response.
+    Raises FileNotFoundError or ConnectionRefusedError if no server is running.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(request).encode())
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile('rb') as file:
+            return json.loads(file.read())
+
+
+def format_via_server(
+    *,
+    socket_path: Path,
+    file_path: Path,
+    default_min_py_version: str,
+    default_max_line_length: int,
+    max_distance: int,
+    jobs: int,
+) -> bool:
+    """
+    Let a running format-file server format the file and print its output.
+    Returns False if no server is running.
+    """
+    request = {
+        'action': FORMAT_ACTION,
+        'file_path': str(file_path.resolve()),
+        'default_min_py_version': default_min_py_version,
+        'default_max_line_length': default_max_line_length,
+        'max_distance': max_distance,
+        'jobs': jobs,
+    }
+    try:
+        response = send_request(socket_path, request)
+    except (FileNotFoundError, ConnectionRefusedError) as err:
+        logger.info('No format-file server at %s: %s', socket_path, err)
+        return False
+    sys.stdout.write(response['output'])
+    return True
@@ -0,0 +1,194 @@
+"""
+    Long-lived "format-file" server on a Unix socket.
+
+    Collecting the Config (git root, main branch name, pyproject.toml, EditorConfig)
+    costs more than formatting a small change. The server caches the Config per directory
+    and collects it again only if one of the project meta files has been changed on disk.
+"""
+
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from rich import print
+
+from manageprojects.format_file import CapturingToolsExecutor, Config, format_sources, get_config
+from manageprojects.format_file_client import FORMAT_ACTION, STOP_ACTION, send_request
+from manageprojects.utilities.pyproject_toml import clear_pyproject_toml_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_mtime_ns(file_path: Path) -> int | None:
+    try:
+        return file_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_config_stamps(directory: Path, config: Config) -> tuple:
+    """
+    Modification times of all files the Config depends on. Missing files are included,
+    so that e.g. a new pyproject.toml in a sub directory invalidates the cached Config, too.
+    """
+    project_root = config.project_root_path
+    file_paths = []
+    for path in (directory, *directory.parents):
+        file_paths.append(path / '.editorconfig')
+        if project_root is None or path.is_relative_to(project_root):
+            file_paths.append(path / 'pyproject.toml')
+    if config.git_info:
+        file_paths.append(config.git_info.git.cwd / '.git' / 'HEAD')
+    return tuple((file_path, get_mtime_ns(file_path)) for file_path in file_paths)
+
+
+class ConfigCache:
+    """
+    Cache the Config per directory, validated by the modification times of the project meta files.
+    """
+
+    def __init__(self):
+        self.entries: dict[tuple, tuple[tuple, Config]] = {}
+
+    def get_config(self, file_path: Path, default_min_py_version: str, default_max_line_length: int) -> Config:
+        directory = file_path if file_path.is_dir() else file_path.parent
+        key = (directory, default_min_py_version, default_max_line_length)
+        if entry := self.entries.get(key):
+            stamps, config = entry
+            if get_config_stamps(directory, config) == stamps:
+                print(f'Use cached config for: {directory}')
+                return config
+            print(f'Project meta files changed -> collect config for: {directory}')
+            clear_pyproject_toml_cache(config.project_root_path)
+
+        config = get_config(
+            file_path,
+            default_min_py_version=default_min_py_version,
+            default_max_line_length=default_max_line_length,
+        )
+        self.entries[key] = (get_config_stamps(directory, config), config)
+        return config
+
+
+class FormatFileRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handle one JSON request and send the captured output back as JSON response.
+    """
+
+    server: 'FormatFileServer'
+
+    def handle(self):
+        request = json.loads(self.rfile.read())
+        action = request.pop('action')
+        if action == STOP_ACTION:
+            self.server.stop_requested = True
+            output = 'format-file server stopped.\n'
+        elif action == FORMAT_ACTION:
+            output = self.server.format_sources(**request)
+        else:
+            output = f'Unknown action: {action!r}\n'
+        self.wfile.write(json.dumps({'output': output}).encode())
+
+
+class FormatFileServer(socketserver.UnixStreamServer):
+    """
+    Handles the requests one after another, because the output is captured
+    by redirecting stdout/stderr of the whole process.
+    """
+
+    def __init__(self, socket_path: Path, idle_timeout: float = 0):
+        super().__init__(str(socket_path), FormatFileRequestHandler)
+        self.timeout = idle_timeout or None
+        self.config_cache = ConfigCache()
+        self.stop_requested = False
+
+    def handle_timeout(self):
+        logger.info('No request in the last %s seconds -> stop server', self.timeout)
+        self.stop_requested = True
+
+    def format_sources(
+        self,
+        *,
+        file_path: str,
+        default_min_py_version: str,
+        default_max_line_length: int,
+        max_distance: int,
+        jobs: int,
+    ) -> str:
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                config = self.config_cache.get_config(
+                    Path(file_path),
+                    default_min_py_version=default_min_py_version,
+                    default_max_line_length=default_max_line_length,
+                )
+                format_sources(
+                    file_path=Path(file_path),
+                    default_min_py_version=default_min_py_version,
+                    default_max_line_length=default_max_line_length,
+                    max_distance=max_distance,
+                    jobs=jobs,
+                    config=config,
+                    # The tools must print via Python, otherwise their output goes to the fd of the server:
+                    tools_executor=CapturingToolsExecutor(cwd=config.project_root_path),
+                )
+            except Exception:  # noqa: BLE001
+                # Send the error to the client and keep the server running
+                sys.stdout.write(traceback.format_exc())
+        return output.getvalue()
+
+    def serve_until_stopped(self):
+        while not self.stop_requested:
+            self.handle_request()
+
+
+def is_server_running(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+def run_server(socket_path: Path, idle_timeout: float = 0) -> None:
+    """
+    Serve format requests on `socket_path` until a stop request or `idle_timeout` seconds without a request.
+    """
+    if is_server_running(socket_path):
+        print(f'format-file server is already running on: {socket_path}')
+        return
+    socket_path.unlink(missing_ok=True)  # Left over from a killed server
+
+    old_umask = os.umask(0o177)  # Create the socket only accessible by the current user
+    try:
+        server = FormatFileServer(socket_path, idle_timeout=idle_timeout)
+    finally:
+        os.umask(old_umask)
+
+    with server:
+        print(f'format-file server listening on: {socket_path}')
+        try:
+            server.serve_until_stopped()
+        except KeyboardInterrupt:
+            print('Stopped by user.')
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def stop_server(socket_path: Path) -> None:
+    try:
+        response = send_request(socket_path, {'action': STOP_ACTION})
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f'No format-file server running on: {socket_path}')
+    else:
+        print(response['output'], end='')
@@ -16,16 +16,21 @@ Licensed under GPL-3.0-or-later (Feel free to copy and use it in your project)
 from __future__ import annotations
 
 import argparse
+import dataclasses
+import filecmp
 import hashlib
+import json
 import logging
 import os
 import re
 import shlex
 import shutil
 import ssl
+import statistics
 import subprocess
 import sys
 import tempfile
+import time
 import urllib.request
 from pathlib import Path
 
@@ -65,6 +70,61 @@ DEFAULT_INSTALL_PREFIX = '/usr/local'
 
 TEMP_PREFIX = 'setup_python_'
 
+"""DocWrite: install_python.md ## Download cache
+The verified downloads are stored in a persistent cache directory and reused in the next runs.
+Default is `~/.cache/manageprojects/python/` (or `$XDG_CACHE_HOME/manageprojects/python/`).
+The cache directory can be shared, e.g.: on a volume of many CI runners.
+Only downloads verified with the GPG signature are stored in the cache.
+The least recently used entries will be removed, if the cache is bigger than `--cache-max-size`."""
+DEFAULT_CACHE_PATH = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'manageprojects' / 'python'
+DEFAULT_CACHE_MAX_SIZE_MB = 2048
+CACHE_TEMP_MAX_AGE = 24 * 60 * 60  # Remove stale temp directories after one day
+
+"""DocWrite: install_python.md ## Build cache
+With `--build-cache` a persistent build directory per major version is used, in:
+`~/.cache/manageprojects/python-build/` (or `$XDG_CACHE_HOME/manageprojects/python-build/`)
+
+* Only changed source files are copied into the build directory, so `make` rebuilds only what has changed.
+* Source files that are removed in a new release are removed from the build directory, too.
+* The `./configure` results are cached in a `--cache-file` keyed by the Python version and the configure flags.
+* If `ccache` is installed, it will be used as compiler wrapper (if `CC` doesn't use it already).
+
+A retry after a failed build continues in the same directory.
+Note: The PGO build (`--enable-optimizations`) always runs the profiling, but `ccache` speeds up the compile steps."""
+DEFAULT_BUILD_CACHE_PATH = DEFAULT_CACHE_PATH.parent / 'python-build'
+SOURCES_MANIFEST_NAME = '.install_python_sources.json'  # Source files of the last sync into the build directory
+
+
+@dataclasses.dataclass(frozen=True)
+class BuildProfile:
+    configure_args: tuple
+    profile_task: str | None  # PGO training run: None == no PGO, '' == CPython default, "{jobs}" will be replaced
+
+
+"""DocWrite: install_python.md ## Build profiles
+The build profile can be selected with `--profile`:
+
+* `fast`: No PGO and no LTO, for a quick build (e.g.: in CI)
+* `balanced`: PGO with a parallel training run (`PROFILE_TASK="-m test --pgo --timeout=$(TESTTIMEOUT) -j{jobs}"`)
+* `max`: PGO with the default (serial) training run and LTO (`--with-lto`)
+
+`--jobs` sets the parallelism of `make` and the training run (default: number of CPUs).
+`--profile-task` overwrites the PGO training run of the profile. It can't be used with the `fast` profile.
+
+The build time and the startup time of the new interpreter (like the `python_startup` benchmark
+of pyperformance) are stored per profile in `pythonX.XX.build-info.json` and a comparison is displayed."""
+BUILD_PROFILES = {
+    'fast': BuildProfile(configure_args=(), profile_task=None),
+    'balanced': BuildProfile(
+        configure_args=('--enable-optimizations',),
+        # Keep the timeout of the CPython default, so a hanging test can't stall the training run:
+        profile_task='-m test --pgo --timeout=$(TESTTIMEOUT) -j{jobs}',
+    ),
+    'max': BuildProfile(configure_args=('--enable-optimizations', '--with-lto'), profile_task=''),
+}
+DEFAULT_BUILD_PROFILE = 'balanced'
+STARTUP_REPEAT = 20
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,6 +146,79 @@ class TemporaryDirectory:
             return False
 
 
+class DownloadCache:
+    """
+    Persistent cache of verified downloads, keyed by URL (and expected hash).
+    Every entry is a directory with one file. It's created in a temp directory and renamed,
+    so concurrent runs (e.g.: on a shared volume) never see a half written entry.
+    """
+
+    def __init__(self, path: Path, max_size: int):
+        self.path = path
+        self.max_size = max_size
+
+    def get_key(self, url: str, hash_value: str) -> str:
+        return hashlib.sha256(f'{url}\n{hash_value}'.encode()).hexdigest()[:32]
+
+    def get(self, url: str, hash_value: str = '') -> Path | None:
+        entry_path = self.path / self.get_key(url, hash_value)
+        file_path = entry_path / Path(url).name
+        if not file_path.is_file():
+            return None
+        logger.info('Use cached %s', file_path)
+        os.utime(entry_path)  # Mark as recently used for pruning
+        return file_path
+
+    def put(self, url: str, file_path: Path, hash_value: str = '') -> Path:
+        """
+        Move the verified `file_path` into the cache and returns the new path.
+        """
+        entry_path = self.path / self.get_key(url, hash_value)
+        temp_path = Path(tempfile.mkdtemp(prefix='.tmp_', dir=self.path))
+        shutil.move(file_path, temp_path / Path(url).name)
+        try:
+            temp_path.rename(entry_path)
+        except OSError:
+            logger.info('Cache entry %s was created in the meantime', entry_path)
+            shutil.rmtree(temp_path)
+        else:
+            logger.info('Stored %s in cache %s', url, entry_path)
+        self.prune(keep=entry_path)
+        return entry_path / Path(url).name
+
+    def prune(self, keep: Path) -> None:
+        """
+        Remove the least recently used entries, until the cache size is below the limit.
+        Concurrent runs may remove the same entries at the same time.
+        """
+        now = time.time()
+        for stale_path in self.path.glob('.tmp_*'):
+            try:
+                if now - stale_path.stat().st_mtime > CACHE_TEMP_MAX_AGE:
+                    shutil.rmtree(stale_path, ignore_errors=True)
+            except FileNotFoundError:
+                pass  # Removed by a concurrent run in the meantime
+
+        entries = []
+        for entry_path in self.path.iterdir():
+            if entry_path.is_dir() and not entry_path.name.startswith('.'):
+                try:
+                    size = sum(item.stat().st_size for item in entry_path.iterdir())
+                    mtime = entry_path.stat().st_mtime
+                except FileNotFoundError:
+                    continue  # Removed by a concurrent run in the meantime
+                entries.append((mtime, size, entry_path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if entry_path != keep:
+                logger.info('Remove old cache entry %s (%i Bytes)', entry_path, size)
+                shutil.rmtree(entry_path, ignore_errors=True)
+                total_size -= size
+
+
 def fetch(url: str) -> bytes:
     """DocWrite: install_python.md # Install Python Interpreter
     Download only over verified HTTPS connection."""
@@ -121,15 +254,154 @@ def run(args, check=True, **kwargs):
     return subprocess.run(args, check=check, **kwargs)
 
 
-def run_build_step(args, *, step: str, cwd: Path) -> None:
+def run_build_step(args, *, step: str, cwd: Path, env: dict | None = None) -> float:
+    """
+    Run one build step with the output in a temp file and returns the duration in seconds.
+    """
     with tempfile.NamedTemporaryFile(prefix=f'{TEMP_PREFIX}_{step}_', suffix='.txt', delete=False) as temp_file:
         logger.info('Running: %s... Output in %s', shlex.join(str(arg) for arg in args), temp_file.name)
+        start_time = time.monotonic()
         try:
-            subprocess.run(args, stdout=temp_file, stderr=temp_file, check=True, cwd=cwd)
+            subprocess.run(args, stdout=temp_file, stderr=temp_file, check=True, cwd=cwd, env=env)
         except subprocess.SubprocessError as err:
             logger.error('Failed to run %s step: %s', step, err)
             run(['tail', temp_file.name])
             raise
+    duration = time.monotonic() - start_time
+    logger.info('%s step done in %.1f sec.', step, duration)
+    return duration
+
+
+def sync_sources(src_path: Path, dst_path: Path) -> int:
+    """
+    Copy all new and changed files from src_path into dst_path and returns the number of changed files.
+    Unchanged files keep their modification time, so "make" doesn't rebuild them.
+    Source files of the previous sync, that are not in src_path anymore, will be removed.
+    All other files in dst_path (the build outputs) are kept.
+    """
+    manifest_path = dst_path / SOURCES_MANIFEST_NAME
+    try:
+        old_files = set(json.loads(manifest_path.read_text()))
+    except (OSError, ValueError):
+        old_files = set()
+
+    count = 0
+    new_files = set()
+    for src_file_path in src_path.rglob('*'):
+        rel_path = src_file_path.relative_to(src_path)
+        dst_file_path = dst_path / rel_path
+        if src_file_path.is_dir():
+            dst_file_path.mkdir(exist_ok=True)
+            continue
+        new_files.add(rel_path.as_posix())
+        if not dst_file_path.is_file() or not filecmp.cmp(src_file_path, dst_file_path, shallow=False):
+            shutil.copyfile(src_file_path, dst_file_path)  # New modification time
+            shutil.copymode(src_file_path, dst_file_path)
+            count += 1
+
+    for rel_path in sorted(old_files - new_files):
+        dst_file_path = dst_path / rel_path
+        logger.info('Remove %s: Not in the new source tree', dst_file_path)
+        if dst_file_path.is_file():
+            dst_file_path.unlink()
+        count += 1
+        # Remove directories of removed packages, too:
+        for parent in dst_file_path.parents:
+            if parent == dst_path or not parent.is_dir() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+    manifest_path.write_text(json.dumps(sorted(new_files)))
+    return count
+
+
+def get_build_env(*, use_ccache: bool) -> dict:
+    env = dict(os.environ)
+    if use_ccache and (ccache_bin := shutil.which('ccache')):
+        compiler = env.get('CC') or ('gcc' if shutil.which('gcc') else 'cc')
+        if Path(shlex.split(compiler)[0]).name == 'ccache':
+            logger.info('Compiler %r uses ccache already', compiler)
+        else:
+            logger.info('Use %s as compiler wrapper for %s', ccache_bin, compiler)
+            env['CC'] = f'{ccache_bin} {compiler}'
+    return env
+
+
+def get_configure_cache_file(*, build_path: Path, version: str, configure_args: list, env: dict) -> Path:
+    """
+    Autoconf cache file for the Python version and the configure flags,
+    because "./configure" refuses a cache with other flags and a other release may need other checks.
+    """
+    key = json.dumps([version, configure_args, env.get('CC'), env.get('CFLAGS'), env.get('LDFLAGS')])
+    return build_path / f'config-{hashlib.sha256(key.encode()).hexdigest()[:16]}.cache'
+
+
+def get_build_args(*, profile: BuildProfile, jobs: int, profile_task: str | None = None) -> tuple[list, list]:
+    """
+    Returns the "./configure" and "make" arguments for a build profile.
+
+    >>> get_build_args(profile=BUILD_PROFILES['fast'], jobs=4)
+    (['./configure'], ['make', '-j4'])
+    >>> get_build_args(profile=BUILD_PROFILES['balanced'], jobs=4)[1]
+    ['make', '-j4', 'PROFILE_TASK=-m test --pgo --timeout=$(TESTTIMEOUT) -j4']
+    >>> get_build_args(profile=BUILD_PROFILES['max'], jobs=2, profile_task='-m test --pgo test_re')
+    (['./configure', '--enable-optimizations', '--with-lto'], ['make', '-j2', 'PROFILE_TASK=-m test --pgo test_re'])
+    >>> get_build_args(profile=BUILD_PROFILES['fast'], jobs=4, profile_task='-m test --pgo test_re')
+    Traceback (most recent call last):
+    ...
+    ValueError: A PGO training run can't be used with a build profile without PGO
+    """
+    if profile_task and profile.profile_task is None:
+        raise ValueError("A PGO training run can't be used with a build profile without PGO")
+
+    configure_args = ['./configure', *profile.configure_args]
+    make_args = ['make', f'-j{jobs}']
+    if profile_task is None:
+        profile_task = profile.profile_task
+    if profile_task:
+        make_args.append(f'PROFILE_TASK={profile_task.format(jobs=jobs)}')
+    return configure_args, make_args
+
+
+def get_startup_time(python_bin: str | Path, repeat: int = STARTUP_REPEAT) -> float:
+    """
+    Median startup time of `python -c pass` in milliseconds, like the "python_startup" benchmark of pyperformance.
+    """
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([python_bin, '-c', 'pass'], check=True)
+        durations.append(time.perf_counter() - start_time)
+    return statistics.median(durations) * 1000
+
+
+def update_build_info(info_path: Path, *, profile_name: str, info: dict) -> dict:
+    """
+    Store the current build info and keep the build/startup time of all profiles for a comparison.
+    """
+    try:
+        old_info = json.loads(info_path.read_text())
+    except (OSError, ValueError):
+        old_info = {}
+    profiles = old_info.get('profiles', {})
+    profiles[profile_name] = {
+        'version': info['version'],
+        'build_time': info['build_time'],
+        'startup_ms': info['startup_ms'],
+    }
+    info = {**info, 'profile': profile_name, 'profiles': profiles}
+    info_path.write_text(json.dumps(info, indent=4))
+    return info
+
+
+def print_profile_comparison(profiles: dict) -> None:
+    print('Build profile comparison:', file=sys.stderr)
+    for name, data in sorted(profiles.items(), key=lambda item: item[1]['build_time']):
+        print(
+            f'  {name:>8}: build {data["build_time"]:8.1f} sec.'
+            f' - startup {data["startup_ms"]:6.1f} ms (Python {data["version"]})',
+            file=sys.stderr,
+        )
 
 
 def get_python_version(python_bin: str | Path) -> str | None:
@@ -149,11 +421,12 @@ def download2temp(*, temp_path: Path, base_url: str, filename: str) -> Path:
     return dst_path
 
 
-def verify_download(*, major_version: str, tar_file_path: Path, asc_file_path: Path, delete_temp: bool):
+def verify_download(*, major_version: str, tar_file_path: Path, asc_file_path: Path, delete_temp: bool) -> bool:
     """DocWrite: install_python.md ## Workflow - 5. Verify download
     The sha256 hash downloaded tar archive will logged.
     If `gpg` is available, the signature will be verified.
     """
+    # Returns True if the GPG signature was verified
     hash_obj = hashlib.sha256(tar_file_path.read_bytes())
     logger.info('Downloaded sha256: %s', hash_obj.hexdigest())
 
@@ -170,8 +443,10 @@ def verify_download(*, major_version: str, tar_file_path: Path, asc_file_path: P
             run([gpg_bin, '--keyserver', GPG_KEY_SERVER, '--recv-keys', gpg_key_id], check=True, env=env)
             run([gpg_bin, '--verify', asc_file_path, tar_file_path], check=True, env=env)
             run(['gpgconf', '--kill', 'all'], check=True, env=env)
+        return True
     else:
         logger.warning('No GPG verification possible! (gpg not found)')
+        return False
 
 
 def install_python(
@@ -179,6 +454,12 @@ def install_python(
     *,
     write_check: bool = True,
     delete_temp: bool = True,
+    cache_path: Path | None = DEFAULT_CACHE_PATH,  # None == don't use the download cache
+    cache_max_size: int = DEFAULT_CACHE_MAX_SIZE_MB * 1024 * 1024,
+    build_cache_path: Path | None = None,  # None == build in the temporary directory
+    profile_name: str = DEFAULT_BUILD_PROFILE,  # Key of BUILD_PROFILES
+    jobs: int | None = None,  # Parallel jobs for "make" and the PGO training run, None == number of CPUs
+    profile_task: str | None = None,  # Overwrite the PGO training run of the profile
 ) -> Path:
     logger.info('Requested major Python version: %s', major_version)
 
@@ -230,58 +511,116 @@ def install_python(
     The download will be done in a temporary directory. The directory will be deleted after the installation.
     This can be skipped via CLI argument. The directory will be prefixed with:
     DocWriteMacro: manageprojects.tests.docwrite_macros_install_python.temp_prefix"""
+    if cache_path:
+        cache_path.mkdir(parents=True, exist_ok=True)
+        cache = DownloadCache(cache_path, max_size=cache_max_size)
+    else:
+        cache = None
+
     with TemporaryDirectory(prefix=TEMP_PREFIX, delete=delete_temp) as temp_path:
         base_url = f'{PY_FTP_INDEX_URL}{py_required_version}'
 
         tar_filename = f'Python-{py_required_version}.tar.xz'
         asc_filename = f'{tar_filename}.asc'
-        asc_file_path = download2temp(
-            temp_path=temp_path,
-            base_url=base_url,
-            filename=asc_filename,
-        )
-        tar_file_path = download2temp(
-            temp_path=temp_path,
-            base_url=base_url,
-            filename=tar_filename,
-        )
-        verify_download(
-            major_version=major_version,
-            tar_file_path=tar_file_path,
-            asc_file_path=asc_file_path,
-            delete_temp=delete_temp,
-        )
+        tar_url = f'{base_url}/{tar_filename}'
+        asc_url = f'{base_url}/{asc_filename}'
+        if cache and (tar_file_path := cache.get(tar_url)) and cache.get(asc_url):
+            """DocWrite: install_python.md ## Workflow - 4. Download Python sources
+            An already verified download from the cache will be used without a new download."""
+            logger.info('Use verified Python sources from cache')
+        else:
+            asc_file_path = download2temp(
+                temp_path=temp_path,
+                base_url=base_url,
+                filename=asc_filename,
+            )
+            tar_file_path = download2temp(
+                temp_path=temp_path,
+                base_url=base_url,
+                filename=tar_filename,
+            )
+            verified = verify_download(
+                major_version=major_version,
+                tar_file_path=tar_file_path,
+                asc_file_path=asc_file_path,
+                delete_temp=delete_temp,
+            )
+            if cache and verified:
+                cache.put(asc_url, asc_file_path)
+                tar_file_path = cache.put(tar_url, tar_file_path)
 
         tar_bin = shutil.which('tar')
         logger.debug('Extracting %s with ...', tar_file_path)
         run([tar_bin, 'xf', tar_file_path], check=True, cwd=temp_path)
         extracted_dir = temp_path / f'Python-{py_required_version}'
 
+        configure_args, make_args = get_build_args(
+            profile=BUILD_PROFILES[profile_name],
+            jobs=jobs or os.cpu_count() or 1,
+            profile_task=profile_task,
+        )
+        logger.info('Use build profile %r', profile_name)
+        env = get_build_env(use_ccache=build_cache_path is not None)
+        if build_cache_path:
+            build_path = build_cache_path / f'python{major_version}'
+            build_path.mkdir(parents=True, exist_ok=True)
+            count = sync_sources(extracted_dir, build_path)
+            logger.info('%i source files changed in build directory %s', count, build_path)
+            extracted_dir = build_path
+            configure_cache = get_configure_cache_file(
+                build_path=build_path,
+                version=py_required_version,
+                configure_args=configure_args,
+                env=env,
+            )
+            configure_args.append(f'--cache-file={configure_cache}')
+
         logger.info('Building Python %s (may take a while)...', py_required_version)
 
         """DocWrite: install_python.md ## Workflow - 6. Build and install Python
         If the verify passed, the script will start the build process."""
-        run_build_step(
-            ['./configure', '--enable-optimizations'],
+        timings = {}
+        timings['configure'] = run_build_step(
+            configure_args,
             step='configure',
             cwd=extracted_dir,
+            env=env,
         )
-        run_build_step(
-            ['make', f'-j{os.cpu_count()}'],
+        timings['make'] = run_build_step(
+            make_args,
             step='make',
             cwd=extracted_dir,
+            env=env,
         )
 
         """DocWrite: install_python.md ## Workflow - 6. Build and install Python
-        The installation will be done with `make altinstall`."""
-        run_build_step(
+        The installation will be done with `make altinstall`.
+        Build information and the duration of every build step are stored next to the interpreter in:
+        `pythonX.XX.build-info.json`"""
+        timings['altinstall'] = run_build_step(
             ['make', 'altinstall'],
             step='install',
             cwd=extracted_dir,
+            env=env,
         )
 
     logger.info('Python %s installed to %s', py_required_version, local_python_path)
 
+    # Store build information and the duration of every build step next to the interpreter:
+    info_path = local_python_path.with_name(f'{local_python_path.name}.build-info.json')
+    info = {
+        'version': py_required_version,
+        'configure_args': configure_args,
+        'make_args': make_args,
+        'cc': env.get('CC'),
+        'build_cache': str(build_cache_path) if build_cache_path else None,
+        'timings': {step: round(duration, 1) for step, duration in timings.items()},
+        'build_time': round(sum(timings.values()), 1),
+        'startup_ms': round(get_startup_time(local_python_path), 2),
+    }
+    info = update_build_info(info_path, profile_name=profile_name, info=info)
+    print_profile_comparison(info['profiles'])
+
     local_python_version = get_python_version(local_python_path)
     assert local_python_version == py_required_version, f'{local_python_version} is not {py_required_version}'
 
@@ -327,12 +666,53 @@ def get_parser() -> argparse.ArgumentParser:
         action='store_true',
         help='Skip the test for write permission to /usr/local/bin',
     )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=argparse.SUPPRESS,  # Don't add the user specific default path to the help text
+        help='Directory to cache the verified downloads (default: ~/.cache/manageprojects/python/)',
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=int,
+        default=DEFAULT_CACHE_MAX_SIZE_MB,
+        help='Max. size of the download cache in MB, the oldest entries will be removed',
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not use the download cache',
+    )
+    parser.add_argument(
+        '--build-cache',
+        action='store_true',
+        help='Build in a persistent directory per major version, with cached configure results and ccache',
+    )
+    parser.add_argument(
+        '--profile',
+        choices=sorted(BUILD_PROFILES.keys()),
+        default=DEFAULT_BUILD_PROFILE,
+        help='Build profile: "fast" (no PGO/LTO), "balanced" (PGO, parallel training) or "max" (PGO + LTO)',
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=argparse.SUPPRESS,  # Don't add the machine specific CPU count to the help text
+        help='Parallel jobs for "make" and the PGO training run (default: number of CPUs)',
+    )
+    parser.add_argument(
+        '--profile-task',
+        default=argparse.SUPPRESS,
+        help='Overwrite the PGO training run of a profile with PGO, e.g.: "-m test --pgo test_re"',
+    )
     return parser
 
 
 def main() -> Path:
     parser = get_parser()
     args = parser.parse_args()
+    if getattr(args, 'profile_task', None) and BUILD_PROFILES[args.profile].profile_task is None:
+        parser.error(f'--profile-task can not be used with the "{args.profile}" profile, because it has no PGO')
     verbose2level = {0: logging.WARNING, 1: logging.INFO, 2: logging.DEBUG}
     logging.basicConfig(
         level=verbose2level.get(args.verbose, logging.DEBUG),
@@ -344,6 +724,12 @@ def main() -> Path:
         major_version=args.major_version,
         write_check=not args.skip_write_check,
         delete_temp=not args.skip_temp_deletion,
+        cache_path=None if args.no_cache else getattr(args, 'cache_dir', DEFAULT_CACHE_PATH),
+        cache_max_size=args.cache_max_size * 1024 * 1024,
+        build_cache_path=DEFAULT_BUILD_CACHE_PATH if args.build_cache else None,
+        profile_name=args.profile,
+        jobs=getattr(args, 'jobs', None),
+        profile_task=getattr(args, 'profile_task', None),
     )
 
 
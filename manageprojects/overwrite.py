@@ -1,6 +1,4 @@
-import filecmp
 import logging
-import shutil
 import sys
 from pathlib import Path
 
@@ -10,12 +8,16 @@ from rich import print
 
 from manageprojects.cookiecutter_api import execute_cookiecutter
 from manageprojects.data_classes import OverwriteResult
+from manageprojects.utilities.file_copy import CopyStats, copy_file
+from manageprojects.utilities.file_manifest import FileManifest, get_file_hash
+from manageprojects.utilities.profiling import phase
 from manageprojects.utilities.temp_path import TemporaryDirectory
 
 
 logger = logging.getLogger(__name__)
 
 
+@phase('overwrite project')
 def overwrite_project(
     *,
     git: Git,
@@ -28,7 +30,8 @@ def overwrite_project(
     config_file: Path | None = None,  # Optional path to 'cookiecutter_config.yaml'
     cleanup: bool = True,  # Remove temp files if not exceptions happens
     no_input: bool = False,  # Prompt the user at command line for manual configuration?
-) -> OverwriteResult:
+    render_cache: bool = True,  # Reuse cached renders of the same template revision and context
+) -> OverwriteResult | None:
     print(f'Update by overwrite project: {project_path} from {template}')
 
     status = git.status()
@@ -56,6 +59,7 @@ def overwrite_project(
             checkout=None,  # Checkout HEAD/main revision
             password=password,
             config_file=config_file,
+            render_cache=render_cache,
         )
         assert_is_dir(to_rev_repo_path)
 
@@ -64,27 +68,53 @@ def overwrite_project(
         to_commit_date = git.get_commit_date(verbose=False)
         print(f'Update from rev. {from_rev} to rev. {to_rev} ({to_commit_date})')
 
+        manifest = FileManifest(project_path=project_path)
+        manifest.load()
+
         updated_file_count = 0
-        for src_file_path in to_rev_dst_path.rglob('*'):
+        locally_modified = []
+        copy_stats = CopyStats()
+        for src_file_path in sorted(to_rev_dst_path.rglob('*')):
             if not src_file_path.is_file():
                 continue
 
-            dst_file_path = project_path / src_file_path.relative_to(to_rev_dst_path)
-            if not dst_file_path.exists():
+            rel_path = src_file_path.relative_to(to_rev_dst_path).as_posix()
+            dst_file_path = project_path / rel_path
+            src_hash = get_file_hash(src_file_path)
+            dst_hash = manifest.get_current_hash(rel_path)  # Doesn't read the file, if it's untouched
+            written_hash = manifest.get_written_hash(rel_path)
+            if dst_hash is None:
                 print(f'NEW file: {dst_file_path}')
-            elif filecmp.cmp(dst_file_path, src_file_path, shallow=False):
+            elif dst_hash == src_hash:
                 print(f'Skip unchanged file: {dst_file_path}, ok.')
+                manifest.add(rel_path, sha256=src_hash)
                 continue
+            elif written_hash and dst_hash != written_hash:
+                if src_hash == written_hash:
+                    print(f'Skip locally modified file: {dst_file_path} (template unchanged), ok.')
+                    continue
+                print(f'[yellow]UPDATE locally modified file: {dst_file_path} (template changed)')
+                locally_modified.append(dst_file_path)
             else:
                 print(f'UPDATE file: {dst_file_path}')
 
             if not dst_file_path.parent.exists():
                 dst_file_path.parent.mkdir(parents=True)
 
-            shutil.copyfile(src_file_path, dst_file_path)
+            copy_file(src_file_path, dst_file_path, stats=copy_stats)
+            manifest.add(rel_path, sha256=src_hash)
             updated_file_count += 1
 
-    logger.info('%i files updated by overwriting', updated_file_count)
+        if manifest.changed:
+            # Also if nothing was copied, e.g.: the first run on a project that is already up-to-date
+            manifest.save()
+
+    logger.info('%i files updated by overwriting (%s)', updated_file_count, copy_stats)
+
+    if locally_modified:
+        print(f'[yellow]{len(locally_modified)} locally modified file(s) overwritten, check them with "git diff":')
+        for file_path in locally_modified:
+            print(f' * {file_path}')
 
     if updated_file_count > 0:
-        return OverwriteResult(to_rev=to_rev, to_commit_date=to_commit_date)
+        return OverwriteResult(to_rev=to_rev, to_commit_date=to_commit_date, locally_modified=locally_modified)
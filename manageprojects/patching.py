@@ -1,24 +1,51 @@
+import functools
+import hashlib
 import logging
 import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from bx_py_utils.path import assert_is_dir
 from cli_base.cli_tools.git import Git
 from rich import print
 
-from manageprojects.cookiecutter_api import execute_cookiecutter
-from manageprojects.data_classes import GenerateTemplatePatchResult
+from manageprojects.cookiecutter_api import execute_cookiecutter, get_repo_path
+from manageprojects.data_classes import GenerateTemplatePatchResult, UnchangedTemplateResult
+from manageprojects.utilities.file_copy import CopyStats, copy_file
+from manageprojects.utilities.profiling import phase
 from manageprojects.utilities.temp_path import TemporaryDirectory
+from manageprojects.utilities.tree_diff import make_tree_diff
 
 
 logger = logging.getLogger(__name__)
 
-
-def verbose_copy(src, dst):
+# Entries of a template repository root, that are never used for the rendering.
+# All other entries (e.g.: local extensions, hooks, "{{cookiecutter.*}}" directories) count as render inputs:
+TEMPLATE_REPO_META_NAMES = frozenset(
+    {
+        '.github',
+        '.gitignore',
+        '.gitattributes',
+        '.pre-commit-config.yaml',
+        'README.md',
+        'README.rst',
+        'LICENSE',
+        'LICENSE.txt',
+        'CHANGELOG.md',
+    }
+)
+
+
+def verbose_copy(src, dst, stats: CopyStats | None = None):
     logger.info(f'copy: "{src}" to "{dst}"')
-    shutil.copy2(src, dst)
+    # Hardlinks are ok: The files in the temp repository are never changed and git detects
+    # changed files by the different inodes. But never copy the mtime, because git may skip
+    # changed files with the same size and mtime if a inode number is reused.
+    copy_file(src, dst, hardlink=True, stats=stats)
 
 
+@phase('git diff')
 def make_git_diff(temp_path: Path, from_path: Path, to_path: Path, verbose=True) -> str | None:
     """
     Create git diff between from_path and to_path
@@ -28,13 +55,14 @@ def make_git_diff(temp_path: Path, from_path: Path, to_path: Path, verbose=True)
     assert_is_dir(to_path)
 
     temp_repo_path = temp_path / 'git-repo'
+    copy_function = functools.partial(verbose_copy, stats=CopyStats())
 
     # Create git repo with "from" content:
     shutil.copytree(
         src=from_path,
         dst=temp_repo_path,
         ignore=shutil.ignore_patterns('.git'),
-        copy_function=verbose_copy,
+        copy_function=copy_function,
         dirs_exist_ok=False,
     )
     assert not Path(temp_repo_path, '.git').exists()
@@ -58,13 +86,15 @@ def make_git_diff(temp_path: Path, from_path: Path, to_path: Path, verbose=True)
         src=to_path,
         dst=temp_repo_path,
         ignore=shutil.ignore_patterns('.git'),
-        copy_function=verbose_copy,
+        copy_function=copy_function,
         dirs_exist_ok=True,
     )
     git.add('.', verbose=verbose)
     git.commit('Commit "to" revision', verbose=verbose)
     git.print_file_list(out_func=logger.info)
 
+    logger.info('Copy stats: %s', copy_function.keywords['stats'])
+
     # Diff between previous commit (from) and current commit (to):
     patch = git.diff('HEAD^', 'HEAD')
     if not patch:
@@ -74,6 +104,61 @@ def make_git_diff(temp_path: Path, from_path: Path, to_path: Path, verbose=True)
     return patch
 
 
+def get_template_tree(git: Git, *, template_path: Path, revision: str) -> str | None:
+    """
+    Returns a git hash of all rendering relevant content of the template directory.
+    A template in a sub directory is completely relevant: Use the git tree hash of the sub directory.
+    A template in the repository root: Hash all entries except the TEMPLATE_REPO_META_NAMES.
+    Returns None if the revision is unknown.
+    """
+    rel_path = template_path.resolve().relative_to(git.cwd.resolve())
+    try:
+        if rel_path.parts:
+            output = git.git_verbose_check_output(
+                'rev-parse', f'{revision}:{rel_path.as_posix()}', verbose=False, print_output_on_error=False
+            )
+            return output.strip()
+
+        output = git.git_verbose_check_output(
+            'ls-tree', '-z', f'{revision}:', verbose=False, print_output_on_error=False
+        )
+    except subprocess.CalledProcessError:
+        return None
+
+    entries = []
+    for entry in output.split('\0'):
+        if not entry:
+            continue
+        info, name = entry.split('\t', 1)
+        if name not in TEMPLATE_REPO_META_NAMES:
+            entries.append(f'{info.split()[2]} {name}')
+    return hashlib.sha1('\n'.join(sorted(entries)).encode()).hexdigest()
+
+
+@phase('template tree check')
+def has_template_changes(git: Git, *, template_path: Path, from_rev: str, to_rev: str) -> bool:
+    """
+    Compare the git tree hashes of the template between the two revisions,
+    to detect changes that are relevant for rendering without rendering anything.
+    Uncommitted changes in the template directory always count as changes.
+    """
+    if git.git_verbose_check_output(
+        'status', '--porcelain', '--untracked-files=all', '--', template_path, verbose=False
+    ).strip():
+        logger.info('Uncommitted changes in %s', template_path)
+        return True
+
+    from_tree = get_template_tree(git, template_path=template_path, revision=from_rev)
+    if from_tree is None:
+        logger.info('Revision %s not found in %s', from_rev, git.cwd)
+        return True
+    to_tree = get_template_tree(git, template_path=template_path, revision=to_rev)
+    logger.debug('Template tree %s: %r', from_rev, from_tree)
+    logger.debug('Template tree %s: %r', to_rev, to_tree)
+    return from_tree != to_tree
+
+
+@phase('generate template patch')
 def generate_template_patch(
     *,
     project_path: Path,
@@ -85,9 +170,12 @@ def generate_template_patch(
     config_file: Path | None = None,  # Optional path to 'cookiecutter_config.yaml'
     cleanup: bool = True,  # Remove temp files if not exceptions happens
     no_input: bool = False,  # Prompt the user at command line for manual configuration?
-) -> GenerateTemplatePatchResult | None:
+    builtin_diff: bool = False,  # Diff the compiled trees directly, without a temporary git repository
+    render_cache: bool = True,  # Reuse cached renders of the same template revision and context
+) -> GenerateTemplatePatchResult | UnchangedTemplateResult | None:
     """
     Create git diff/patch from cookiecutter template changes.
+    Returns UnchangedTemplateResult, without rendering anything, if no rendering relevant file was changed.
     """
     print(f'Generate update patch for project: {project_path} from {template}')
     project_name = project_path.name
@@ -96,86 +184,113 @@ def generate_template_patch(
     if not extra_context:
         print('WARNING: No "cookiecutter" in replay context!')
 
-    with TemporaryDirectory(prefix=f'manageprojects_{project_name}_', cleanup=cleanup) as temp_path:
+    #############################################################################
+    # Resolve the current/HEAD version and get the git commit hash and date:
 
-        #############################################################################
-        # Generate the cookiecutter template in the current/HEAD version:
+    to_rev_repo_path = get_repo_path(
+        template=template,
+        directory=directory,
+        checkout=None,  # Checkout HEAD/main revision
+        password=password,
+        config_file=config_file,
+    )
+    assert_is_dir(to_rev_repo_path)
 
-        compiled_to_path = temp_path / 'to_rev_compiled'
-        print(f'Compile cookiecutter template in the current version here: {compiled_to_path}')
-        print('Use extra context:')
-        print(extra_context)
-        _to_rev_context, to_rev_dst_path, to_rev_repo_path = execute_cookiecutter(
-            template=template,
-            directory=directory,
-            output_dir=compiled_to_path,
-            no_input=no_input,
-            extra_context=extra_context,
-            checkout=None,  # Checkout HEAD/main revision
-            password=password,
-            config_file=config_file,
+    git = Git(cwd=to_rev_repo_path, detect_root=True)
+    to_rev = git.get_current_hash(verbose=False)
+    to_commit_date = git.get_commit_date(verbose=False)
+    print(f'Update from rev. {from_rev} to rev. {to_rev} ({to_commit_date})')
+
+    if from_rev == to_rev:
+        print(
+            f'Latest version {from_rev!r}'
+            f' from {to_commit_date} is already applied.'
+            ' Nothing to update, ok.'
         )
+        return None
 
-        assert_is_dir(to_rev_repo_path)
-        assert to_rev_dst_path.parent == compiled_to_path
+    if not has_template_changes(git, template_path=to_rev_repo_path, from_rev=from_rev, to_rev=to_rev):
+        print(
+            f'No template changes between {from_rev!r} and {to_rev!r} that affect the rendering.'
+            ' Nothing to update, just record the new revision, ok.'
+        )
+        return UnchangedTemplateResult(
+            repo_path=to_rev_repo_path,
+            from_rev=from_rev,
+            to_rev=to_rev,
+            to_commit_date=to_commit_date,
+        )
 
-        #############################################################################
-        # Get the current git commit hash and date:
-
-        git = Git(cwd=to_rev_repo_path, detect_root=True)
-        to_rev = git.get_current_hash(verbose=False)
-        to_commit_date = git.get_commit_date(verbose=False)
-        print(f'Update from rev. {from_rev} to rev. {to_rev} ({to_commit_date})')
-
-        if from_rev == to_rev:
-            print(
-                f'Latest version {from_rev!r}'
-                f' from {to_commit_date} is already applied.'
-                ' Nothing to update, ok.'
-            )
-            return None
+    if 'github.com' in template:
+        print(f'Github compare: {template}/compare/{from_rev}...{to_rev}')
 
-        if 'github.com' in template:
-            print(f'Github compare: {template}/compare/{from_rev}...{to_rev}')
+    patch_file_path = Path(
+        project_path, '.manageprojects', 'patches', f'{from_rev}_{to_rev}.patch'
+    )
+    print(f'Generate patch file: {patch_file_path}')
 
-        patch_file_path = Path(
-            project_path, '.manageprojects', 'patches', f'{from_rev}_{to_rev}.patch'
-        )
-        print(f'Generate patch file: {patch_file_path}')
+    with TemporaryDirectory(prefix=f'manageprojects_{project_name}_', cleanup=cleanup) as temp_path:
 
         #############################################################################
-        # Generate the cookiecutter template in the old version:
+        # Generate the cookiecutter template in the current/HEAD and in the old version:
 
+        compiled_to_path = temp_path / 'to_rev_compiled'
         compiled_from_path = temp_path / f'{from_rev}_compiled'
+        print(f'Compile cookiecutter template in the current version here: {compiled_to_path}')
         print(
             'Compile cookiecutter template in the'
             f' old {from_rev} version here: {compiled_from_path}'
         )
         print('Use extra context:')
         print(extra_context)
-        _from_rev_context, from_rev_dst_path, from_repo_path = execute_cookiecutter(
-            template=template,
-            directory=directory,
-            output_dir=compiled_from_path,
-            no_input=no_input,
-            extra_context=extra_context,
-            checkout=from_rev,  # Checkout the old revision
-            password=password,
-            config_file=config_file,
-        )
+        render_kwargs = {
+            'template': template,
+            'directory': directory,
+            'no_input': no_input,
+            'extra_context': extra_context,
+            'password': password,
+            'config_file': config_file,
+            'render_cache': render_cache,
+        }
+        from_rev_kwargs = {
+            **render_kwargs,
+            'output_dir': compiled_from_path,
+            'checkout': from_rev,  # Checkout the old revision
+        }
+        to_rev_kwargs = {
+            **render_kwargs,
+            'output_dir': compiled_to_path,
+            'repo_path': to_rev_repo_path,  # Already resolved HEAD/main revision
+        }
+        if no_input:
+            # Every revision is rendered from its own snapshot, so both renders can run at the same time.
+            # Cookiecutter changes the current working directory -> Render the old version in a worker process:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                from_rev_future = executor.submit(execute_cookiecutter, **from_rev_kwargs)
+                _to_rev_context, to_rev_dst_path, _ = execute_cookiecutter(**to_rev_kwargs)
+                _from_rev_context, from_rev_dst_path, from_repo_path = from_rev_future.result()
+        else:
+            # The user must answer the prompts one after the other:
+            _to_rev_context, to_rev_dst_path, _ = execute_cookiecutter(**to_rev_kwargs)
+            _from_rev_context, from_rev_dst_path, from_repo_path = execute_cookiecutter(**from_rev_kwargs)
+
+        assert to_rev_dst_path.parent == compiled_to_path
         assert_is_dir(from_repo_path)
-        assert from_repo_path == to_rev_repo_path
         assert from_rev_dst_path.parent == compiled_from_path
 
         #############################################################################
         # Generate git patch between old and current version:
 
-        patch = make_git_diff(
-            temp_path=temp_path,
-            from_path=from_rev_dst_path,
-            to_path=to_rev_dst_path,
-            verbose=False,
-        )
+        if builtin_diff:
+            print(f'Make diff between {from_rev_dst_path} and {to_rev_dst_path}')
+            patch = make_tree_diff(from_path=from_rev_dst_path, to_path=to_rev_dst_path)
+        else:
+            patch = make_git_diff(
+                temp_path=temp_path,
+                from_path=from_rev_dst_path,
+                to_path=to_rev_dst_path,
+                verbose=False,
+            )
         if not patch:
             print(f'No gif diff between {compiled_from_path} and {compiled_to_path} !')
             return None
@@ -185,7 +300,7 @@ def generate_template_patch(
         patch_file_path.write_text(patch)
 
         return GenerateTemplatePatchResult(
-            repo_path=to_rev_repo_path,  # == from_repo_path
+            repo_path=to_rev_repo_path,
             patch_file_path=patch_file_path,
             from_rev=from_rev,
             compiled_from_path=compiled_from_path,
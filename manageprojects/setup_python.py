@@ -13,11 +13,17 @@ But only if it's needed!
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import contextlib
 import dataclasses
 import datetime
+import fcntl
+import functools
 import hashlib
+import http.client
 import json
 import logging
+import os
 import platform
 import re
 import shlex
@@ -26,10 +32,12 @@ import ssl
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import warnings
 from pathlib import Path
-from urllib import request
+from urllib import parse, request
+from urllib.error import HTTPError
 
 
 """DocWrite: setup_python.md # Boot Redistributable Python
@@ -46,6 +54,25 @@ HASH_NAME = 'sha256'
 OPTIMIZATION_PRIORITY = ['pgo+lto', 'pgo', 'lto']
 TEMP_PREFIX = 'redist_python_'
 DOWNLOAD_CHUNK_SIZE = 512 * 1024  # 512 KiB
+DOWNLOAD_SEGMENT_SIZE = 8 * 1024 * 1024  # 8 MiB per HTTP Range request
+DOWNLOAD_CONNECTIONS = 4
+
+"""DocWrite: setup_python.md ## Download cache
+Verified downloads are stored in a persistent cache directory and reused in the next runs.
+Default is `~/.cache/manageprojects/python/` (or `$XDG_CACHE_HOME/manageprojects/python/`).
+The cache directory can be shared, e.g.: on a volume of many CI runners.
+The least recently used entries will be removed, if the cache is bigger than `--cache-max-size`."""
+DEFAULT_CACHE_PATH = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'manageprojects' / 'python'
+DEFAULT_CACHE_MAX_SIZE_MB = 2048
+CACHE_TEMP_MAX_AGE = 24 * 60 * 60  # Remove stale temp directories after one day
+
+"""DocWrite: setup_python.md ## Download cache
+The release metadata (e.g.: the latest release JSON) is cached, too: Within `--metadata-ttl` seconds
+it's used without any request. After that it's revalidated with `ETag`/`If-Modified-Since`.
+So repeated calls (e.g.: in one CI job) make no network round trips, if nothing changed."""
+DEFAULT_METADATA_TTL = 10 * 60
+MAX_REDIRECTS = 5
+HTTP_TIMEOUT = 30
 
 logger = logging.getLogger(__name__)
 
@@ -71,12 +98,13 @@ def assert_is_file(path):
 class TemporaryDirectory:
     """tempfile.TemporaryDirectory in Python 3.9 has no "delete", yet."""
 
-    def __init__(self, prefix, delete: bool):
+    def __init__(self, prefix, delete: bool, dir: Path | None = None):
         self.prefix = prefix
         self.delete = delete
+        self.dir = dir
 
     def __enter__(self) -> Path:
-        self.temp_path = Path(tempfile.mkdtemp(prefix=self.prefix))
+        self.temp_path = Path(tempfile.mkdtemp(prefix=self.prefix, dir=self.dir))
         return self.temp_path
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -86,23 +114,338 @@ class TemporaryDirectory:
             return False
 
 
-def urlopen(url: str):
-    print(f'Fetching {url}', file=sys.stderr)
+@functools.cache
+def get_ssl_context() -> ssl.SSLContext:
     """DocWrite: setup_python.md ## Workflow - 4. Download and verify Archive
     All downloads will be done with a secure connection (SSL) and server authentication."""
-    context = ssl.create_default_context(purpose=ssl.Purpose.SERVER_AUTH)
-    return request.urlopen(url=url, context=context)
+    return ssl.create_default_context(purpose=ssl.Purpose.SERVER_AUTH)
+
+
+def urlopen(url: str, headers: dict | None = None, verbose: bool = True):
+    if verbose:
+        print(f'Fetching {url}', file=sys.stderr)
+    return request.urlopen(request.Request(url, headers=headers or {}), context=get_ssl_context())
 
 
 def fetch(url: str) -> bytes:
     return urlopen(url).read()
 
 
-def fetch_json(url: str) -> dict:
-    return json.loads(fetch(url))
+class KeepAliveConnections:
+    """
+    Reuse one connection per host for the small metadata requests (HTTP keep-alive).
+    The requests are serialized, because a http.client connection is not thread-safe.
+    """
+
+    def __init__(self):
+        self.connections = {}
+        self.lock = threading.Lock()
+
+    def get_connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        key = (scheme, netloc)
+        if key not in self.connections:
+            if scheme == 'https':
+                connection = http.client.HTTPSConnection(netloc, timeout=HTTP_TIMEOUT, context=get_ssl_context())
+            else:
+                connection = http.client.HTTPConnection(netloc, timeout=HTTP_TIMEOUT)
+            self.connections[key] = connection
+        return self.connections[key]
+
+    def send(self, url: str, headers: dict) -> tuple[int, http.client.HTTPMessage, bytes]:
+        parts = parse.urlsplit(url)
+        path = parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+        headers = {'User-Agent': 'setup_python.py', **headers}
+        for retry in (False, True):
+            connection = self.get_connection(parts.scheme, parts.netloc)
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                return response.status, response.headers, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()  # e.g.: The server closed the idle connection -> reconnect
+                del self.connections[(parts.scheme, parts.netloc)]
+                if retry:
+                    raise
+
+    def request(self, url: str, headers: dict | None = None) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        GET the url, follow redirects and returns status, headers and body. Raises HTTPError for errors.
+        """
+        print(f'Fetching {url}', file=sys.stderr)
+        with self.lock:
+            for _ in range(MAX_REDIRECTS):
+                status, response_headers, body = self.send(url, headers or {})
+                if status in (301, 302, 303, 307, 308):
+                    url = parse.urljoin(url, response_headers['Location'])
+                    continue
+                if status >= 400:
+                    raise HTTPError(url, status, f'HTTP error {status}', response_headers, None)
+                return status, response_headers, body
+        raise HTTPError(url, status, 'Too many redirects', response_headers, None)
+
+    def fetch(self, url: str) -> bytes:
+        return self.request(url)[2]
+
+    def close(self) -> None:
+        for connection in self.connections.values():
+            connection.close()
+        self.connections.clear()
+
+
+class MetadataCache:
+    """
+    Cache mutable metadata on disk: Use it without a request within the TTL,
+    revalidate it with ETag/Last-Modified after that.
+    """
+
+    def __init__(self, path: Path, ttl: int):
+        self.path = path
+        self.ttl = ttl
+
+    def fetch(self, url: str, connections: KeepAliveConnections) -> bytes:
+        file_path = self.path / f'{hashlib.sha256(url.encode()).hexdigest()[:32]}.json'
+        try:
+            entry = json.loads(file_path.read_text())
+        except (OSError, ValueError):
+            entry = None
+
+        if entry and time.time() - entry['fetched'] < self.ttl:
+            logger.info('Use cached metadata for %s', url)
+            return entry['body'].encode()
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        status, response_headers, body = connections.request(url, headers=headers)
+        if status == 304:
+            logger.info('Cached metadata for %s is not modified', url)
+        else:
+            entry = {
+                'url': url,
+                'etag': response_headers.get('ETag'),
+                'last_modified': response_headers.get('Last-Modified'),
+                'body': body.decode(),
+            }
+        entry['fetched'] = time.time()
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        temp_file_path = file_path.with_name(f'.tmp_{os.getpid()}_{file_path.name}')
+        temp_file_path.write_text(json.dumps(entry))
+        os.replace(temp_file_path, file_path)
+        return entry['body'].encode()
+
+
+def fetch_metadata_json(url: str, *, connections: KeepAliveConnections, metadata_cache: MetadataCache | None) -> dict:
+    if metadata_cache:
+        return json.loads(metadata_cache.fetch(url, connections))
+    return json.loads(connections.fetch(url))
+
+
+def get_hash_value(hash_value: str | concurrent.futures.Future) -> str:
+    """
+    The checksum may be fetched in the background, while the archive is downloaded.
+    """
+    if isinstance(hash_value, concurrent.futures.Future):
+        return hash_value.result()
+    return hash_value
+
+
+def get_segments(total_size: int, segment_size: int) -> list:
+    """
+    Split the download into (start, end) byte ranges, "end" is inclusive like in HTTP Range headers.
+
+    >>> get_segments(10, 4)
+    [(0, 3), (4, 7), (8, 9)]
+    """
+    return [(start, min(start + segment_size, total_size) - 1) for start in range(0, total_size, segment_size)]
+
+
+class DownloadProgress:
+    """
+    Count the downloaded bytes of all connections and print the progress at most once per second.
+    """
+
+    def __init__(self, total_size: int, downloaded: int = 0):
+        self.total_size = total_size
+        self.downloaded = downloaded
+        self.lock = threading.Lock()
+        self.next_update = time.monotonic() + 1
+
+    def add(self, size: int) -> None:
+        with self.lock:
+            self.downloaded += size
+
+    def print(self, force: bool = False) -> None:
+        if force or time.monotonic() >= self.next_update:
+            percent = (self.downloaded / self.total_size) * 100 if self.total_size else 100
+            print(f'\rDownloaded {self.downloaded} Bytes ({percent:.1f}%)...', file=sys.stderr, end='', flush=True)
+            self.next_update = time.monotonic() + 1
+
+
+class DownloadState:
+    """
+    Completed segments of a ranged download, stored next to the partial file to resume the download.
+    """
+
+    def __init__(self, *, file_path: Path, url: str, total_size: int, segment_size: int):
+        self.path = file_path.with_name(f'{file_path.name}.download.json')
+        self.key = {'url': url, 'total_size': total_size, 'segment_size': segment_size}
+        self.done = set()
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get('key') == self.key:
+            self.done = set(data['done'])
+            logger.info('Resume download: %i segments already downloaded', len(self.done))
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps({'key': self.key, 'done': sorted(self.done)}))
+
+    def remove(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+
+def download_segment(*, url: str, fd: int, start: int, end: int, progress: DownloadProgress, response=None) -> None:
+    """
+    Download the byte range start-end into the file at the same position.
+    """
+    if response is None:
+        response = urlopen(url, headers={'Range': f'bytes={start}-{end}'}, verbose=False)
+        assert response.status == 206, f'Range request not supported: {response.status=}'
+    offset = start
+    with response:
+        while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+            progress.add(len(chunk))
+    assert offset == end + 1, f'Segment {start}-{end} incomplete: {offset - start} Bytes'
+
+
+def hash_file_range(file_hash, fd: int, start: int, end: int) -> None:
+    offset = start
+    while offset <= end:
+        chunk = os.pread(fd, min(DOWNLOAD_CHUNK_SIZE, end + 1 - offset), offset)
+        assert chunk, f'Unexpected end of file at {offset}'
+        file_hash.update(chunk)
+        offset += len(chunk)
+
+
+def download_stream(*, response, file_path: Path, file_hash, progress: DownloadProgress) -> None:
+    """
+    Download the complete file over one connection.
+    """
+    with response, file_path.open('wb') as f:
+        while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+            f.write(chunk)
+            file_hash.update(chunk)
+            progress.add(len(chunk))
+            progress.print()
 
 
-def download(*, url: str, dst_path: Path, total_size: int, hash_name: str, hash_value: str) -> Path:
+def download_ranges(
+    *,
+    url: str,
+    file_path: Path,
+    file_hash,
+    total_size: int,
+    connections: int,
+    segment_size: int,
+) -> None:
+    """
+    Download segments in parallel via HTTP Range requests into a preallocated file.
+    The segments are hashed in order, as soon as all previous segments are downloaded.
+    Completed segments are stored, so that a aborted download can be resumed.
+    Falls back to a single connection, if the server doesn't support Range requests.
+    """
+    segments = get_segments(total_size, segment_size)
+    state = DownloadState(file_path=file_path, url=url, total_size=total_size, segment_size=segment_size)
+    if file_path.exists():
+        state.load()
+    else:
+        state.remove()
+
+    first_response = None
+    if 0 not in state.done:
+        start, end = segments[0]
+        first_response = urlopen(url, headers={'Range': f'bytes={start}-{end}'})
+        if first_response.status != 206:
+            logger.info('Server does not support Range requests -> download with one connection')
+            state.remove()
+            progress = DownloadProgress(total_size)
+            download_stream(response=first_response, file_path=file_path, file_hash=file_hash, progress=progress)
+            progress.print(force=True)
+            return
+
+    downloaded = sum(end + 1 - start for index, (start, end) in enumerate(segments) if index in state.done)
+    progress = DownloadProgress(total_size, downloaded=downloaded)
+
+    fd = os.open(file_path, os.O_RDWR | os.O_CREAT)
+    try:
+        if not state.done:
+            try:
+                os.posix_fallocate(fd, 0, total_size)
+            except (AttributeError, OSError):
+                os.ftruncate(fd, total_size)  # e.g.: not supported by the file system
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=connections)
+        try:
+            futures = {}
+            for index, (start, end) in enumerate(segments):
+                if index not in state.done:
+                    future = executor.submit(
+                        download_segment,
+                        url=url,
+                        fd=fd,
+                        start=start,
+                        end=end,
+                        progress=progress,
+                        response=first_response if index == 0 else None,
+                    )
+                    futures[future] = index
+
+            next_hash_index = 0
+            pending = set(futures)
+            while True:
+                # Hash all segments that are completely downloaded in order:
+                while next_hash_index < len(segments) and next_hash_index in state.done:
+                    hash_file_range(file_hash, fd, *segments[next_hash_index])
+                    next_hash_index += 1
+                if not pending:
+                    break
+
+                completed, pending = concurrent.futures.wait(
+                    pending, timeout=1, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in completed:
+                    future.result()  # Raise download errors
+                    state.done.add(futures[future])
+                if completed:
+                    state.save()
+                progress.print()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    finally:
+        os.close(fd)
+    progress.print(force=True)
+    state.remove()
+
+
+def download(
+    *,
+    url: str,
+    dst_path: Path,
+    total_size: int,
+    hash_name: str,
+    hash_value: str | concurrent.futures.Future,
+    connections: int = DOWNLOAD_CONNECTIONS,
+    segment_size: int = DOWNLOAD_SEGMENT_SIZE,
+) -> Path:
     """DocWrite: setup_python.md # Boot Redistributable Python
     The downloaded archive will be verified with the hash checksum.
     """
@@ -111,25 +454,21 @@ def download(*, url: str, dst_path: Path, total_size: int, hash_name: str, hash_
     logger.debug('Download %s into %s...', url, file_path)
 
     file_hash = hashlib.new(hash_name)
-    response = urlopen(url)
-    next_update = time.monotonic() + 1
-    with file_path.open('wb') as f:
-        while True:
-            chunk = response.read(DOWNLOAD_CHUNK_SIZE)
-            if not chunk:
-                break
-            f.write(chunk)
-            file_hash.update(chunk)
-            if time.monotonic() >= next_update:
-                f.flush()
-                percent = (file_path.stat().st_size / total_size) * 100
-                print(
-                    f'\rDownloaded {file_path.stat().st_size} Bytes ({percent:.1f}%)...',
-                    file=sys.stderr,
-                    end='',
-                    flush=True,
-                )
-                next_update += 1
+    if total_size > segment_size:
+        """DocWrite: setup_python.md ## Workflow - 4. Download and verify Archive
+        Big archives are downloaded in segments over parallel connections (HTTP Range requests).
+        An aborted download will be resumed from the already downloaded segments."""
+        download_ranges(
+            url=url,
+            file_path=file_path,
+            file_hash=file_hash,
+            total_size=total_size,
+            connections=max(connections, 1),
+            segment_size=segment_size,
+        )
+    else:
+        progress = DownloadProgress(total_size)
+        download_stream(response=urlopen(url), file_path=file_path, file_hash=file_hash, progress=progress)
 
     file_size = file_path.stat().st_size
     print(f'\rDownloaded {file_size} Bytes (100%)', file=sys.stderr, flush=True)
@@ -137,12 +476,252 @@ def download(*, url: str, dst_path: Path, total_size: int, hash_name: str, hash_
 
     file_hash = file_hash.hexdigest()
     logger.debug('Check %s hash...', file_hash)
+    hash_value = get_hash_value(hash_value)
+    if file_hash != hash_value:
+        file_path.unlink()  # Never resume from broken data
     assert file_hash == hash_value, f'{file_hash=} != {hash_value=}'
     print(f'{hash_name} checksum verified: {file_hash!r}, ok.', file=sys.stderr)
 
     return file_path
 
 
+class DownloadCache:
+    """
+    Persistent cache of verified downloads, keyed by URL and expected hash.
+    Every entry is a directory with one file. It's created in a temp directory and renamed,
+    so concurrent runs (e.g.: on a shared volume) never see a half written entry.
+    """
+
+    def __init__(self, path: Path, max_size: int):
+        self.path = path
+        self.max_size = max_size
+
+    def get_key(self, url: str, hash_value: str) -> str:
+        return hashlib.sha256(f'{url}\n{hash_value}'.encode()).hexdigest()[:32]
+
+    def get(self, url: str, hash_value: str = '') -> Path | None:
+        entry_path = self.path / self.get_key(url, hash_value)
+        file_path = entry_path / Path(url).name
+        if not file_path.is_file():
+            return None
+        logger.info('Use cached %s', file_path)
+        os.utime(entry_path)  # Mark as recently used for pruning
+        return file_path
+
+    def get_partial_path(self, url: str, hash_value: str = '') -> Path:
+        """
+        Persistent directory for a download in progress, so it can be resumed in the next run.
+        """
+        partial_path = self.path / '.partial' / self.get_key(url, hash_value)
+        partial_path.mkdir(parents=True, exist_ok=True)
+        return partial_path
+
+    @contextlib.contextmanager
+    def locked_partial_path(self, url: str):
+        """
+        Partial download directory, locked against concurrent downloads of the same URL,
+        e.g.: by many CI runners that share the cache directory.
+        prune() removes a stale partial directory only while holding its lock,
+        so retry if the locked file was removed in the meantime.
+        """
+        while True:
+            partial_path = self.get_partial_path(url)
+            lock_path = partial_path / '.lock'
+            try:
+                lock_file = lock_path.open('a')
+            except FileNotFoundError:
+                continue  # Removed by prune() in the meantime
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                is_current = os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino
+            except FileNotFoundError:
+                is_current = False
+            if is_current:
+                break
+            lock_file.close()  # Removed by prune() while we waited for the lock
+
+        with lock_file:
+            try:
+                yield partial_path
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def put(self, url: str, file_path: Path, hash_value: str = '') -> Path:
+        """
+        Move the verified `file_path` into the cache and returns the new path.
+        """
+        entry_path = self.path / self.get_key(url, hash_value)
+        temp_path = Path(tempfile.mkdtemp(prefix='.tmp_', dir=self.path))
+        shutil.move(file_path, temp_path / Path(url).name)
+        try:
+            temp_path.rename(entry_path)
+        except OSError:
+            logger.info('Cache entry %s was created in the meantime', entry_path)
+            shutil.rmtree(temp_path)
+        else:
+            logger.info('Stored %s in cache %s', url, entry_path)
+        self.prune(keep=entry_path)
+        return entry_path / Path(url).name
+
+    def prune(self, keep: Path) -> None:
+        """
+        Remove the least recently used entries, until the cache size is below the limit.
+        Concurrent runs may remove the same entries at the same time.
+        """
+        now = time.time()
+        for stale_path in self.path.glob('.tmp_*'):
+            with contextlib.suppress(FileNotFoundError):
+                if now - stale_path.stat().st_mtime > CACHE_TEMP_MAX_AGE:
+                    shutil.rmtree(stale_path, ignore_errors=True)
+
+        partial_path = self.path / '.partial'
+        for stale_path in partial_path.iterdir() if partial_path.is_dir() else ():
+            try:
+                if now - stale_path.stat().st_mtime <= CACHE_TEMP_MAX_AGE:
+                    continue
+                lock_file = (stale_path / '.lock').open('a')
+            except FileNotFoundError:
+                continue
+            with lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    logger.info('Keep partial download %s, because it is in use', stale_path)
+                    continue
+                shutil.rmtree(stale_path, ignore_errors=True)
+
+        entries = []
+        for entry_path in self.path.iterdir():
+            if entry_path.is_dir() and not entry_path.name.startswith('.'):
+                try:
+                    size = sum(item.stat().st_size for item in entry_path.iterdir())
+                    mtime = entry_path.stat().st_mtime
+                except FileNotFoundError:
+                    continue  # Removed by a concurrent run in the meantime
+                entries.append((mtime, size, entry_path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if entry_path != keep:
+                logger.info('Remove old cache entry %s (%i Bytes)', entry_path, size)
+                shutil.rmtree(entry_path, ignore_errors=True)
+                total_size -= size
+
+
+def fetch_cached(url: str, cache: DownloadCache | None, fetch_func=fetch) -> bytes:
+    """
+    Fetch a file that never changes, e.g.: a checksum file of a release.
+    """
+    if not cache:
+        return fetch_func(url)
+    if not (file_path := cache.get(url)):
+        with cache.locked_partial_path(url) as partial_path:
+            # Maybe fetched by a other process, while we waited for the lock:
+            if not (file_path := cache.get(url)):
+                temp_file_path = partial_path / Path(url).name
+                temp_file_path.write_bytes(fetch_func(url))
+                file_path = cache.put(url, temp_file_path)
+    return file_path.read_bytes()
+
+
+def cached_download(
+    *,
+    cache: DownloadCache | None,
+    url: str,
+    dst_path: Path,
+    total_size: int,
+    hash_name: str,
+    hash_value: str | concurrent.futures.Future,
+    connections: int = DOWNLOAD_CONNECTIONS,
+) -> Path:
+    """
+    Returns the verified file from the cache or download it (into the cache).
+    A not yet fetched checksum (Future) skips the cache lookup, but the download will be stored in the cache.
+    """
+    if not cache:
+        return download(
+            url=url,
+            dst_path=dst_path,
+            total_size=total_size,
+            hash_name=hash_name,
+            hash_value=hash_value,
+            connections=connections,
+        )
+    if isinstance(hash_value, str) and (file_path := cache.get(url, hash_value)):
+        return file_path
+    with cache.locked_partial_path(url) as partial_path:
+        # Maybe downloaded by a other process, while we waited for the lock:
+        if isinstance(hash_value, str) and (file_path := cache.get(url, hash_value)):
+            return file_path
+        file_path = download(
+            url=url,
+            dst_path=partial_path,
+            total_size=total_size,
+            hash_name=hash_name,
+            hash_value=hash_value,
+            connections=connections,
+        )
+        return cache.put(url, file_path, get_hash_value(hash_value))
+
+
+def stream_extract(
+    *,
+    url: str,
+    dst_path: Path,
+    total_size: int,
+    hash_name: str,
+    hash_value: str | concurrent.futures.Future,
+    compress_program: str,
+) -> None:
+    """
+    Pipe the download through the hash straight into "tar", so the archive is never stored on disk.
+    The extracted files must not be used, if this function raises an error!
+    """
+    logger.debug('Stream %s into %s...', url, dst_path)
+    file_hash = hashlib.new(hash_name)
+    progress = DownloadProgress(total_size)
+    args = ['tar', f'--use-compress-program={compress_program}', '--extract', '--file', '-', '--directory', dst_path]
+    with subprocess.Popen([str(arg) for arg in args], stdin=subprocess.PIPE) as process:
+        try:
+            with urlopen(url) as response:
+                while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+                    file_hash.update(chunk)
+                    process.stdin.write(chunk)
+                    progress.add(len(chunk))
+                    progress.print()
+        finally:
+            process.stdin.close()
+    progress.print(force=True)
+    print(file=sys.stderr)
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+
+    assert progress.downloaded == total_size, f'Downloaded {progress.downloaded} Bytes is not expected {total_size=}!'
+    file_hash = file_hash.hexdigest()
+    hash_value = get_hash_value(hash_value)
+    assert file_hash == hash_value, f'{file_hash=} != {hash_value=}'
+    print(f'{hash_name} checksum verified: {file_hash!r}, ok.', file=sys.stderr)
+
+
+def replace_directory(src_path: Path, dest_path: Path) -> None:
+    """
+    Move src_path to dest_path and remove a existing dest_path after that.
+    On the same file system, these are two renames, so there is never a half copied directory.
+    """
+    old_path = None
+    if dest_path.exists():
+        old_path = dest_path.with_name(f'.{dest_path.name}.old')
+        if old_path.exists():
+            shutil.rmtree(old_path)
+        logger.info('Replace existing %r ...', dest_path)
+        dest_path.rename(old_path)
+    shutil.move(src_path, dest_path)
+    if old_path:
+        shutil.rmtree(old_path)
+
+
 def removesuffix(text: str, suffix: str) -> str:
     assert text.endswith(suffix), f'{text=} does not end with {suffix=}'
     return text[: -len(suffix)]
@@ -158,60 +737,129 @@ def verbose_check_output(args) -> str:
     return completed_process.stdout.strip()
 
 
-def get_platform_parts():
-    """DocWrite: setup_python.md ## Workflow - 3. Obtaining optimized Python distribution
-    See: https://gregoryszorc.com/docs/python-build-standalone/main/running.html
+"""DocWrite: setup_python.md ## Workflow - 3. Obtaining optimized Python distribution
+The detected `x86_64_vN` level is cached per boot (`/proc/sys/kernel/random/boot_id`) in the cache directory.
+The detection can be skipped with `--arch`, e.g.: `--arch x86_64_v3`"""
+CPUINFO_PATH = Path('/proc/cpuinfo')
+BOOT_ID_PATH = Path('/proc/sys/kernel/random/boot_id')
+PLATFORM_CACHE_FILENAME = '.platform.json'
+
+# Based on https://github.com/pypa/hatch/blob/master/src/hatch/python/resolve.py
+# See https://clang.llvm.org/docs/UsersManual.html#x86 for the
+# instructions for each architecture variant and
+# https://github.com/torvalds/linux/blob/master/arch/x86/include/asm/cpufeatures.h
+# for the corresponding Linux flags
+X86_64_V2_FLAGS = frozenset({'cx16', 'lahf_lm', 'popcnt', 'pni', 'sse4_1', 'sse4_2', 'ssse3'})
+X86_64_V3_FLAGS = frozenset({'avx', 'avx2', 'bmi1', 'bmi2', 'f16c', 'fma', 'movbe', 'xsave'}) | X86_64_V2_FLAGS
+X86_64_V4_FLAGS = frozenset({'avx512f', 'avx512bw', 'avx512cd', 'avx512dq', 'avx512vl'}) | X86_64_V3_FLAGS
+X86_64_LEVELS = (
+    ('x86_64_v4', X86_64_V4_FLAGS),
+    ('x86_64_v3', X86_64_V3_FLAGS),
+    ('x86_64_v2', X86_64_V2_FLAGS),
+)
+
+
+@dataclasses.dataclass
+class PlatformInfo:
+    system: str  # e.g.: "linux"
+    abi: str  # "gnu" or "musl"
+    arch: str  # e.g.: "x86_64_v3" or "aarch64"
+
+    @property
+    def parts(self) -> list:
+        return [self.system, self.abi, self.arch]
+
+
+def get_cpu_flags(cpuinfo_path: Path = CPUINFO_PATH) -> set:
     """
-    parts = [sys.platform]
-    abi = 'gnu' if any(platform.libc_ver()) else 'musl'
-    logger.debug('Use %r ABI', abi)
-    parts.append(abi)
+    CPU flags from the first "flags" line: All cores of one machine have the same flags,
+    so the rest of the file (one block per core) is not read.
+    """
+    with cpuinfo_path.open() as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key.strip() == 'flags':
+                return set(value.split())
+    return set()
+
+
+def get_x86_64_level(cpu_flags: set) -> str:
+    """
+    >>> get_x86_64_level(set(X86_64_V3_FLAGS))
+    'x86_64_v3'
+    >>> get_x86_64_level(set(X86_64_V4_FLAGS) | {'foo'})
+    'x86_64_v4'
+    >>> get_x86_64_level({'sse4_1'})
+    'x86_64'
+    """
+    for arch, flags in X86_64_LEVELS:
+        if missing_flags := flags - cpu_flags:
+            logger.debug('Missing %s flags: %s', arch, ', '.join(sorted(missing_flags)))
+        else:
+            return arch
+    return 'x86_64'
+
 
+def get_boot_id() -> str | None:
+    try:
+        return BOOT_ID_PATH.read_text().strip()
+    except OSError:
+        return None
+
+
+def detect_arch(cache_path: Path | None = None) -> str:
+    """
+    Detect the best architecture variant. The result for x86-64 Linux is cached per boot ID in cache_path.
+    """
     arch = platform.machine().lower()
-    if sys.platform == 'linux' and arch == 'x86_64':
-        """DocWrite: setup_python.md ## Workflow - 3. Obtaining optimized Python distribution
-        For `x86-64` Linux we check the CPU flags from `/proc/cpuinfo` to determine the best variant."""
+    if sys.platform != 'linux' or arch != 'x86_64':
+        return arch
+
+    boot_id = get_boot_id()
+    cache_file_path = cache_path / PLATFORM_CACHE_FILENAME if cache_path and boot_id else None
+    if cache_file_path:
         try:
-            contents = Path('/proc/cpuinfo').read_text()
-        except OSError:
-            pass
-        else:
-            # Based on https://github.com/pypa/hatch/blob/master/src/hatch/python/resolve.py
-            # See https://clang.llvm.org/docs/UsersManual.html#x86 for the
-            # instructions for each architecture variant and
-            # https://github.com/torvalds/linux/blob/master/arch/x86/include/asm/cpufeatures.h
-            # for the corresponding Linux flags
-            v2_flags = {'cx16', 'lahf_lm', 'popcnt', 'pni', 'sse4_1', 'sse4_2', 'ssse3'}
-            v3_flags = {'avx', 'avx2', 'bmi1', 'bmi2', 'f16c', 'fma', 'movbe', 'xsave'} | v2_flags
-            v4_flags = {'avx512f', 'avx512bw', 'avx512cd', 'avx512dq', 'avx512vl'} | v3_flags
-
-            cpu_flags = set()
-            for line in contents.splitlines():
-                key, _, value = line.partition(':')
-                if key.strip() == 'flags':
-                    cpu_flags |= set(value.strip().split())
-
-            logger.debug('CPU flags: %s', ', '.join(sorted(cpu_flags)))
-
-            missing_v4_flags = v4_flags - cpu_flags
-            if not missing_v4_flags:
-                arch = 'x86_64_v4'
-            else:
-                logger.debug('Missing v4 flags: %s', ', '.join(sorted(missing_v4_flags)))
-                missing_v3_flags = v3_flags - cpu_flags
-                if not missing_v3_flags:
-                    arch = 'x86_64_v3'
-                else:
-                    logger.debug('Missing v3 flags: %s', ', '.join(sorted(missing_v3_flags)))
-                    missing_v2_flags = v2_flags - cpu_flags
-                    if not missing_v2_flags:
-                        arch = 'x86_64_v2'
-                    else:
-                        logger.debug('Missing v2 flags: %s', ', '.join(sorted(missing_v2_flags)))
+            data = json.loads(cache_file_path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        if data.get('boot_id') == boot_id and data.get('arch'):
+            logger.debug('Use cached arch from %s', cache_file_path)
+            return data['arch']
 
+    """DocWrite: setup_python.md ## Workflow - 3. Obtaining optimized Python distribution
+    For `x86-64` Linux we check the CPU flags from `/proc/cpuinfo` to determine the best variant."""
+    try:
+        cpu_flags = get_cpu_flags(CPUINFO_PATH)
+    except OSError as err:
+        logger.warning('Can not read CPU flags: %s', err)
+        return arch
+    logger.debug('CPU flags: %s', ', '.join(sorted(cpu_flags)))
+    arch = get_x86_64_level(cpu_flags)
+
+    if cache_file_path:
+        cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_file_path.write_text(json.dumps({'boot_id': boot_id, 'arch': arch}))
+    return arch
+
+
+def probe_platform(*, arch: str | None = None, cache_path: Path | None = None) -> PlatformInfo:
+    """
+    Collect the platform information, that are needed to select a matching Python build.
+    A given `arch` skips the CPU detection.
+    """
+    abi = 'gnu' if any(platform.libc_ver()) else 'musl'
+    logger.debug('Use %r ABI', abi)
+    if not arch:
+        arch = detect_arch(cache_path)
     logger.info('Use arch: %r', arch)
-    parts.append(arch)
-    return parts
+    return PlatformInfo(system=sys.platform, abi=abi, arch=arch)
+
+
+def get_platform_parts(*, arch: str | None = None, cache_path: Path | None = None) -> list:
+    """DocWrite: setup_python.md ## Workflow - 3. Obtaining optimized Python distribution
+    See: https://gregoryszorc.com/docs/python-build-standalone/main/running.html
+    """
+    return probe_platform(arch=arch, cache_path=cache_path).parts
 
 
 def get_best_variant(names):
@@ -253,6 +901,12 @@ def setup_python(
     major_version: str,
     delete_temp: bool = True,
     force_update: bool = False,
+    download_connections: int = DOWNLOAD_CONNECTIONS,
+    cache_path: Path | None = DEFAULT_CACHE_PATH,  # None == don't use the download cache
+    cache_max_size: int = DEFAULT_CACHE_MAX_SIZE_MB * 1024 * 1024,
+    stream: bool = False,
+    metadata_ttl: int = DEFAULT_METADATA_TTL,  # Seconds to use the cached release metadata without a request
+    arch: str | None = None,  # e.g.: "x86_64_v3", None == detect the best variant
 ):
     """DocWrite: setup_python.md # Boot Redistributable Python
     The download will be only done, if the system Python is not the same major version as requested
@@ -320,17 +974,26 @@ def setup_python(
     archive_extension = f'.tar.{compress_extension}'
     archive_hash_extension = f'.tar.{compress_extension}.{HASH_NAME}'
 
-    filters = [archive_extension, *get_platform_parts()]
+    filters = [archive_extension, *get_platform_parts(arch=arch, cache_path=cache_path)]
     logger.debug('Use filters: %s', filters)
 
     """DocWrite: setup_python.md ## Workflow - 2. Collect latest release data
     We fetch the latest release data from the GitHub API:
     DocWriteMacro: manageprojects.tests.docwrite_macros_setup_python.lastest_release_url"""
-    data = fetch_json(LASTEST_RELEASE_URL)
+    connections = KeepAliveConnections()
+    if cache_path:
+        cache_path.mkdir(parents=True, exist_ok=True)
+        cache = DownloadCache(cache_path, max_size=cache_max_size)
+        metadata_cache = MetadataCache(cache_path / '.metadata', ttl=metadata_ttl)
+    else:
+        cache = None
+        metadata_cache = None
+
+    data = fetch_metadata_json(LASTEST_RELEASE_URL, connections=connections, metadata_cache=metadata_cache)
     logger.debug('Latest release data: %r', data)
     tag = data['tag']
     release_url = f'https://api.github.com/repos/{GUTHUB_PROJECT}/releases/tags/{tag}'
-    release_data = fetch_json(release_url)
+    release_data = fetch_metadata_json(release_url, connections=connections, metadata_cache=metadata_cache)
     assets = release_data['assets']
 
     archive_infos = {}
@@ -399,36 +1062,64 @@ def setup_python(
     logger.debug('Hash URL: %s', hash_url)
 
     # Download checksum file:
-    hash_value = fetch(hash_url).decode().strip()
-    logger.debug('%s hash value: %s', HASH_NAME, hash_value)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    if cache and (hash_file_path := cache.get(hash_url)):
+        hash_value = hash_file_path.read_text().strip()
+    else:
+        """DocWrite: setup_python.md ## Workflow - 4. Download and verify Archive
+        The checksum file is fetched in the background, while the archive is downloaded."""
+        hash_value = executor.submit(lambda: fetch_cached(hash_url, cache, connections.fetch).decode().strip())
 
     """DocWrite: setup_python.md ## Workflow - 4. Download and verify Archive
     Download will be done in a temporary directory."""
-    with TemporaryDirectory(prefix=TEMP_PREFIX, delete=delete_temp) as temp_path:
-        """DocWrite: setup_python.md ## Workflow - 4. Download and verify Archive
-        We check the file hash after downloading the archive."""
-        archive_temp_path = download(
-            url=archive_info.url,
-            dst_path=temp_path,
-            total_size=archive_info.size,
-            hash_name=HASH_NAME,
-            hash_value=hash_value,
-        )
-
-        # Extract .tar.zstd archive file into temporary directory:
-        logger.debug('Extract %s into %s ...', archive_temp_path, temp_path)
-        run(
-            [
-                'tar',
-                f'--use-compress-program={compress_program}',
-                '--extract',
-                '--file',
-                archive_temp_path,
-                '--directory',
-                temp_path,
-            ],
-            check=True,
-        )
+    # Extract next to the destination, so the final move is a rename on the same file system:
+    temp_dir = local_path if stream else None
+    with TemporaryDirectory(prefix=TEMP_PREFIX, delete=delete_temp, dir=temp_dir) as temp_path:
+        if stream and not (cache and isinstance(hash_value, str) and cache.get(archive_info.url, hash_value)):
+            """DocWrite: setup_python.md ## Workflow - 4. Download and verify Archive
+            With `--stream` the download is piped through the hash check straight into `tar`,
+            so the archive is never stored on disk (and not stored in the download cache).
+            The extracted files are only used, if the hash is verified."""
+            stream_extract(
+                url=archive_info.url,
+                dst_path=temp_path,
+                total_size=archive_info.size,
+                hash_name=HASH_NAME,
+                hash_value=hash_value,
+                compress_program=compress_program,
+            )
+        else:
+            """DocWrite: setup_python.md ## Workflow - 4. Download and verify Archive
+            We check the file hash after downloading the archive."""
+            archive_temp_path = cached_download(
+                cache=cache,
+                url=archive_info.url,
+                dst_path=temp_path,
+                total_size=archive_info.size,
+                hash_name=HASH_NAME,
+                hash_value=hash_value,
+                connections=download_connections,
+            )
+
+            # Extract .tar.zstd archive file into temporary directory:
+            logger.debug('Extract %s into %s ...', archive_temp_path, temp_path)
+            run(
+                [
+                    'tar',
+                    f'--use-compress-program={compress_program}',
+                    '--extract',
+                    '--file',
+                    archive_temp_path,
+                    '--directory',
+                    temp_path,
+                ],
+                check=True,
+            )
+
+        hash_value = get_hash_value(hash_value)
+        logger.debug('%s hash value: %s', HASH_NAME, hash_value)
+        executor.shutdown()
+        connections.close()
 
         src_path = temp_path / 'python'
         assert_is_dir(src_path)
@@ -473,10 +1164,7 @@ def setup_python(
         The extracted Python will be moved to the final destination in `~/.local/pythonX.XX/`."""
         dest_path = Path.home() / '.local' / final_file_name
         logger.debug('Move %s to %s ...', src_path, dest_path)
-        if dest_path.exists():
-            logger.info('Remove existing %r ...', dest_path)
-            shutil.rmtree(dest_path)
-        shutil.move(src_path, dest_path)
+        replace_directory(src_path, dest_path)
 
     if has_install_dir:
         python_home_path = dest_path / 'install'
@@ -550,6 +1238,44 @@ def get_parser() -> argparse.ArgumentParser:
         action='store_true',
         help='Update local Python interpreter, even if it is up-to-date',
     )
+    parser.add_argument(
+        '--download-connections',
+        type=int,
+        default=DOWNLOAD_CONNECTIONS,
+        help='Number of parallel connections to download the archive',
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=argparse.SUPPRESS,  # Don't add the user specific default path to the help text
+        help='Directory to cache the verified downloads (default: ~/.cache/manageprojects/python/)',
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=int,
+        default=DEFAULT_CACHE_MAX_SIZE_MB,
+        help='Max. size of the download cache in MB, the oldest entries will be removed',
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not use the download cache',
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Extract while downloading: The archive is not stored on disk',
+    )
+    parser.add_argument(
+        '--metadata-ttl',
+        type=int,
+        default=DEFAULT_METADATA_TTL,
+        help='Seconds to use the cached release metadata without any request',
+    )
+    parser.add_argument(
+        '--arch',
+        help='Skip the CPU detection and use this architecture variant, e.g.: x86_64_v3, x86_64, aarch64',
+    )
     return parser
 
 
@@ -568,6 +1294,12 @@ def main(args=None):
         major_version=args.major_version,
         delete_temp=not args.skip_temp_deletion,
         force_update=args.force_update,
+        download_connections=args.download_connections,
+        cache_path=None if args.no_cache else getattr(args, 'cache_dir', DEFAULT_CACHE_PATH),
+        cache_max_size=args.cache_max_size * 1024 * 1024,
+        stream=args.stream,
+        metadata_ttl=args.metadata_ttl,
+        arch=args.arch,
     )
 
 
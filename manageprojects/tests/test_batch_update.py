@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+
+import yaml
+from bx_py_utils.test_utils.redirect import RedirectOut
+from cli_base.cli_tools.test_utils.git_utils import init_git
+
+from manageprojects.batch_update import (
+    CONFLICTED,
+    FAILED,
+    UP_TO_DATE,
+    UPDATED,
+    find_managed_projects,
+    update_managed_projects,
+)
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.pyproject_toml import PyProjectToml
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+def create_project(*, project_path: Path, template_path: Path, revision: str, git) -> None:
+    project_path.mkdir(parents=True)
+    Path(project_path, 'README.txt').write_text('Revision 1')
+    toml = PyProjectToml(project_path=project_path)
+    toml.init(
+        revision=revision,
+        dt=git.get_commit_date(verbose=False),
+        template=str(template_path),
+        directory='template_dir',
+    )
+    toml.create_or_update_cookiecutter_context(context={'cookiecutter': {'dir_name': project_path.name}})
+    toml.save()
+    init_git(project_path, comment='Git init project.')
+
+
+class BatchUpdateTestCase(BaseTestCase):
+    def test_find_managed_projects(self):
+        with TemporaryDirectory(prefix='test_find_managed_projects_') as main_temp_path:
+            for name in ('project1', 'project2', '.hidden/project3', 'project1/sub/project4'):
+                project_path = main_temp_path / name
+                project_path.mkdir(parents=True)
+                Path(project_path, 'pyproject.toml').write_text('[manageprojects]\ninitial_revision = "abc"\n')
+
+            not_managed = main_temp_path / 'not_managed'
+            not_managed.mkdir()
+            Path(not_managed, 'pyproject.toml').write_text('[project]\nname = "foo"\n')
+
+            self.assertEqual(
+                find_managed_projects([str(main_temp_path)]),
+                [main_temp_path / 'project1', main_temp_path / 'project2'],
+            )
+            self.assertEqual(
+                find_managed_projects([f'{main_temp_path}/project*', f'{main_temp_path}/.hidden/project3']),
+                [main_temp_path / 'project1', main_temp_path / 'project2', main_temp_path / '.hidden/project3'],
+            )
+            self.assertEqual(
+                find_managed_projects([str(main_temp_path / 'project1' / 'sub' / 'project4' / 'pyproject.toml')]),
+                [main_temp_path / 'project1' / 'sub' / 'project4'],
+            )
+
+    def test_update_managed_projects(self):
+        with TemporaryDirectory(prefix='test_update_managed_projects_') as main_temp_path:
+            template_path = main_temp_path / 'template'
+            template_dir_path = template_path / 'template_dir'
+            test_file_path = template_dir_path / '{{cookiecutter.dir_name}}' / 'README.txt'
+            test_file_path.parent.mkdir(parents=True)
+            test_file_path.write_text('Revision 1')
+            Path(template_dir_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_directory'}))
+            git, from_rev = init_git(template_path, comment='Git init template.')
+
+            projects_path = main_temp_path / 'projects'
+            for name in ('project1', 'project2', 'dirty_project'):
+                create_project(
+                    project_path=projects_path / name,
+                    template_path=template_path,
+                    revision=from_rev,
+                    git=git,
+                )
+            Path(projects_path, 'dirty_project', 'uncommitted.txt').touch()
+
+            config_file_path = main_temp_path / 'cookiecutter_config.yaml'
+            config_file_path.write_text(yaml.dump({'cookiecutters_dir': str(main_temp_path / '.cookiecutters')}))
+
+            with RedirectOut() as buffer:
+                results = update_managed_projects(sources=[str(projects_path)], jobs=1, config_file=config_file_path)
+            self.assertIn('Found 3 managed project(s)', buffer.stdout)
+            self.assertEqual(
+                {result.project_path.name: result.status for result in results},
+                {'dirty_project': UP_TO_DATE, 'project1': UP_TO_DATE, 'project2': UP_TO_DATE},
+            )
+            self.assertIn('Update summary', buffer.stdout)
+            self.assertIn('3 project(s): 0 updated, 3 up to date, 0 conflicted, 0 failed', buffer.stdout)
+
+            test_file_path.write_text('Revision 2')
+            git.add('.', verbose=False)
+            git.commit('Template rev 2', verbose=False)
+            to_rev = git.get_current_hash(verbose=False)
+
+            # project2 will update via git patch with a conflict:
+            Path(projects_path, 'project2', 'README.txt').write_text('Local changes')
+
+            with RedirectOut() as buffer:
+                results = update_managed_projects(
+                    sources=[str(projects_path / 'project1'), str(projects_path / 'dirty_project')],
+                    jobs=2,
+                    overwrite=True,
+                    config_file=config_file_path,
+                )
+                results += update_managed_projects(
+                    sources=[str(projects_path / 'project2')], overwrite=False, config_file=config_file_path
+                )
+
+            results = {result.project_path.name: result for result in results}
+            self.assertEqual(results['project1'].status, UPDATED)
+            self.assertEqual(results['project1'].from_rev, from_rev)
+            self.assertEqual(results['project1'].to_rev, to_rev)
+            self.assert_file_content(projects_path / 'project1' / 'README.txt', 'Revision 2')
+            self.assertEqual(PyProjectToml(projects_path / 'project1').get_mp_meta().applied_migrations, [to_rev])
+
+            self.assertEqual(results['dirty_project'].status, FAILED)
+            self.assertIn('is not clean', results['dirty_project'].output)
+
+            self.assertEqual(results['project2'].status, CONFLICTED)
+            self.assertEqual(results['project2'].message, '1 file(s) with rejected hunks (*.rej)')
+            self.assert_file_content(projects_path / 'project2' / 'README.txt', 'Local changes')
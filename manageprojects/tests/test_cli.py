@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import tempfile
 from pathlib import Path, PosixPath
 from unittest import mock
@@ -8,7 +10,6 @@ from cli_base.cli_tools.test_utils.assertion import assert_in
 from cli_base.cli_tools.test_utils.rich_test_utils import NoColorEnvRich
 
 from manageprojects import cli_app, cli_dev
-from manageprojects.cli_app import manage
 from manageprojects.constants import PY_BIN_PATH
 from manageprojects.data_classes import CookiecutterResult
 from manageprojects.test_utils.subprocess import SimpleRunReturnCallback, SubprocessCallMock
@@ -27,7 +28,9 @@ class CliTestCase(BaseTestCase):
         )
         with (
             NoColorEnvRich(),
-            mock.patch.object(manage, 'start_managed_project', MagicMock(return_value=result)) as m,
+            mock.patch(
+                'manageprojects.cookiecutter_templates.start_managed_project', MagicMock(return_value=result)
+            ) as m,
             RedirectOut() as buffer,
         ):
             cli_app.main(
@@ -59,12 +62,34 @@ class CliTestCase(BaseTestCase):
             ),
         )
 
+    def test_lazy_imports(self):
+        # The command implementations should be imported only if a command is called:
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                '-c',
+                'import sys, manageprojects.cli_app; print("\\n".join(sorted(sys.modules)))',
+            ],
+            text=True,
+        )
+        modules = set(output.splitlines())
+        self.assertIn('manageprojects.cli_app.manage', modules)
+        for name in (
+            'cookiecutter',
+            'tomlkit',
+            'manageprojects.cookiecutter_templates',
+            'manageprojects.batch_update',
+            'manageprojects.format_file',
+        ):
+            with self.subTest(name=name):
+                self.assertNotIn(name, modules)
+
     def test_update_project_cli(self):
         tempdir = tempfile.gettempdir()
 
         with (
             NoColorEnvRich(),
-            mock.patch.object(manage, 'update_managed_project') as m,
+            mock.patch('manageprojects.cookiecutter_templates.update_managed_project') as m,
             RedirectOut() as buffer,
         ):
             cli_app.main(args=('update-project', tempdir))
@@ -76,6 +101,8 @@ class CliTestCase(BaseTestCase):
             config_file=None,
             cleanup=True,
             input=False,
+            builtin_diff=False,
+            render_cache=True,
         )
         # self.assertEqual(redirected_out.stderr, '') https://github.com/editorconfig/editorconfig-core-py/issues/96
         assert_in(
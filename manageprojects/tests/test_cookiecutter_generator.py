@@ -1,12 +1,21 @@
+import io
+import re
 from pathlib import Path
 
+from bx_py_utils.test_utils.redirect import RedirectOut
+from cli_base.cli_tools.test_utils.git_utils import init_git
+
 from manageprojects.cookiecutter_generator import (
     build_dst_path,
+    create_cookiecutter_template,
     generate_reverse_info,
     iter_context,
     replace_path,
+    replace_str,
+    replace_stream,
 )
 from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
 
 
 class CookiecutterGeneratorTestCase(BaseTestCase):
@@ -52,6 +61,30 @@ class CookiecutterGeneratorTestCase(BaseTestCase):
             ),
         )
 
+    def test_replace_str(self):
+        reverse_info = generate_reverse_info(
+            cookiecutter_context={
+                'cookiecutter': {
+                    'package_name': 'PyInventory',
+                    'package_url': 'https://github.com/jedie/PyInventory',
+                    'author': 'jedie',
+                    'empty': '',
+                    'applied_migrations': ['877e2ec', 'be3f649'],
+                }
+            }
+        )
+        self.assertEqual(
+            replace_str('See https://github.com/jedie/PyInventory by jedie: PyInventory', reverse_info=reverse_info),
+            'See {{ cookiecutter.package_url }} by {{ cookiecutter.author }}: {{ cookiecutter.package_name }}',
+        )
+
+        # The inserted variables are never replaced again:
+        self.assertEqual(
+            replace_str('foo bar', reverse_info=(('foo bar', '{{ a }}'), ('a', '{{ b }}'))),
+            '{{ a }}',
+        )
+        self.assertEqual(replace_str('Nothing to replace', reverse_info=()), 'Nothing to replace')
+
     def test_replace_path(self):
         path = replace_path(
             path=Path('foo', 'bar', 'baz'),
@@ -77,3 +110,46 @@ class CookiecutterGeneratorTestCase(BaseTestCase):
             path,
             Path('/the/destination/{{ package_name }}/{{ dir_name }}/test.py'),
         )
+
+    def test_replace_stream(self):
+        replacements = {'PyInventory': '{{ name }}', 'Py': '{{ short }}'}
+        pattern = re.compile('PyInventory|Py')
+        content = 'PyInventory Py ' * 10 + 'PyInv'
+        expected = content.replace('PyInventory', '{{ name }}')
+        expected = expected.replace('Py ', '{{ short }} ').replace('PyInv', '{{ short }}Inv')
+        for chunk_size in (1, 2, 5, 11, 12, 1000):
+            with self.subTest(chunk_size=chunk_size):
+                dst_file = io.StringIO()
+                replace_stream(
+                    io.StringIO(content), dst_file, pattern=pattern, replacements=replacements, chunk_size=chunk_size
+                )
+                self.assertEqual(dst_file.getvalue(), expected)
+
+    def test_create_cookiecutter_template(self):
+        with TemporaryDirectory(prefix='test_create_cookiecutter_template_') as temp_path:
+            project_path = temp_path / 'project'
+            Path(project_path, 'pyinventory').mkdir(parents=True)
+            Path(project_path, 'pyinventory', '__init__.py').write_text('"""PyInventory by jedie"""')
+            Path(project_path, 'README.md').write_text('PyInventory\n' * 1000)
+            Path(project_path, 'binary.bin').write_bytes(b'PyInventory\0\xff')
+            Path(project_path, 'latin1.txt').write_bytes(b'PyInventory \xe4')
+            with RedirectOut():
+                init_git(project_path)
+
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs), RedirectOut() as buffer:
+                    destination = temp_path / f'template{jobs}'
+                    create_cookiecutter_template(
+                        source_path=project_path,
+                        destination=destination,
+                        cookiecutter_context={'cookiecutter': {'package_name': 'pyinventory', 'name': 'PyInventory'}},
+                        jobs=jobs,
+                    )
+                    self.assert_file_content(
+                        destination / '{{ cookiecutter.package_name }}' / '__init__.py',
+                        '"""{{ cookiecutter.name }} by jedie"""',
+                    )
+                    self.assert_file_content(destination / 'README.md', '{{ cookiecutter.name }}\n' * 1000)
+                    self.assertEqual(Path(destination, 'binary.bin').read_bytes(), b'PyInventory\0\xff')
+                    self.assertEqual(Path(destination, 'latin1.txt').read_bytes(), b'PyInventory \xe4')
+                    self.assertIn('Binary file', buffer.stdout)
@@ -16,6 +16,7 @@ from manageprojects.data_classes import CookiecutterResult, GenerateTemplatePatc
 from manageprojects.tests.base import BaseTestCase
 from manageprojects.utilities.pyproject_toml import PyProjectToml
 from manageprojects.utilities.temp_path import TemporaryDirectory
+from manageprojects.utilities.template_pool import POOL_DIR_NAME
 
 
 class CookiecutterTemplatesTestCase(BaseTestCase):
@@ -58,8 +59,9 @@ class CookiecutterTemplatesTestCase(BaseTestCase):
             logs.assert_in('Cookiecutter generated here', cookiecutter_output_dir)
 
             self.assertIsInstance(result, CookiecutterResult)
-            git_path = cookiecutters_dir / repro_name
-            self.assertEqual(result.git_path, git_path)
+            git_path = result.git_path  # A snapshot from the template repository pool
+            self.assertEqual(git_path.parent.parent, cookiecutters_dir / POOL_DIR_NAME / 'snapshots')
+            self.assertTrue(git_path.parent.name.startswith(f'{repro_name}_'))
             assert_is_dir(git_path)  # Checkout was made?
             assert_is_dir(cookiecutter_output_dir)  # Created from cookiecutter ?
 
@@ -1,8 +1,10 @@
 import inspect
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from bx_py_utils.test_utils.redirect import RedirectOut
+from cli_base.cli_tools.test_utils.git_utils import init_git
 from cli_base.cli_tools.test_utils.logs import AssertLogs
 from packaging.version import Version
 
@@ -12,6 +14,8 @@ from manageprojects.format_file import (
     Config,
     GitInfo,
     PyProjectInfo,
+    ToolsExecutor,
+    format_ranges,
     format_sources,
     get_config,
     get_editorconfig_max_line_length,
@@ -254,3 +258,88 @@ class FormatFileTestCase(TestCase):
                 ['.../ty', 'check', 'manageprojects/tests/test_format_file.py'],
             ],
         )
+
+    def test_format_ranges_single_pass(self):
+        config = Config(git_info=None, pyproject_info=PyProjectInfo(py_min_ver=Version('3.12')), max_line_length=119)
+        sources = {
+            'independent ranges': (
+                inspect.cleandoc("""
+                    def one( a ):
+                        return {  'a':a }
+                    def two( a ):
+                        return {  'a':a }
+                    def three( a ):
+                        return {  'a':a }
+                """),
+                [(2, 3), (6, 7)],
+            ),
+            'overlapping statement': (
+                inspect.cleandoc("""
+                    x = dict(
+                        a = 1,
+                        b=[ 1,2 ],
+                        c = 3,
+                        d=[ 4,5 ],
+                    )
+                """),
+                [(2, 3), (5, 6)],
+            ),
+        }
+        with TemporaryDirectory(prefix='test_format_ranges_single_pass') as temp_path:
+            tools_executor = ToolsExecutor(cwd=temp_path)
+            file_path = Path('example.py')
+            for name, (source, ranges) in sources.items():
+                with self.subTest(name):
+                    results = []
+                    for single_pass in (False, True):
+                        Path(temp_path, file_path).write_text(source)
+                        with RedirectOut() as redirected_out:
+                            format_ranges(tools_executor, file_path, config, ranges, single_pass=single_pass)
+                        self.assertEqual(redirected_out.stderr, '')
+                        results.append(Path(temp_path, file_path).read_text())
+                    ranged_result, single_pass_result = results
+                    self.assertNotEqual(ranged_result, source)
+                    self.assertEqual(single_pass_result, ranged_result)
+
+            # The number of concurrent ruff calls is limited by "jobs":
+            Path(temp_path, file_path).write_text(sources['independent ranges'][0])
+            with (
+                mock.patch('manageprojects.format_file.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as executor_mock,
+                RedirectOut(),
+            ):
+                format_ranges(tools_executor, file_path, config, [(2, 3), (6, 7)], jobs=1)
+            executor_mock.assert_called_once_with(max_workers=1)
+
+    def test_format_changed_files(self):
+        with TemporaryDirectory(prefix='test_format_changed_files') as temp_path:
+            Path(temp_path, 'pyproject.toml').write_text('[project]\nrequires-python = ">=3.12"\n')
+            Path(temp_path, 'one.py').write_text("def one( a ):\n    return a\n")
+            Path(temp_path, 'two.py').write_text("def two( a ):\n    return a\n")
+            Path(temp_path, 'unchanged.py').write_text("def unchanged( a ):\n    return a\n")
+            with RedirectOut():
+                init_git(temp_path)
+
+            # Change only the "return" lines:
+            Path(temp_path, 'one.py').write_text("def one( a ):\n    return {  'a':a }\n")
+            Path(temp_path, 'two.py').write_text("def two( a ):\n    return [ a,a ]\n")
+            Path(temp_path, 'notes.txt').write_text('Not a Python file')
+
+            with RedirectOut() as redirected_out, AssertLogs(self, loggers=('cli_base',)):
+                format_sources(
+                    file_path=temp_path,
+                    default_min_py_version='3.12',
+                    default_max_line_length=119,
+                    jobs=2,
+                )
+            stdout = redirected_out.stdout
+            self.assertIn('Skip non-Python file', stdout)
+
+            # The output is grouped per file:
+            self.assertIn('Format changes in: one.py\nAll git diff code ranges: [(2, 3)]', stdout)
+            self.assertIn('Format changes in: two.py\nAll git diff code ranges: [(2, 3)]', stdout)
+            self.assertNotIn('unchanged.py', stdout)
+
+            # Only the changed lines are formatted:
+            self.assertEqual(Path(temp_path, 'one.py').read_text(), 'def one( a ):\n    return {"a": a}\n')
+            self.assertEqual(Path(temp_path, 'two.py').read_text(), "def two( a ):\n    return [a, a]\n")
+            self.assertEqual(Path(temp_path, 'unchanged.py').read_text(), "def unchanged( a ):\n    return a\n")
@@ -0,0 +1,151 @@
+import os
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import TestCase, mock
+
+from bx_py_utils.test_utils.redirect import RedirectOut
+
+from manageprojects.format_file_client import format_via_server, get_socket_path
+from manageprojects.format_file_server import ConfigCache, FormatFileServer, run_server, stop_server
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class FormatFileServerTestCase(TestCase):
+    def test_config_cache(self):
+        with TemporaryDirectory(prefix='test_config_cache_') as temp_path, RedirectOut() as buffer:
+            pyproject_toml_path = temp_path / 'pyproject.toml'
+            pyproject_toml_path.write_text('[project]\nrequires-python = ">=3.11"\n')
+            file_path = temp_path / 'foo.py'
+            file_path.touch()
+
+            config_cache = ConfigCache()
+            config = config_cache.get_config(file_path, default_min_py_version='3.9', default_max_line_length=100)
+            self.assertEqual(config.py_ver_str, 'py311')
+            self.assertEqual(config.max_line_length, 100)
+            self.assertIs(
+                config_cache.get_config(file_path, default_min_py_version='3.9', default_max_line_length=100),
+                config,
+            )
+
+            # Changed pyproject.toml -> collect the config again:
+            pyproject_toml_path.write_text('[project]\nrequires-python = ">=3.12"\n')
+            os.utime(pyproject_toml_path, ns=(1, 1))
+            config = config_cache.get_config(file_path, default_min_py_version='3.9', default_max_line_length=100)
+            self.assertEqual(config.py_ver_str, 'py312')
+
+            # New .editorconfig -> collect the config again:
+            (temp_path / '.editorconfig').write_text('root = true\n[*.py]\nmax_line_length = 88\n')
+            config = config_cache.get_config(file_path, default_min_py_version='3.9', default_max_line_length=100)
+            self.assertEqual(config.max_line_length, 88)
+
+        self.assertEqual(buffer.stdout.count('Use cached config'), 1)
+        self.assertEqual(buffer.stdout.count('Project meta files changed'), 2)
+
+    def test_server(self):
+        with TemporaryDirectory(prefix='test_format_file_server_') as temp_path, RedirectOut() as buffer:
+            socket_path = temp_path / 'format-file.sock'
+            file_path = temp_path / 'foo.txt'
+            file_path.touch()
+            kwargs = {
+                'socket_path': socket_path,
+                'file_path': file_path,
+                'default_min_py_version': '3.10',
+                'default_max_line_length': 119,
+                'max_distance': 1,
+                'jobs': 1,
+            }
+            self.assertFalse(format_via_server(**kwargs))
+
+            with FormatFileServer(socket_path) as server:
+                thread = threading.Thread(target=server.serve_until_stopped)
+                thread.start()
+                self.assertTrue(format_via_server(**kwargs))
+                self.assertTrue(format_via_server(**kwargs))
+                stop_server(socket_path)
+                thread.join(timeout=10)
+            self.assertFalse(thread.is_alive())
+
+        stdout = buffer.stdout
+        self.assertEqual(stdout.count('Skip non-Python file'), 2)
+        self.assertEqual(stdout.count('Use cached config'), 1)
+        self.assertIn('format-file server stopped.', stdout)
+
+    def test_server_captures_tool_output(self):
+        with TemporaryDirectory(prefix='test_format_file_server_') as temp_path, RedirectOut() as buffer:
+            socket_path = temp_path / 'format-file.sock'
+            file_path = temp_path / 'bad.py'
+            file_path.write_text('x = undefined_name\n')
+
+            with FormatFileServer(socket_path) as server:
+                thread = threading.Thread(target=server.serve_until_stopped)
+                thread.start()
+                with RedirectOut() as client_buffer:
+                    self.assertTrue(
+                        format_via_server(
+                            socket_path=socket_path,
+                            file_path=file_path,
+                            default_min_py_version='3.11',
+                            default_max_line_length=119,
+                            max_distance=1,
+                            jobs=1,
+                        )
+                    )
+                stop_server(socket_path)
+                thread.join(timeout=10)
+
+        # The lint error of ruff is in the response for the client:
+        self.assertIn('F821', client_buffer.stdout)
+        self.assertIn('undefined_name', client_buffer.stdout)
+        self.assertNotIn('F821', buffer.stdout)
+
+    def test_stop_without_server(self):
+        with RedirectOut() as buffer:
+            stop_server(Path('/does/not/exists.sock'))
+        self.assertIn('No format-file server running', buffer.stdout)
+
+    def test_get_socket_path(self):
+        with TemporaryDirectory(prefix='test_get_socket_path_') as temp_path:
+            with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': str(temp_path)}):
+                self.assertEqual(get_socket_path(), temp_path / f'manageprojects-format-file-{os.getuid()}.sock')
+
+            # Fallback to a private directory in the temp directory:
+            private_dir = temp_path / f'manageprojects-{os.getuid()}'
+            with (
+                mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': ''}),
+                mock.patch.object(tempfile, 'gettempdir', return_value=str(temp_path)),
+            ):
+                self.assertEqual(get_socket_path(), private_dir / 'format-file.sock')
+                self.assertEqual(stat.S_IMODE(private_dir.stat().st_mode), 0o700)
+                self.assertEqual(get_socket_path(), private_dir / 'format-file.sock')
+
+                # Never use a directory that other users can access:
+                private_dir.chmod(0o777)
+                with self.assertRaisesRegex(PermissionError, 'is not private to the current user'):
+                    get_socket_path()
+
+                private_dir.rmdir()
+                other_dir = temp_path / 'other'
+                other_dir.mkdir(mode=0o700)
+                private_dir.symlink_to(other_dir)
+                with self.assertRaisesRegex(PermissionError, 'is not private to the current user'):
+                    get_socket_path()
+
+    def test_run_server_socket_permissions(self):
+        with TemporaryDirectory(prefix='test_run_server_') as temp_path, RedirectOut() as buffer:
+            socket_path = temp_path / 'format-file.sock'
+            thread = threading.Thread(target=run_server, args=(socket_path,), kwargs={'idle_timeout': 10})
+            thread.start()
+            try:
+                for _ in range(100):
+                    if socket_path.exists():
+                        break
+                    time.sleep(0.05)
+                self.assertEqual(stat.S_IMODE(socket_path.stat().st_mode), 0o600)
+            finally:
+                stop_server(socket_path)
+                thread.join(timeout=10)
+            self.assertFalse(socket_path.exists())
+        self.assertIn('format-file server listening on', buffer.stdout)
@@ -1,16 +1,28 @@
 import filecmp
 import inspect
+import json
+import os
+import shutil
 import subprocess
 import sys
 import tempfile
 from pathlib import Path
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from bx_py_utils.path import assert_is_file
 from rich import print
 from rich.rule import Rule
 
-from manageprojects.install_python import extract_versions, get_latest_versions
+from manageprojects.install_python import (
+    DownloadCache,
+    extract_versions,
+    get_build_env,
+    get_configure_cache_file,
+    get_latest_versions,
+    get_startup_time,
+    sync_sources,
+    update_build_info,
+)
 from manageprojects.tests.docwrite_macros_install_python import EXAMPLE_SCRIPT_PATH
 from manageprojects.utilities.include_install_python import SOURCE_PATH, IncludeInstallPythonBaseTestCase
 
@@ -125,6 +137,115 @@ class TestGetLatestPythonVersion(TestCase):
         )
 
 
+class BuildCacheTestCase(TestCase):
+    def test_sync_sources(self):
+        with tempfile.TemporaryDirectory(prefix='test_sync_sources_') as temp_dir:
+            src_path = Path(temp_dir, 'src')
+            (src_path / 'Modules').mkdir(parents=True)
+            (src_path / 'configure').write_text('configure v1')
+            (src_path / 'Modules' / 'main.c').write_text('main v1')
+            build_path = Path(temp_dir, 'build')
+            build_path.mkdir()
+
+            self.assertEqual(sync_sources(src_path, build_path), 2)
+            self.assertEqual((build_path / 'Modules' / 'main.c').read_text(), 'main v1')
+            os.utime(build_path / 'configure', (1, 1))
+            os.utime(build_path / 'Modules' / 'main.c', (1, 1))
+
+            # A new point release changed only one file:
+            (src_path / 'Modules' / 'main.c').write_text('main v2')
+            self.assertEqual(sync_sources(src_path, build_path), 1)
+            self.assertEqual((build_path / 'Modules' / 'main.c').read_text(), 'main v2')
+            self.assertGreater((build_path / 'Modules' / 'main.c').stat().st_mtime, 1)
+            self.assertEqual((build_path / 'configure').stat().st_mtime, 1)  # Not touched
+
+            self.assertEqual(sync_sources(src_path, build_path), 0)
+
+            # Build outputs are kept, but files removed in a new release are removed:
+            (build_path / 'Modules' / 'main.o').write_text('build output')
+            (src_path / 'Lib' / 'old_package').mkdir(parents=True)
+            (src_path / 'Lib' / 'old_package' / '__init__.py').touch()
+            self.assertEqual(sync_sources(src_path, build_path), 1)
+            self.assertTrue((build_path / 'Lib' / 'old_package' / '__init__.py').is_file())
+
+            shutil.rmtree(src_path / 'Lib')
+            (src_path / 'configure').unlink()
+            self.assertEqual(sync_sources(src_path, build_path), 2)
+            self.assertFalse((build_path / 'configure').exists())
+            self.assertFalse((build_path / 'Lib').exists())
+            self.assertEqual(sorted(path.name for path in (build_path / 'Modules').iterdir()), ['main.c', 'main.o'])
+
+    def test_get_configure_cache_file(self):
+        kwargs = {'build_path': Path('/build'), 'configure_args': ['./configure', '--enable-optimizations']}
+        cache_file = get_configure_cache_file(version='3.12.5', env={'CC': 'gcc'}, **kwargs)
+        self.assertRegex(str(cache_file), r'^/build/config-[0-9a-f]{16}\.cache$')
+        self.assertEqual(get_configure_cache_file(version='3.12.5', env={'CC': 'gcc'}, **kwargs), cache_file)
+        self.assertNotEqual(get_configure_cache_file(version='3.12.5', env={'CC': 'ccache gcc'}, **kwargs), cache_file)
+        self.assertNotEqual(get_configure_cache_file(version='3.12.6', env={'CC': 'gcc'}, **kwargs), cache_file)
+
+    def test_get_build_env(self):
+        with mock.patch.object(shutil, 'which', return_value='/usr/bin/ccache'):
+            for cc, expected_cc in (
+                ('gcc', '/usr/bin/ccache gcc'),
+                ('ccache gcc', 'ccache gcc'),
+                ('/usr/local/bin/ccache clang', '/usr/local/bin/ccache clang'),
+            ):
+                with self.subTest(cc=cc), mock.patch.dict(os.environ, {'CC': cc}):
+                    self.assertEqual(get_build_env(use_ccache=True)['CC'], expected_cc)
+                    # A second call doesn't wrap it again:
+                    with mock.patch.dict(os.environ, {'CC': expected_cc}):
+                        self.assertEqual(get_build_env(use_ccache=True)['CC'], expected_cc)
+                    self.assertEqual(get_build_env(use_ccache=False)['CC'], cc)
+
+
+class DownloadCacheTestCase(TestCase):
+    def test_prune_removed_entry(self):
+        with tempfile.TemporaryDirectory(prefix='test_prune_removed_entry_') as temp_dir:
+            temp_path = Path(temp_dir)
+            cache = DownloadCache(temp_path, max_size=50)
+            # A entry that is removed by a concurrent run while it's scanned:
+            removed_path = temp_path / cache.get_key('https://test.tld/removed.tar', '')
+            removed_path.mkdir()
+            (removed_path / 'removed.tar').symlink_to(temp_path / 'does-not-exist')
+
+            source_path = temp_path / 'source'
+            source_path.write_bytes(b'X' * 100)
+            file_path = cache.put('https://test.tld/file.tar', source_path)
+            self.assertEqual(file_path.read_bytes(), b'X' * 100)
+
+
+class BuildProfileTestCase(TestCase):
+    def test_update_build_info(self):
+        with tempfile.TemporaryDirectory(prefix='test_update_build_info_') as temp_dir:
+            info_path = Path(temp_dir, 'python3.12.build-info.json')
+            info = update_build_info(
+                info_path,
+                profile_name='fast',
+                info={'version': '3.12.5', 'build_time': 60.0, 'startup_ms': 15.0},
+            )
+            self.assertEqual(info['profile'], 'fast')
+            self.assertEqual(list(info['profiles']), ['fast'])
+
+            info = update_build_info(
+                info_path,
+                profile_name='max',
+                info={'version': '3.12.5', 'build_time': 900.0, 'startup_ms': 11.0},
+            )
+            self.assertEqual(info['build_time'], 900.0)
+            self.assertEqual(
+                info['profiles'],
+                {
+                    'fast': {'version': '3.12.5', 'build_time': 60.0, 'startup_ms': 15.0},
+                    'max': {'version': '3.12.5', 'build_time': 900.0, 'startup_ms': 11.0},
+                },
+            )
+            self.assertEqual(json.loads(info_path.read_text()), info)
+
+    def test_get_startup_time(self):
+        startup_ms = get_startup_time(sys.executable, repeat=2)
+        self.assertGreater(startup_ms, 0)
+
+
 class IncludeInstallPythonTestCase(IncludeInstallPythonBaseTestCase):
     maxDiff = None
 
@@ -1,6 +1,7 @@
 import inspect
 import json
 from pathlib import Path
+from unittest import mock
 
 from bx_py_utils.path import assert_is_file
 from bx_py_utils.test_utils.redirect import RedirectOut
@@ -9,7 +10,9 @@ from cli_base.cli_tools.test_utils.logs import AssertLogs
 
 from manageprojects.cookiecutter_templates import update_managed_project
 from manageprojects.data_classes import ManageProjectsMeta, OverwriteResult
+from manageprojects.overwrite import overwrite_project
 from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities import file_manifest
 from manageprojects.utilities.pyproject_toml import PyProjectToml
 from manageprojects.utilities.temp_path import TemporaryDirectory
 
@@ -170,6 +173,7 @@ class UpdateByOverwriteTestCase(BaseTestCase):
             )
             assert_is_file(path=Path(project_path, 'a_new_file.txt'))
             assert_is_file(path=Path(project_path, 'new_dir1', 'new_dir2', 'a_file.txt'))
+            assert_is_file(path=Path(project_path, '.manageprojects', 'file_manifest.json'))
 
             self.assertIsInstance(result, OverwriteResult)
             self.assertEqual(
@@ -189,3 +193,92 @@ class UpdateByOverwriteTestCase(BaseTestCase):
             self.assertEqual(mp_meta.applied_migrations, [to_rev])
             content = toml.dumps()
             self.assertIn('[manageprojects] # https://github.com/jedie/manageprojects', content)
+
+            #############################################################################
+            # Local modifications are detected via the file manifest:
+
+            a_new_file_path = Path(project_path, 'a_new_file.txt')
+            a_new_file_path.write_text('Locally modified and template unchanged')
+            dst_file_path.write_text('# Locally modified')
+            project_git.add('.', verbose=False)
+            project_git.commit('Template rev 2 and local changes', verbose=False)
+
+            test_file_path.write_text('# Revision 3')
+            git.add('.', verbose=False)
+            git.commit('Template rev 3', verbose=False)
+            rev3 = git.get_current_hash(verbose=False)
+
+            with RedirectOut() as buffer, AssertLogs(self):
+                result = update_managed_project(
+                    project_path=project_path,
+                    overwrite=True,  # Update by overwrite
+                    config_file=config_file_path,
+                    cleanup=False,  # Keep temp files if this test fails, for better debugging
+                    input=False,  # No user input in tests ;)
+                )
+            self.assertIn('Skip locally modified file', buffer.stdout)
+            self.assertIn('UPDATE locally modified file', buffer.stdout)
+            self.assertIn('1 locally modified file(s) overwritten', buffer.stdout)
+            self.assertIsInstance(result, OverwriteResult)
+            self.assertEqual(result.to_rev, rev3)
+            self.assertEqual(result.locally_modified, [dst_file_path])
+            self.assert_file_content(dst_file_path, '# Revision 3')
+            self.assert_file_content(a_new_file_path, 'Locally modified and template unchanged')
+
+    def test_manifest_of_up_to_date_project(self):
+        cookiecutter_context = {'dir_name': 'a_directory', 'value': 'FooBar'}
+
+        with TemporaryDirectory(prefix='test_manifest_of_up_to_date_project_') as main_temp_path:
+            template_path = main_temp_path / 'template'
+            template_dir_path = template_path / 'template_dir'
+            config_file_path = template_dir_path / 'cookiecutter.json'
+            config_file_path.parent.mkdir(parents=True)
+            config_file_path.write_text(json.dumps(cookiecutter_context))
+            test_file_path = template_dir_path / '{{cookiecutter.dir_name}}' / 'README.txt'
+            test_file_path.parent.mkdir()
+            test_file_path.write_text('Value: {{ cookiecutter.value }}')
+            with RedirectOut():
+                _template_git, from_rev = init_git(template_path, comment='Git init template.')
+
+            # The project is already up-to-date, but has no file manifest:
+            project_path = main_temp_path / 'project_path'
+            project_path.mkdir()
+            Path(project_path, 'README.txt').write_text('Value: FooBar')
+            with RedirectOut():
+                project_git, _project_rev = init_git(project_path, comment='Git init project.')
+            manifest_path = project_path / '.manageprojects' / 'file_manifest.json'
+
+            def overwrite():
+                with (
+                    RedirectOut() as buffer,
+                    AssertLogs(self),
+                    mock.patch.object(file_manifest, 'get_file_hash', wraps=file_manifest.get_file_hash) as hash_mock,
+                ):
+                    result = overwrite_project(
+                        git=project_git,
+                        project_path=project_path,
+                        template=str(template_path),
+                        directory='template_dir',
+                        from_rev=from_rev,
+                        replay_context={'cookiecutter': cookiecutter_context},
+                        config_file=config_file_path,
+                        cleanup=False,  # Keep temp files if this test fails, for better debugging
+                        no_input=True,
+                        render_cache=False,
+                    )
+                self.assertIsNone(result)  # Nothing updated
+                self.assertIn('Skip unchanged file', buffer.stdout)
+                return hash_mock
+
+            hash_mock = overwrite()
+            hash_mock.assert_called_once_with(project_path / 'README.txt')
+            assert_is_file(manifest_path)
+
+            project_git.add('.', verbose=False)
+            project_git.commit('Add file manifest', verbose=False)
+            manifest_content = manifest_path.read_text()
+
+            # The project files are not read again:
+            hash_mock = overwrite()
+            hash_mock.assert_not_called()
+            self.assertEqual(manifest_path.read_text(), manifest_content)
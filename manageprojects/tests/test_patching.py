@@ -1,16 +1,21 @@
 import inspect
 import json
 from pathlib import Path
+from unittest.mock import patch
 
+import yaml
 from bx_py_utils.path import assert_is_dir
 from bx_py_utils.test_utils.snapshot import assert_text_snapshot
+from cli_base.cli_tools.git import Git
 from cli_base.cli_tools.test_utils.git_utils import init_git
 from cli_base.cli_tools.test_utils.logs import AssertLogs
 
-from manageprojects.data_classes import GenerateTemplatePatchResult
-from manageprojects.patching import generate_template_patch, make_git_diff
+from manageprojects.data_classes import GenerateTemplatePatchResult, UnchangedTemplateResult
+from manageprojects.patching import generate_template_patch, has_template_changes, make_git_diff
 from manageprojects.tests.base import BaseTestCase
 from manageprojects.utilities.temp_path import TemporaryDirectory
+from manageprojects.utilities.template_pool import POOL_DIR_NAME
+from manageprojects.utilities.tree_diff import make_tree_diff
 
 
 class PatchingTestCase(BaseTestCase):
@@ -49,7 +54,16 @@ class PatchingTestCase(BaseTestCase):
             self.assertIn('rename to new_name.txt', patch)
             assert_text_snapshot(got=patch, extension='.patch')
 
+            # The builtin diff must create the same patch:
+            patch = make_tree_diff(from_path=from_path, to_path=to_path)
+            assert_text_snapshot(got=patch, snapshot_name='test_patching_make_git_diff_1', extension='.patch')
+
     def test_generate_template_patch(self):
+        for builtin_diff in (False, True):
+            with self.subTest(builtin_diff=builtin_diff):
+                self._test_generate_template_patch(builtin_diff=builtin_diff)
+
+    def _test_generate_template_patch(self, builtin_diff: bool):
         rev1_content = inspect.cleandoc(
             '''
             # This is a test line, not changed
@@ -93,6 +107,10 @@ class PatchingTestCase(BaseTestCase):
 
             git, from_rev = init_git(repo_path)
 
+            cookiecutters_dir = main_temp_path / '.cookiecutters'
+            config_file_path = main_temp_path / 'cookiecutter_config.yaml'
+            config_file_path.write_text(yaml.dump({'cookiecutters_dir': str(cookiecutters_dir)}))
+
             test_file_path.write_text(rev2_content)
             git.add('.', verbose=False)
             git.commit('The second commit', verbose=False)
@@ -114,8 +132,11 @@ class PatchingTestCase(BaseTestCase):
                     directory=None,
                     from_rev=from_rev,
                     replay_context={},
+                    config_file=config_file_path,
                     cleanup=False,  # Keep temp files if this test fails, for better debugging
                     no_input=True,  # No user input in tests ;)
+                    builtin_diff=builtin_diff,
+                    render_cache=False,
                 )
             logs.assert_in("Call 'cookiecutter'", 'Write patch file')
             self.assertIsInstance(result, GenerateTemplatePatchResult)
@@ -146,7 +167,7 @@ class PatchingTestCase(BaseTestCase):
                 ),
             )
 
-            # The repro path contains the "from" revision:
+            # The "from" revision is rendered from a snapshot -> The template checkout is not reset:
             assert_is_dir(result.repo_path)
             self.assert_file_content(
                 Path(
@@ -154,5 +175,112 @@ class PatchingTestCase(BaseTestCase):
                     '{{cookiecutter.dir_name}}',
                     '{{cookiecutter.file_name}}.py',
                 ),
-                rev1_content,
+                rev2_content,
             )
+            snapshots = list(Path(cookiecutters_dir, POOL_DIR_NAME, 'snapshots').glob('*/*'))
+            self.assertEqual(len(snapshots), 1)
+            self.assertEqual(Git(cwd=snapshots[0], detect_root=False).get_current_hash(verbose=False), from_rev)
+
+            # Nothing is rendered, if the latest revision is already applied:
+            with patch('manageprojects.patching.execute_cookiecutter') as execute_cookiecutter_mock:
+                result = generate_template_patch(
+                    project_path=project_path,
+                    template=str(repo_path),
+                    directory=None,
+                    from_rev=to_rev,
+                    replay_context={},
+                    config_file=config_file_path,
+                    no_input=True,
+                    builtin_diff=builtin_diff,
+                )
+            self.assertIsNone(result)
+            execute_cookiecutter_mock.assert_not_called()
+
+    def test_unchanged_template(self):
+        with TemporaryDirectory(prefix='test_unchanged_template_') as main_temp_path:
+            repo_path = main_temp_path / 'repo_path'
+            template_path = repo_path / 'template'
+            test_file_path = template_path / '{{cookiecutter.dir_name}}' / 'README.md'
+            test_file_path.parent.mkdir(parents=True)
+            test_file_path.write_text('Revision 1')
+            Path(template_path, 'cookiecutter.json').write_text('{"dir_name": "a_directory"}')
+            readme_path = repo_path / 'README.md'
+            readme_path.write_text('The template repository')
+
+            git, from_rev = init_git(repo_path)
+
+            # Change only a file outside the template directory:
+            readme_path.write_text('The template repository, changed')
+            git.add('.', verbose=False)
+            git.commit('Update README', verbose=False)
+            to_rev = git.get_current_hash(verbose=False)
+
+            self.assertFalse(has_template_changes(git, template_path=template_path, from_rev=from_rev, to_rev=to_rev))
+
+            with patch('manageprojects.patching.execute_cookiecutter') as execute_cookiecutter_mock:
+                result = generate_template_patch(
+                    project_path=main_temp_path / 'project',
+                    template=str(repo_path),
+                    directory='template',
+                    from_rev=from_rev,
+                    replay_context={},
+                    no_input=True,
+                )
+            execute_cookiecutter_mock.assert_not_called()
+            self.assertIsInstance(result, UnchangedTemplateResult)
+            self.assertEqual(result.from_rev, from_rev)
+            self.assertEqual(result.to_rev, to_rev)
+
+            # Uncommitted changes in the template directory are always changes:
+            test_file_path.write_text('Revision 2')
+            self.assertTrue(has_template_changes(git, template_path=template_path, from_rev=from_rev, to_rev=to_rev))
+
+            # A changed file in the project template is a change:
+            git.add('.', verbose=False)
+            git.commit('Revision 2', verbose=False)
+            new_rev = git.get_current_hash(verbose=False)
+            self.assertTrue(has_template_changes(git, template_path=template_path, from_rev=from_rev, to_rev=new_rev))
+            self.assertFalse(has_template_changes(git, template_path=template_path, from_rev=new_rev, to_rev=new_rev))
+
+            # Also changes in the hooks:
+            hooks_path = template_path / 'hooks'
+            hooks_path.mkdir()
+            Path(hooks_path, 'post_gen_project.py').write_text('print("Hello")')
+            git.add('.', verbose=False)
+            git.commit('Add hook', verbose=False)
+            hook_rev = git.get_current_hash(verbose=False)
+            self.assertTrue(has_template_changes(git, template_path=template_path, from_rev=new_rev, to_rev=hook_rev))
+
+            # Every other file in the template directory is a render input, e.g.: a local extensions package:
+            extensions_path = template_path / 'local_extensions'
+            extensions_path.mkdir()
+            Path(extensions_path, '__init__.py').write_text('EXTENSIONS = []')
+            git.add('.', verbose=False)
+            git.commit('Add local extensions', verbose=False)
+            ext_rev = git.get_current_hash(verbose=False)
+            self.assertTrue(has_template_changes(git, template_path=template_path, from_rev=hook_rev, to_rev=ext_rev))
+
+    def test_unchanged_root_template(self):
+        with TemporaryDirectory(prefix='test_unchanged_root_template_') as repo_path:
+            test_file_path = repo_path / '{{cookiecutter.dir_name}}' / 'README.md'
+            test_file_path.parent.mkdir(parents=True)
+            test_file_path.write_text('Revision 1')
+            Path(repo_path, 'cookiecutter.json').write_text('{"dir_name": "a_directory"}')
+            readme_path = repo_path / 'README.md'
+            readme_path.write_text('The template repository')
+
+            git, from_rev = init_git(repo_path)
+
+            # The README of the template repository is not used for rendering:
+            readme_path.write_text('The template repository, changed')
+            git.add('.', verbose=False)
+            git.commit('Update README', verbose=False)
+            to_rev = git.get_current_hash(verbose=False)
+            self.assertFalse(has_template_changes(git, template_path=repo_path, from_rev=from_rev, to_rev=to_rev))
+
+            # But any other file is a render input:
+            Path(repo_path, 'my_extensions.py').write_text('EXTENSIONS = []')
+            git.add('.', verbose=False)
+            git.commit('Add extensions', verbose=False)
+            ext_rev = git.get_current_hash(verbose=False)
+            self.assertTrue(has_template_changes(git, template_path=repo_path, from_rev=to_rev, to_rev=ext_rev))
@@ -0,0 +1,458 @@
+import fcntl
+import hashlib
+import http.server
+import io
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tarfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch
+from urllib.error import HTTPError
+
+from bx_py_utils.test_utils.redirect import RedirectOut
+
+from manageprojects.setup_python import (
+    DownloadCache,
+    KeepAliveConnections,
+    MetadataCache,
+    cached_download,
+    detect_arch,
+    download,
+    get_cpu_flags,
+    probe_platform,
+    replace_directory,
+    stream_extract,
+)
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+PAYLOAD = bytes(range(256)) * 400  # 102400 Bytes
+PAYLOAD_HASH = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+def create_local_connection(address, timeout=None, source_address=None, **kwargs):
+    """
+    Replacement for the denied socket.create_connection() in tests: Allow only connections to the local test server.
+    """
+    assert address[0] == '127.0.0.1', f'Only local connections allowed, not: {address}'
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if isinstance(timeout, (int, float)):
+        sock.settimeout(timeout)
+    sock.connect(address)
+    return sock
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serve PAYLOAD with (optional) support for HTTP Range requests.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.headers.get('Range'))
+            fail = server.max_requests is not None and len(server.requests) > server.max_requests
+        if fail:
+            self.send_error(500)
+            return
+
+        range_header = self.headers.get('Range')
+        if server.support_ranges and range_header:
+            start, end = map(int, re.fullmatch(r'bytes=(\d+)-(\d+)', range_header).groups())
+            data = server.payload[start : end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(server.payload)}')
+        else:
+            data = server.payload
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetadataRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serve a JSON file with ETag support over HTTP/1.1 keep-alive connections.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.client_address[1], self.path, self.headers.get('If-None-Match')))
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/latest.json')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            data = server.body.encode()
+            self.send_response(200)
+            self.send_header('ETag', server.etag)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetadataTestCase(TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), MetadataRequestHandler)
+        self.server.requests = []
+        self.server.etag = '"v1"'
+        self.server.body = '{"tag": "v1"}'
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/latest.json'
+
+        connection_patcher = patch('socket.create_connection', create_local_connection)
+        connection_patcher.start()
+        self.addCleanup(connection_patcher.stop)
+
+        self.connections = KeepAliveConnections()
+        self.addCleanup(self.connections.close)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_keep_alive(self):
+        with RedirectOut():
+            self.assertEqual(self.connections.fetch(self.url), b'{"tag": "v1"}')
+            redirect_url = self.url.replace('latest.json', 'redirect')
+            self.assertEqual(self.connections.fetch(redirect_url), b'{"tag": "v1"}')
+        self.assertEqual([path for _, path, _ in self.server.requests], ['/latest.json', '/redirect', '/latest.json'])
+        client_ports = {port for port, _, _ in self.server.requests}
+        self.assertEqual(len(client_ports), 1)  # All requests over one connection
+
+    def test_metadata_cache(self):
+        with TemporaryDirectory(prefix='test_metadata_cache_') as temp_path, RedirectOut():
+            metadata_cache = MetadataCache(temp_path, ttl=60)
+            self.assertEqual(metadata_cache.fetch(self.url, self.connections), b'{"tag": "v1"}')
+            self.assertEqual(metadata_cache.fetch(self.url, self.connections), b'{"tag": "v1"}')
+            self.assertEqual(len(self.server.requests), 1)  # Second call within the TTL: No request
+
+            # After the TTL: Revalidate with the ETag
+            metadata_cache.ttl = 0
+            self.assertEqual(metadata_cache.fetch(self.url, self.connections), b'{"tag": "v1"}')
+            self.assertEqual(self.server.requests[-1][1:], ('/latest.json', '"v1"'))
+
+            self.server.etag = '"v2"'
+            self.server.body = '{"tag": "v2"}'
+            self.assertEqual(metadata_cache.fetch(self.url, self.connections), b'{"tag": "v2"}')
+            self.assertEqual(len(self.server.requests), 3)
+
+            metadata_cache.ttl = 60
+            self.assertEqual(metadata_cache.fetch(self.url, self.connections), b'{"tag": "v2"}')
+            self.assertEqual(len(self.server.requests), 3)
+
+
+class DownloadTestCase(TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.payload = PAYLOAD
+        self.server.support_ranges = True
+        self.server.max_requests = None  # Answer all requests after this number with an error
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/python.tar.zst'
+
+        connection_patcher = patch('socket.create_connection', create_local_connection)
+        connection_patcher.start()
+        self.addCleanup(connection_patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def download(self, temp_path, **kwargs):
+        return download(
+            url=self.url,
+            dst_path=temp_path,
+            total_size=len(PAYLOAD),
+            hash_name='sha256',
+            hash_value=PAYLOAD_HASH,
+            **kwargs,
+        )
+
+    def test_ranged_download(self):
+        with TemporaryDirectory(prefix='test_ranged_download_') as temp_path:
+            with RedirectOut():
+                file_path = self.download(temp_path, connections=3, segment_size=10_000)
+            self.assertEqual(file_path, temp_path / 'python.tar.zst')
+            self.assertEqual(file_path.read_bytes(), PAYLOAD)
+            self.assertEqual(len(self.server.requests), 11)
+            self.assertIn('bytes=100000-102399', self.server.requests)
+            self.assertEqual(sorted(path.name for path in temp_path.iterdir()), ['python.tar.zst'])
+
+    def test_no_range_support(self):
+        self.server.support_ranges = False
+        with TemporaryDirectory(prefix='test_no_range_support_') as temp_path:
+            with RedirectOut():
+                file_path = self.download(temp_path, connections=3, segment_size=10_000)
+            self.assertEqual(file_path.read_bytes(), PAYLOAD)
+            self.assertEqual(self.server.requests, ['bytes=0-9999'])
+
+    def test_small_download(self):
+        with TemporaryDirectory(prefix='test_small_download_') as temp_path:
+            with RedirectOut():
+                file_path = self.download(temp_path)
+            self.assertEqual(file_path.read_bytes(), PAYLOAD)
+            self.assertEqual(self.server.requests, [None])
+
+    def test_resume(self):
+        with TemporaryDirectory(prefix='test_resume_') as temp_path:
+            # Only the first segment can be downloaded:
+            self.server.max_requests = 1
+            with RedirectOut(), self.assertRaises(HTTPError):
+                self.download(temp_path, connections=1, segment_size=50_000)
+
+            state_path = temp_path / 'python.tar.zst.download.json'
+            self.assertTrue(state_path.is_file())
+
+            self.server.max_requests = None
+            self.server.requests.clear()
+            with RedirectOut():
+                file_path = self.download(temp_path, connections=1, segment_size=50_000)
+            self.assertEqual(file_path.read_bytes(), PAYLOAD)
+            self.assertEqual(self.server.requests, ['bytes=50000-99999', 'bytes=100000-102399'])
+            self.assertFalse(state_path.exists())
+
+    def test_cached_download(self):
+        with TemporaryDirectory(prefix='test_cached_download_') as temp_path:
+            cache = DownloadCache(temp_path / 'cache', max_size=len(PAYLOAD) * 2)
+            cache.path.mkdir()
+            kwargs = {
+                'cache': cache,
+                'url': self.url,
+                'dst_path': temp_path / 'dst',
+                'total_size': len(PAYLOAD),
+                'hash_name': 'sha256',
+                'hash_value': PAYLOAD_HASH,
+            }
+            with RedirectOut():
+                file_path = cached_download(**kwargs)
+                self.assertEqual(file_path.read_bytes(), PAYLOAD)
+                self.assertTrue(file_path.is_relative_to(cache.path))
+                self.assertEqual(self.server.requests, [None])
+
+                # Second run uses the cache without any request:
+                self.assertEqual(cached_download(**kwargs), file_path)
+                self.assertEqual(self.server.requests, [None])
+            self.assertEqual(sorted(path.name for path in cache.path.iterdir()), ['.partial', file_path.parent.name])
+            partial_files = [path.name for path in (cache.path / '.partial').rglob('*') if path.is_file()]
+            self.assertEqual(partial_files, ['.lock'])  # No download leftovers
+
+    def test_concurrent_cached_download(self):
+        with TemporaryDirectory(prefix='test_concurrent_cached_download_') as temp_path, RedirectOut():
+            cache = DownloadCache(temp_path, max_size=len(PAYLOAD) * 2)
+            kwargs = {
+                'cache': cache,
+                'url': self.url,
+                'dst_path': temp_path,
+                'total_size': len(PAYLOAD),
+                'hash_name': 'sha256',
+                'hash_value': PAYLOAD_HASH,
+                'connections': 2,
+            }
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = [executor.submit(cached_download, **kwargs) for _ in range(3)]
+                file_paths = {future.result() for future in futures}
+
+            self.assertEqual(len(file_paths), 1)
+            self.assertEqual(file_paths.pop().read_bytes(), PAYLOAD)
+            self.assertEqual(self.server.requests, [None])  # Downloaded only once
+
+    def test_hash_value_future(self):
+        hash_future = Future()
+
+        def set_hash_value():
+            time.sleep(0.1)
+            hash_future.set_result(PAYLOAD_HASH)
+
+        thread = threading.Thread(target=set_hash_value)
+        thread.start()
+        with TemporaryDirectory(prefix='test_hash_value_future_') as temp_path, RedirectOut():
+            cache = DownloadCache(temp_path / 'cache', max_size=len(PAYLOAD) * 2)
+            cache.path.mkdir()
+            file_path = cached_download(
+                cache=cache,
+                url=self.url,
+                dst_path=temp_path,
+                total_size=len(PAYLOAD),
+                hash_name='sha256',
+                hash_value=hash_future,
+            )
+            self.assertEqual(file_path.read_bytes(), PAYLOAD)
+            self.assertEqual(cache.get(self.url, PAYLOAD_HASH), file_path)
+        thread.join()
+
+    def test_stream_extract(self):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+            tar_info = tarfile.TarInfo('python/bin/python3')
+            tar_info.size = len(PAYLOAD)
+            tar.addfile(tar_info, io.BytesIO(PAYLOAD))
+        self.server.payload = buffer.getvalue()
+        kwargs = {
+            'url': self.url,
+            'total_size': len(self.server.payload),
+            'hash_name': 'sha256',
+            'compress_program': 'gzip',
+        }
+
+        with TemporaryDirectory(prefix='test_stream_extract_') as temp_path:
+            with RedirectOut():
+                stream_extract(dst_path=temp_path, hash_value=hashlib.sha256(self.server.payload).hexdigest(), **kwargs)
+            self.assertEqual((temp_path / 'python' / 'bin' / 'python3').read_bytes(), PAYLOAD)
+            self.assertEqual(sorted(path.name for path in temp_path.iterdir()), ['python'])
+
+        with TemporaryDirectory(prefix='test_stream_extract_') as temp_path:
+            with RedirectOut(), self.assertRaises(AssertionError) as cm:
+                stream_extract(dst_path=temp_path, hash_value='wrong', **kwargs)
+            self.assertIn("!= hash_value='wrong'", str(cm.exception))
+
+        self.server.payload = b'No tar archive'
+        with (
+            TemporaryDirectory(prefix='test_stream_extract_') as temp_path,
+            RedirectOut(),
+            self.assertRaises(subprocess.CalledProcessError),
+        ):
+            stream_extract(dst_path=temp_path, hash_value='', **{**kwargs, 'total_size': 14})
+
+
+class ReplaceDirectoryTestCase(TestCase):
+    def test_replace_directory(self):
+        with TemporaryDirectory(prefix='test_replace_directory_') as temp_path:
+            src_path = temp_path / 'src'
+            src_path.mkdir()
+            (src_path / 'new.txt').touch()
+            dest_path = temp_path / 'dest'
+            dest_path.mkdir()
+            (dest_path / 'old.txt').touch()
+
+            replace_directory(src_path, dest_path)
+            self.assertEqual(sorted(path.name for path in temp_path.iterdir()), ['dest'])
+            self.assertEqual(sorted(path.name for path in dest_path.iterdir()), ['new.txt'])
+
+
+class DownloadCacheTestCase(TestCase):
+    def test_prune(self):
+        with TemporaryDirectory(prefix='test_download_cache_') as temp_path:
+            cache = DownloadCache(temp_path, max_size=250)
+            for number in range(3):
+                source_path = temp_path / f'source{number}'
+                source_path.write_bytes(b'X' * 100)
+                file_path = cache.put(f'https://test.tld/file{number}.tar', source_path)
+                os.utime(file_path.parent, (number, number))
+                self.assertFalse(source_path.exists())
+
+            self.assertIsNone(cache.get('https://test.tld/file0.tar'))  # Oldest entry removed
+            self.assertIsNotNone(cache.get('https://test.tld/file1.tar'))
+            self.assertIsNotNone(cache.get('https://test.tld/file2.tar'))
+            self.assertIsNone(cache.get('https://test.tld/file2.tar', hash_value='other'))
+
+            stale_path = cache.get_partial_path('https://test.tld/stale.tar')
+            os.utime(stale_path, (0, 0))
+            cache.prune(keep=temp_path)
+            self.assertFalse(stale_path.exists())
+
+            # A partial download that is in use by a other run is never removed:
+            with cache.locked_partial_path('https://test.tld/in-use.tar') as in_use_path:
+                os.utime(in_use_path, (0, 0))
+                cache.prune(keep=temp_path)
+                self.assertTrue(in_use_path.is_dir())
+                (in_use_path / 'in-use.tar').write_bytes(b'X')
+            self.assertEqual(sorted(path.name for path in in_use_path.iterdir()), ['.lock', 'in-use.tar'])
+
+            # Removed by prune() while a other run waits for the lock -> The waiting run creates it again:
+            with (in_use_path / '.lock').open('a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                with ThreadPoolExecutor(max_workers=1) as executor:
+
+                    def wait_for_lock():
+                        with cache.locked_partial_path('https://test.tld/in-use.tar') as partial_path:
+                            return sorted(path.name for path in partial_path.iterdir())
+
+                    future = executor.submit(wait_for_lock)
+                    time.sleep(0.2)
+                    shutil.rmtree(in_use_path)
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    self.assertEqual(future.result(timeout=5), ['.lock'])
+
+    def test_prune_removed_entry(self):
+        with TemporaryDirectory(prefix='test_download_cache_') as temp_path:
+            cache = DownloadCache(temp_path, max_size=50)
+            # A entry that is removed by a concurrent run while it's scanned:
+            removed_path = temp_path / cache.get_key('https://test.tld/removed.tar', '')
+            removed_path.mkdir()
+            (removed_path / 'removed.tar').symlink_to(temp_path / 'does-not-exist')
+
+            source_path = temp_path / 'source'
+            source_path.write_bytes(b'X' * 100)
+            file_path = cache.put('https://test.tld/file.tar', source_path)
+            self.assertEqual(file_path.read_bytes(), b'X' * 100)
+
+
+class PlatformProbeTestCase(TestCase):
+    def test_get_cpu_flags(self):
+        with TemporaryDirectory(prefix='test_get_cpu_flags_') as temp_path:
+            cpuinfo_path = temp_path / 'cpuinfo'
+            cpuinfo_path.write_text(
+                'processor\t: 0\nflags\t\t: fpu sse4_1 avx\n\nprocessor\t: 1\nflags\t\t: fpu other\n'
+            )
+            self.assertEqual(get_cpu_flags(cpuinfo_path), {'fpu', 'sse4_1', 'avx'})
+
+            cpuinfo_path.write_text('processor\t: 0\n')
+            self.assertEqual(get_cpu_flags(cpuinfo_path), set())
+
+    def test_detect_arch_cache(self):
+        with TemporaryDirectory(prefix='test_detect_arch_') as temp_path:
+            cpuinfo_path = temp_path / 'cpuinfo'
+            cpuinfo_path.write_text('flags\t\t: cx16 lahf_lm popcnt pni sse4_1 sse4_2 ssse3\n')
+            boot_id_path = temp_path / 'boot_id'
+            boot_id_path.write_text('boot-1\n')
+            cache_path = temp_path / 'cache'
+            with (
+                patch('manageprojects.setup_python.CPUINFO_PATH', cpuinfo_path),
+                patch('manageprojects.setup_python.BOOT_ID_PATH', boot_id_path),
+                patch('manageprojects.setup_python.sys.platform', 'linux'),
+                patch('manageprojects.setup_python.platform.machine', return_value='x86_64'),
+            ):
+                self.assertEqual(detect_arch(cache_path), 'x86_64_v2')
+                self.assertTrue((cache_path / '.platform.json').is_file())
+
+                # Cached per boot ID: /proc/cpuinfo is not read again
+                cpuinfo_path.unlink()
+                self.assertEqual(detect_arch(cache_path), 'x86_64_v2')
+
+                # After a reboot, the CPU flags are read again:
+                boot_id_path.write_text('boot-2\n')
+                cpuinfo_path.write_text('flags\t\t: fpu\n')
+                self.assertEqual(detect_arch(cache_path), 'x86_64')
+
+    def test_probe_platform_with_arch(self):
+        with patch('manageprojects.setup_python.detect_arch') as detect_arch_mock:
+            platform_info = probe_platform(arch='x86_64_v3')
+        detect_arch_mock.assert_not_called()
+        self.assertEqual(platform_info.arch, 'x86_64_v3')
+        self.assertEqual(platform_info.parts, [sys.platform, platform_info.abi, 'x86_64_v3'])
@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.file_copy import CLONED, COPIED, LINKED, CopyStats, copy_file, copy_tree
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class FileCopyTestCase(BaseTestCase):
+    def test_copy_file(self):
+        with TemporaryDirectory(prefix='test_copy_file_') as temp_path:
+            src_path = temp_path / 'source.txt'
+            src_path.write_text('The content')
+            os.utime(src_path, ns=(1_000_000_000, 1_000_000_000))
+            stats = CopyStats()
+
+            dst_path = temp_path / 'copy.txt'
+            method = copy_file(src_path, dst_path, stats=stats)
+            self.assertIn(method, (CLONED, COPIED))
+            self.assert_file_content(dst_path, 'The content')
+            self.assertNotEqual(dst_path.stat().st_ino, src_path.stat().st_ino)
+            self.assertNotEqual(dst_path.stat().st_mtime_ns, 1_000_000_000)
+
+            # Overwrite a existing file:
+            dst_path.write_text('Old and longer content')
+            copy_file(src_path, dst_path, metadata=True, stats=stats)
+            self.assert_file_content(dst_path, 'The content')
+            self.assertEqual(dst_path.stat().st_mtime_ns, 1_000_000_000)
+
+            link_path = temp_path / 'link.txt'
+            method = copy_file(src_path, link_path, hardlink=True, stats=stats)
+            self.assert_file_content(link_path, 'The content')
+            if method == LINKED:
+                self.assertEqual(link_path.stat().st_ino, src_path.stat().st_ino)
+                self.assertEqual(stats.linked_files, 1)
+                self.assertEqual(stats.linked_bytes, 11)
+            else:
+                self.assertEqual(method, CLONED)  # reflinks are preferred
+
+            self.assertEqual(stats.cloned_files + stats.copied_files + stats.linked_files, 3)
+            self.assertEqual(stats.cloned_bytes + stats.copied_bytes + stats.linked_bytes, 33)
+
+    def test_copy_tree(self):
+        with TemporaryDirectory(prefix='test_copy_tree_') as temp_path:
+            src_path = temp_path / 'source'
+            Path(src_path, 'sub').mkdir(parents=True)
+            Path(src_path, 'empty.txt').touch()
+            Path(src_path, 'sub', 'binary.bin').write_bytes(bytes(range(256)) * 1024)
+
+            stats = CopyStats()
+            copy_tree(src_path, temp_path / 'destination', stats=stats)
+            self.assertEqual(Path(temp_path, 'destination', 'empty.txt').read_bytes(), b'')
+            self.assertEqual(Path(temp_path, 'destination', 'sub', 'binary.bin').read_bytes(), bytes(range(256)) * 1024)
+            self.assertEqual(stats.linked_files, 0)
+            self.assertEqual(stats.cloned_bytes + stats.copied_bytes, 256 * 1024)
@@ -0,0 +1,52 @@
+import hashlib
+import os
+from pathlib import Path
+from unittest import mock
+
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities import file_manifest
+from manageprojects.utilities.file_manifest import FileManifest, get_file_hash
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class FileManifestTestCase(BaseTestCase):
+    def test_file_manifest(self):
+        with TemporaryDirectory(prefix='test_file_manifest_') as temp_path:
+            file_path = temp_path / 'foo' / 'bar.txt'
+            file_path.parent.mkdir()
+            file_path.write_text('Written by manageprojects')
+            written_hash = hashlib.sha256(b'Written by manageprojects').hexdigest()
+            self.assertEqual(get_file_hash(file_path), written_hash)
+
+            manifest = FileManifest(project_path=temp_path)
+            manifest.load()
+            self.assertEqual(manifest.entries, {})
+            self.assertIsNone(manifest.get_current_hash('unknown.txt'))
+
+            self.assertFalse(manifest.changed)
+            manifest.add('foo/bar.txt', sha256=written_hash)
+            self.assertTrue(manifest.changed)
+            manifest.save()
+            self.assertFalse(manifest.changed)
+            self.assertTrue(Path(temp_path, '.manageprojects', 'file_manifest.json').is_file())
+
+            manifest = FileManifest(project_path=temp_path)
+            manifest.load()
+            self.assertEqual(manifest.get_written_hash('foo/bar.txt'), written_hash)
+            self.assertIsNone(manifest.get_written_hash('unknown.txt'))
+            manifest.add('foo/bar.txt', sha256=written_hash)
+            self.assertFalse(manifest.changed)  # Same entry
+
+            # An untouched file is not read:
+            with mock.patch.object(file_manifest, 'get_file_hash') as get_file_hash_mock:
+                self.assertEqual(manifest.get_current_hash('foo/bar.txt'), written_hash)
+            get_file_hash_mock.assert_not_called()
+
+            # A locally modified file is detected:
+            file_path.write_text('Locally modified')
+            os.utime(file_path, ns=(1, 1))
+            self.assertEqual(
+                manifest.get_current_hash('foo/bar.txt'),
+                hashlib.sha256(b'Locally modified').hexdigest(),
+            )
+            self.assertEqual(manifest.get_written_hash('foo/bar.txt'), written_hash)
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from bx_py_utils.test_utils.redirect import RedirectOut
+
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities import profiling
+from manageprojects.utilities.profiling import SUBPROCESS, Profiler, parse_profile_args, phase
+
+
+@phase('decorated')
+def decorated_func():
+    with phase('git status', category=SUBPROCESS):
+        pass
+
+
+class ProfilingTestCase(BaseTestCase):
+    def test_disabled(self):
+        self.assertIsNone(profiling._PROFILER)
+        with phase('not recorded'):
+            decorated_func()
+
+    def test_phases(self):
+        profiler = Profiler()
+        with mock.patch.object(profiling, '_PROFILER', profiler):
+            with phase('update'):
+                decorated_func()
+                decorated_func()
+            with phase('apply'):
+                pass
+        profiler.finish()
+
+        self.assertEqual(
+            [(span.name, span.category) for span in profiler.iter_spans()],
+            [
+                ('manageprojects', 'phase'),
+                ('update', 'phase'),
+                ('decorated', 'phase'),
+                ('git status', 'subprocess'),
+                ('decorated', 'phase'),
+                ('git status', 'subprocess'),
+                ('apply', 'phase'),
+            ],
+        )
+
+        with RedirectOut() as buffer:
+            profiler.print_summary()
+        self.assertIn('decorated (2x)', buffer.stdout)
+        self.assertIn('git status (2x)', buffer.stdout)
+        self.assertIn('2 subprocess calls', buffer.stdout)
+
+        events = profiler.get_trace_events()
+        self.assertEqual(len(events), 7)
+        self.assertEqual({event['ph'] for event in events}, {'X'})
+        update_event = events[1]
+        self.assertEqual(update_event['name'], 'update')
+        self.assertGreaterEqual(update_event['dur'], events[2]['dur'] + events[4]['dur'])
+
+    def test_parse_profile_args_missing_trace_file(self):
+        for args in (['version', '--profile-trace'], ['--profile-trace', '--help'], ['--profile-trace=']):
+            with self.subTest(args=args), RedirectOut() as buffer, self.assertRaises(SystemExit) as cm:
+                parse_profile_args(args)
+            self.assertEqual(cm.exception.code, 1)
+            self.assertIn('"--profile-trace" needs a file path', buffer.stdout)
@@ -1,5 +1,7 @@
 import inspect
+import tomllib
 from pathlib import Path
+from unittest.mock import patch
 
 from bx_py_utils.path import assert_is_file
 from bx_py_utils.test_utils.datetime import parse_dt
@@ -8,7 +10,13 @@ from cli_base.cli_tools.test_utils.logs import AssertLogs
 from manageprojects.constants import BASE_PATH
 from manageprojects.data_classes import ManageProjectsMeta
 from manageprojects.tests.base import BaseTestCase
-from manageprojects.utilities.pyproject_toml import PyProjectToml, find_pyproject_toml, update_pyproject_toml
+from manageprojects.utilities.pyproject_toml import (
+    PyProjectToml,
+    clear_pyproject_toml_cache,
+    find_pyproject_toml,
+    load_toml,
+    update_pyproject_toml,
+)
 from manageprojects.utilities.temp_path import TemporaryDirectory
 
 
@@ -284,3 +292,53 @@ class PyProjectTomlTestCase(BaseTestCase):
 
         with TemporaryDirectory(prefix='test_find_pyproject_toml') as temp_path:
             self.assertIsNone(find_pyproject_toml(file_path=temp_path))
+
+            pyproject_toml = temp_path / 'pyproject.toml'
+            pyproject_toml.touch()
+            sub_path = temp_path / 'a' / 'b'
+            sub_path.mkdir(parents=True)
+            file_paths = [sub_path / f'{no}.py' for no in range(3)]
+            for file_path in file_paths:
+                file_path.touch()
+
+            with patch.object(Path, 'is_file', autospec=True, side_effect=Path.is_file) as is_file_mock:
+                self.assertEqual(find_pyproject_toml(file_path=file_paths[0]), pyproject_toml)
+                first_call_count = is_file_mock.call_count
+                self.assertEqual(find_pyproject_toml(file_path=file_paths[1]), pyproject_toml)
+                self.assertEqual(find_pyproject_toml(file_path=file_paths[2]), pyproject_toml)
+            # Only the given file and the cached "pyproject.toml" are checked:
+            self.assertEqual(is_file_mock.call_count, first_call_count + 2 * 2)
+
+            # A new "pyproject.toml" in a sub directory needs an explicit invalidation:
+            sub_pyproject_toml = sub_path / 'pyproject.toml'
+            sub_pyproject_toml.touch()
+            self.assertEqual(find_pyproject_toml(file_path=file_paths[0]), pyproject_toml)
+            clear_pyproject_toml_cache(temp_path)
+            self.assertEqual(find_pyproject_toml(file_path=file_paths[0]), sub_pyproject_toml)
+
+            # Removed files are detected:
+            sub_pyproject_toml.unlink()
+            self.assertEqual(find_pyproject_toml(file_path=file_paths[0]), pyproject_toml)
+
+    def test_load_toml(self):
+        with TemporaryDirectory(prefix='test_load_toml') as temp_path:
+            toml_path = temp_path / 'pyproject.toml'
+            toml_path.write_text('[manageprojects]\ninitial_revision = "abc0001"\n')
+
+            with patch.object(tomllib, 'load', wraps=tomllib.load) as load_mock:
+                data = load_toml(toml_path)
+                self.assertEqual(data, {'manageprojects': {'initial_revision': 'abc0001'}})
+                data['manageprojects']['initial_revision'] = 'changed'  # Doesn't change the cache
+                self.assertEqual(load_toml(toml_path), {'manageprojects': {'initial_revision': 'abc0001'}})
+                self.assertEqual(load_mock.call_count, 1)
+
+                # Read-only access doesn't need tomlkit:
+                toml = PyProjectToml(project_path=temp_path)
+                self.assertEqual(toml.get_mp_meta().initial_revision, 'abc0001')
+                self.assertNotIn('doc', toml.__dict__)
+                self.assertEqual(load_mock.call_count, 1)
+
+                # Changed file -> parse again:
+                toml_path.write_text('[manageprojects]\ninitial_revision = "abc0000002"\n')
+                self.assertEqual(load_toml(toml_path), {'manageprojects': {'initial_revision': 'abc0000002'}})
+                self.assertEqual(load_mock.call_count, 2)
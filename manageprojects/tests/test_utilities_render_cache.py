@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+from cli_base.cli_tools.test_utils.git_utils import init_git
+from cli_base.cli_tools.test_utils.logs import AssertLogs
+
+from manageprojects.cookiecutter_api import execute_cookiecutter
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities import render_cache
+from manageprojects.utilities.render_cache import RenderCache
+from manageprojects.utilities.temp_path import TemporaryDirectory
+
+
+class RenderCacheTestCase(BaseTestCase):
+    def test_execute_cookiecutter_with_render_cache(self):
+        with TemporaryDirectory(prefix='test_render_cache_') as main_temp_path:
+            cache_path = main_temp_path / 'cache'
+            cache_path.mkdir()
+
+            repo_path = main_temp_path / 'template'
+            test_file_path = repo_path / '{{cookiecutter.dir_name}}' / 'test.txt'
+            test_file_path.parent.mkdir(parents=True)
+            test_file_path.write_text('Test: {{ cookiecutter.value }}')
+            Path(repo_path, 'cookiecutter.json').write_text(json.dumps({'dir_name': 'a_directory', 'value': 'Foo'}))
+            init_git(repo_path)
+
+            with mock.patch.object(render_cache, 'get_render_cache_path', return_value=cache_path):
+                results = []
+                for no in range(2):
+                    with AssertLogs(self) as logs:
+                        results.append(
+                            execute_cookiecutter(
+                                template=str(repo_path),
+                                output_dir=main_temp_path / f'output{no}',
+                                no_input=True,
+                                extra_context={'value': 'Bar'},
+                                render_cache=True,
+                            )
+                        )
+                    if no == 0:
+                        logs.assert_in("Call 'cookiecutter'", 'Render cache miss', 'Render cached')
+                    else:
+                        logs.assert_in('Render cache hit')
+
+                (context1, destination1, repo_path1), (context2, destination2, repo_path2) = results
+                self.assertEqual(context1, context2)
+                self.assertEqual(context2['cookiecutter']['value'], 'Bar')
+                self.assertEqual(repo_path1, repo_path2)
+                self.assertEqual(destination1, main_temp_path / 'output0' / 'a_directory')
+                self.assertEqual(destination2, main_temp_path / 'output1' / 'a_directory')
+                self.assert_file_content(destination2 / 'test.txt', 'Test: Bar')
+
+                # The cache hit is hardlinked:
+                self.assertEqual((destination2 / 'test.txt').stat().st_nlink, 2)
+
+                # A other context is a cache miss:
+                with AssertLogs(self) as logs:
+                    _context, destination, _repo_path = execute_cookiecutter(
+                        template=str(repo_path),
+                        output_dir=main_temp_path / 'output3',
+                        no_input=True,
+                        extra_context={'value': 'Other'},
+                        render_cache=True,
+                    )
+                logs.assert_in("Call 'cookiecutter'", 'Render cache miss')
+                self.assert_file_content(destination / 'test.txt', 'Test: Other')
+
+                # A dirty template repository can't be cached:
+                test_file_path.write_text('Changed: {{ cookiecutter.value }}')
+                with AssertLogs(self) as logs:
+                    _context, destination, _repo_path = execute_cookiecutter(
+                        template=str(repo_path),
+                        output_dir=main_temp_path / 'output4',
+                        no_input=True,
+                        extra_context={'value': 'Bar'},
+                        render_cache=True,
+                    )
+                logs.assert_in('is not clean: Render cache not used')
+                self.assert_file_content(destination / 'test.txt', 'Changed: Bar')
+
+    def test_evict(self):
+        with TemporaryDirectory(prefix='test_render_cache_evict_') as main_temp_path:
+            cache = RenderCache(cache_path=main_temp_path / 'cache', max_size=15)
+            cache.cache_path.mkdir()
+
+            for no in range(3):
+                destination_path = main_temp_path / f'render{no}' / 'project'
+                destination_path.mkdir(parents=True)
+                Path(destination_path, 'file.txt').write_text(f'Render no. {no}')  # 11 Bytes
+                cache.store(key=f'key{no}', context={'no': no}, destination_path=destination_path)
+
+            # Only the last one fits into the cache:
+            self.assertEqual(sorted(item.name for item in cache.cache_path.iterdir()), ['key2'])
+
+            context, destination_path = cache.get(key='key2', output_dir=main_temp_path / 'output')
+            self.assertEqual(context, {'no': 2})
+            self.assert_file_content(destination_path / 'file.txt', 'Render no. 2')
+            self.assertIsNone(cache.get(key='key1', output_dir=main_temp_path / 'output'))
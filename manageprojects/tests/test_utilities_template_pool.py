@@ -0,0 +1,125 @@
+import os
+import time
+from pathlib import Path
+
+import yaml
+from bx_py_utils.test_utils.redirect import RedirectOut
+from cli_base.cli_tools.git import Git
+from cli_base.cli_tools.test_utils.git_utils import init_git
+
+from manageprojects.cookiecutter_api import get_repo_path
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+from manageprojects.utilities.template_pool import POOL_DIR_NAME, TemplateRepoPool, get_repo_key
+
+
+class TemplateRepoPoolTestCase(BaseTestCase):
+    def test_checkout_url(self):
+        with TemporaryDirectory(prefix='test_checkout_url_') as temp_path:
+            repo_path = temp_path / 'template'
+            repo_path.mkdir()
+            readme_path = repo_path / 'README.txt'
+            readme_path.write_text('Revision 1')
+            with RedirectOut():
+                git, rev1 = init_git(repo_path)
+            url = f'file://{repo_path}'
+
+            pool = TemplateRepoPool(pool_path=temp_path / 'pool')
+            rev1_path = pool.checkout_url(url=url, revision=None)
+            self.assertEqual(rev1_path.parent, temp_path / 'pool' / 'snapshots' / get_repo_key(url))
+            self.assert_file_content(rev1_path / 'README.txt', 'Revision 1')
+            self.assertEqual(Git(cwd=rev1_path, detect_root=True).get_current_hash(verbose=False), rev1)
+
+            readme_path.write_text('Revision 2')
+            git.add('.', verbose=False)
+            git.commit('Revision 2', verbose=False)
+            rev2 = git.get_current_hash(verbose=False)
+
+            # The default branch is always fetched:
+            rev2_path = pool.checkout_url(url=url, revision=None)
+            self.assert_file_content(rev2_path / 'README.txt', 'Revision 2')
+            self.assertEqual(Git(cwd=rev2_path, detect_root=True).get_current_hash(verbose=False), rev2)
+
+            # Existing snapshots are not changed and reused:
+            self.assert_file_content(rev1_path / 'README.txt', 'Revision 1')
+            self.assertEqual(pool.checkout_url(url=url, revision=rev1), rev1_path)
+
+            with self.assertRaisesRegex(KeyError, 'Revision .+ not found'):
+                pool.checkout_url(url=url, revision='0123456')
+
+    def test_prune_snapshots(self):
+        with TemporaryDirectory(prefix='test_prune_snapshots_') as temp_path:
+            repo_path = temp_path / 'template'
+            repo_path.mkdir()
+            readme_path = repo_path / 'README.txt'
+            readme_path.write_text('Revision 1')
+            with RedirectOut():
+                git, rev1 = init_git(repo_path)
+            readme_path.write_text('Revision 2')
+            git.add('.', verbose=False)
+            git.commit('Revision 2', verbose=False)
+            rev2 = git.get_current_hash(verbose=False)
+            url = f'file://{repo_path}'
+
+            pool = TemplateRepoPool(pool_path=temp_path / 'pool')
+            rev1_path = pool.checkout_url(url=url, revision=rev1)
+            rev2_path = pool.checkout_url(url=url, revision=rev2)
+            self.assertEqual(pool.prune_snapshots(), 0)
+
+            one_year_ago = time.time() - 365 * 24 * 60 * 60
+            os.utime(rev1_path, (one_year_ago, one_year_ago))
+            os.utime(rev2_path, (one_year_ago, one_year_ago))
+
+            # A usage refreshes the modification time:
+            self.assertEqual(pool.checkout_url(url=url, revision=rev2), rev2_path)
+            self.assertGreater(rev2_path.stat().st_mtime, one_year_ago)
+
+            self.assertEqual(pool.prune_snapshots(), 1)
+            self.assertEqual(list(rev1_path.parent.iterdir()), [rev2_path])
+
+            # The mirror still contains the objects, so the snapshot can be created again:
+            self.assertEqual(pool.checkout_url(url=url, revision=rev1), rev1_path)
+            self.assert_file_content(rev1_path / 'README.txt', 'Revision 1')
+
+    def test_get_repo_path(self):
+        with TemporaryDirectory(prefix='test_get_repo_path_') as temp_path:
+            repo_path = temp_path / 'template'
+            template_path = repo_path / 'template_dir'
+            template_path.mkdir(parents=True)
+            cookiecutter_json_path = template_path / 'cookiecutter.json'
+            cookiecutter_json_path.write_text('{"rev": 1}')
+            with RedirectOut():
+                git, rev1 = init_git(repo_path)
+            cookiecutter_json_path.write_text('{"rev": 2}')
+            git.add('.', verbose=False)
+            git.commit('Revision 2', verbose=False)
+
+            cookiecutters_dir = temp_path / '.cookiecutters'
+            config_file_path = temp_path / 'cookiecutter_config.yaml'
+            config_file_path.write_text(yaml.dump({'cookiecutters_dir': str(cookiecutters_dir)}))
+            snapshots_path = cookiecutters_dir / POOL_DIR_NAME / 'snapshots'
+
+            # A local template without checkout is used directly:
+            self.assertEqual(
+                get_repo_path(template=str(repo_path), directory='template_dir', config_file=config_file_path),
+                template_path,
+            )
+            self.assertFalse(snapshots_path.exists())
+
+            # A checkout of a local template doesn't touch the working copy:
+            path = get_repo_path(
+                template=str(repo_path), directory='template_dir', checkout=rev1, config_file=config_file_path
+            )
+            self.assertTrue(path.is_relative_to(snapshots_path))
+            self.assertEqual(path.name, 'template_dir')
+            self.assert_file_content(path / 'cookiecutter.json', '{"rev": 1}')
+            self.assert_file_content(cookiecutter_json_path, '{"rev": 2}')
+
+            # Repository urls are always used via the pool:
+            path = get_repo_path(template=f'file://{repo_path}', directory='template_dir', config_file=config_file_path)
+            self.assertTrue(path.is_relative_to(snapshots_path))
+            self.assert_file_content(path / 'cookiecutter.json', '{"rev": 2}')
+            self.assertEqual(
+                sorted(path.name for path in Path(cookiecutters_dir, POOL_DIR_NAME, 'mirrors').iterdir()),
+                [f'{get_repo_key(f"file://{repo_path}")}.git', f'{get_repo_key(f"file://{repo_path}")}.lock'],
+            )
@@ -0,0 +1,113 @@
+import inspect
+from pathlib import Path
+
+from manageprojects.patching import make_git_diff
+from manageprojects.tests.base import BaseTestCase
+from manageprojects.utilities.temp_path import TemporaryDirectory
+from manageprojects.utilities.tree_diff import make_tree_diff
+
+
+class TreeDiffTestCase(BaseTestCase):
+    def test_same_as_git_diff(self):
+        with TemporaryDirectory(prefix='test_same_as_git_diff_') as main_temp_path:
+            from_path = main_temp_path / 'from'
+            to_path = main_temp_path / 'to'
+
+            function_content = '\n'.join(['def foo():', *(f'    x = {no}' for no in range(20))])
+            Path(from_path, 'sub', 'dir').mkdir(parents=True)
+            Path(from_path, 'sub', 'dir', 'code.py').write_text(function_content + '\n')
+            Path(from_path, 'deleted.txt').write_text('This file will be removed\n')
+            Path(from_path, 'empty').touch()
+            Path(from_path, 'binary.bin').write_bytes(b'\x00\x01\x02')
+            Path(from_path, 'script.sh').write_text('echo "Hello"\n')
+            Path(from_path, 'script.sh').chmod(0o644)
+            Path(from_path, 'moved.txt').write_text('Moved and executable\n')
+            Path(from_path, 'moved.txt').chmod(0o644)
+            Path(from_path, '.git').mkdir()
+            Path(from_path, '.git', 'ignored.txt').write_text('Ignored')
+
+            Path(to_path, 'sub', 'dir').mkdir(parents=True)
+            Path(to_path, 'sub', 'dir', 'code.py').write_text(function_content.replace('x = 15', 'x = 99'))
+            Path(to_path, 'empty').touch()
+            Path(to_path, 'binary.bin').write_bytes(b'\x00\x01\x03')
+            Path(to_path, 'script.sh').write_text('echo "Hello"\n')
+            Path(to_path, 'script.sh').chmod(0o755)
+            Path(to_path, 'new').mkdir()
+            Path(to_path, 'new', 'moved.txt').write_text('Moved and executable\n')
+            Path(to_path, 'new', 'moved.txt').chmod(0o755)
+            Path(to_path, 'new', 'file.txt').write_text('A new file\n')
+            Path(to_path, 'new', 'empty_file').touch()
+            Path(to_path, 'new', 'binary.bin').write_bytes(b'\x00')
+
+            patch = make_tree_diff(from_path=from_path, to_path=to_path)
+            self.assert_content(
+                patch,
+                inspect.cleandoc(
+                    r'''
+                    diff --git a/binary.bin b/binary.bin
+                    index 8352675..1592e5c 100644
+                    Binary files a/binary.bin and b/binary.bin differ
+                    diff --git a/deleted.txt b/deleted.txt
+                    deleted file mode 100644
+                    index 9152969..0000000
+                    diff --git a/new/binary.bin b/new/binary.bin
+                    new file mode 100644
+                    index 0000000..f76dd23
+                    Binary files /dev/null and b/new/binary.bin differ
+                    diff --git a/new/empty_file b/new/empty_file
+                    new file mode 100644
+                    index 0000000..e69de29
+                    diff --git a/new/file.txt b/new/file.txt
+                    new file mode 100644
+                    index 0000000..24e7dfa
+                    --- /dev/null
+                    +++ b/new/file.txt
+                    @@ -0,0 +1 @@
+                    +A new file
+                    diff --git a/moved.txt b/new/moved.txt
+                    old mode 100644
+                    new mode 100755
+                    similarity index 100%
+                    rename from moved.txt
+                    rename to new/moved.txt
+                    diff --git a/script.sh b/script.sh
+                    old mode 100644
+                    new mode 100755
+                    diff --git a/sub/dir/code.py b/sub/dir/code.py
+                    index 2cebac3..90f8b1c 100644
+                    --- a/sub/dir/code.py
+                    +++ b/sub/dir/code.py
+                    @@ -14,8 +14,8 @@ def foo():
+                         x = 12
+                         x = 13
+                         x = 14
+                    -    x = 15
+                    +    x = 99
+                         x = 16
+                         x = 17
+                         x = 18
+                    -    x = 19
+                    +    x = 19
+                    \ No newline at end of file
+                    '''
+                ),
+            )
+
+            # Compare with the "real" git diff:
+            git_patch = make_git_diff(
+                temp_path=main_temp_path,
+                from_path=from_path,
+                to_path=to_path,
+                verbose=False,
+            )
+            self.assertEqual(patch, git_patch)
+
+    def test_no_changes(self):
+        with TemporaryDirectory(prefix='test_no_changes_') as main_temp_path:
+            from_path = main_temp_path / 'from'
+            to_path = main_temp_path / 'to'
+            for path in (from_path, to_path):
+                Path(path, 'empty_directory').mkdir(parents=True)
+                Path(path, 'file.txt').write_text('Same content')
+
+            self.assertIsNone(make_tree_diff(from_path=from_path, to_path=to_path))
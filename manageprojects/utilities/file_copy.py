@@ -0,0 +1,151 @@
+"""
+    Copy files and trees without copying the bytes, if possible.
+
+    The copy strategies in order:
+     * reflink (FICLONE): A copy-on-write clone, e.g.: on btrfs and XFS
+     * hardlink: Only if allowed, e.g.: for read-only files in temp directories
+     * copy_file_range(): In-kernel copy, that may also be a reflink or server-side copy
+     * plain copy
+"""
+
+import dataclasses
+import errno
+import fcntl
+import functools
+import logging
+import os
+import shutil
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+FICLONE = 0x40049409  # ioctl request code from <linux/fs.h>
+
+CLONED = 'cloned'
+LINKED = 'linked'
+COPIED = 'copied'
+
+# Device pairs without reflink support, to avoid useless ioctl calls:
+_NO_REFLINK_DEVICES: set[tuple[int, int]] = set()
+
+
+@dataclasses.dataclass
+class CopyStats:
+    """
+    Counts how many files/bytes are really copied and how many are cloned or linked.
+    """
+
+    cloned_files: int = 0
+    cloned_bytes: int = 0
+    linked_files: int = 0
+    linked_bytes: int = 0
+    copied_files: int = 0
+    copied_bytes: int = 0
+
+    def add(self, method: str, size: int) -> None:
+        setattr(self, f'{method}_files', getattr(self, f'{method}_files') + 1)
+        setattr(self, f'{method}_bytes', getattr(self, f'{method}_bytes') + size)
+
+    def __str__(self):
+        """
+        >>> stats = CopyStats()
+        >>> stats.add(CLONED, 1024)
+        >>> stats.add(COPIED, 12)
+        >>> str(stats)
+        '1 files cloned (1024 bytes), 0 files linked (0 bytes), 1 files copied (12 bytes)'
+        """
+        return ', '.join(
+            f'{getattr(self, f"{method}_files")} files {method} ({getattr(self, f"{method}_bytes")} bytes)'
+            for method in (CLONED, LINKED, COPIED)
+        )
+
+
+def copy_data(src_fd: int, dst_fd: int, size: int) -> None:
+    """
+    Copy the file content via copy_file_range() with a fallback to read()/write().
+    """
+    offset = 0
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while offset < size:
+                copied = os.copy_file_range(src_fd, dst_fd, size - offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError as err:
+            if err.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP) or offset:
+                raise
+    if offset < size or size == 0:
+        # Fallback, or the file size is unknown, e.g.: in /proc
+        os.lseek(src_fd, offset, os.SEEK_SET)
+        while chunk := os.read(src_fd, 1024 * 1024):
+            os.write(dst_fd, chunk)
+
+
+def copy_file(
+    src: Path | str,
+    dst: Path | str,
+    *,
+    hardlink: bool = False,  # Allow hardlinks? Only if the files are never changed!
+    metadata: bool = False,  # Copy permission bits and timestamps, like shutil.copy2()
+    stats: CopyStats | None = None,
+) -> str:
+    """
+    Copy a single file with the cheapest available strategy.
+    Returns the used method: CLONED, LINKED or COPIED
+    """
+    src_stat = os.stat(src)
+    size = src_stat.st_size
+    dst_dev = os.stat(os.path.dirname(os.path.abspath(dst))).st_dev
+    devices = (src_stat.st_dev, dst_dev)
+
+    method = None
+    if devices not in _NO_REFLINK_DEVICES or not hardlink:
+        with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+            if devices not in _NO_REFLINK_DEVICES:
+                try:
+                    fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+                except OSError:
+                    _NO_REFLINK_DEVICES.add(devices)
+                else:
+                    method = CLONED
+            if method is None and not hardlink:
+                copy_data(src_file.fileno(), dst_file.fileno(), size)
+                method = COPIED
+        if method is None:
+            os.unlink(dst)  # Created by the failed reflink -> replace it with the hardlink
+
+    if method is None:
+        try:
+            os.link(src, dst)
+        except OSError:
+            # e.g.: cross-device link
+            shutil.copyfile(src, dst)
+            method = COPIED
+        else:
+            method = LINKED
+
+    if metadata and method != LINKED:
+        shutil.copystat(src, dst)
+
+    logger.debug('%s %s -> %s (%i bytes)', method, src, dst, size)
+    if stats is not None:
+        stats.add(method, size)
+    return method
+
+
+def copy_tree(
+    src: Path,
+    dst: Path,
+    *,
+    hardlink: bool = False,  # Allow hardlinks? Only if the files are never changed!
+    metadata: bool = False,  # Copy permission bits and timestamps, like shutil.copy2()
+    stats: CopyStats | None = None,
+    **copytree_kwargs,
+) -> Path:
+    """
+    shutil.copytree() that copies all files via copy_file()
+    """
+    copy_function = functools.partial(copy_file, hardlink=hardlink, metadata=metadata, stats=stats)
+    return Path(shutil.copytree(src, dst, copy_function=copy_function, **copytree_kwargs))
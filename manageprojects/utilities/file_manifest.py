@@ -0,0 +1,102 @@
+"""
+    Manifest of all files that manageprojects has written into a project.
+
+    Stores content hash, size and mtime of every written file in the project's
+    ".manageprojects" directory. So a unchanged project file can be detected by a
+    cheap stat() call and local modifications can be detected without the template.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = 'file_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def get_file_hash(file_path: Path) -> str:
+    with file_path.open('rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+@dataclasses.dataclass
+class ManifestEntry:
+    sha256: str  # Content hash of the written file
+    size: int
+    mtime_ns: int
+
+
+class FileManifest:
+    """
+    Persisted hash index of the files written into a project.
+    """
+
+    def __init__(self, project_path: Path):
+        self.project_path = project_path
+        self.path = project_path / '.manageprojects' / MANIFEST_FILE_NAME
+        self.entries: dict[str, ManifestEntry] = {}
+        self.changed = False  # Entries added or changed since load()/save()?
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            logger.info('No file manifest %s', self.path)
+            return
+        except ValueError as err:
+            logger.warning('Ignore broken file manifest %s: %s', self.path, err)
+            return
+        if data.get('version') != MANIFEST_VERSION:
+            logger.warning('Ignore file manifest %s with unknown version %r', self.path, data.get('version'))
+            return
+        self.entries = {rel_path: ManifestEntry(**entry) for rel_path, entry in data['files'].items()}
+        logger.info('Read file manifest %s with %i entries', self.path, len(self.entries))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': MANIFEST_VERSION,
+            'files': {rel_path: dataclasses.asdict(entry) for rel_path, entry in sorted(self.entries.items())},
+        }
+        self.path.write_text(json.dumps(data, indent=4))
+        logger.info('Write file manifest %s with %i entries', self.path, len(self.entries))
+        self.changed = False
+
+    def get_written_hash(self, rel_path: str) -> str | None:
+        """
+        Returns the hash of the file content, that manageprojects has written last time.
+        """
+        if entry := self.entries.get(rel_path):
+            return entry.sha256
+        return None
+
+    def get_current_hash(self, rel_path: str) -> str | None:
+        """
+        Returns the content hash of the project file. Doesn't read the file,
+        if size and mtime are unchanged since manageprojects has written it.
+        Returns None if the file doesn't exist.
+        """
+        file_path = self.project_path / rel_path
+        try:
+            file_stat = file_path.stat()
+        except FileNotFoundError:
+            return None
+        entry = self.entries.get(rel_path)
+        if entry and entry.size == file_stat.st_size and entry.mtime_ns == file_stat.st_mtime_ns:
+            return entry.sha256
+        return get_file_hash(file_path)
+
+    def add(self, rel_path: str, sha256: str) -> None:
+        """
+        Record the written project file `rel_path` with the content hash `sha256`.
+        """
+        file_stat = Path(self.project_path, rel_path).stat()
+        entry = ManifestEntry(sha256=sha256, size=file_stat.st_size, mtime_ns=file_stat.st_mtime_ns)
+        if self.entries.get(rel_path) != entry:
+            self.entries[rel_path] = entry
+            self.changed = True
@@ -0,0 +1,234 @@
+"""
+    Lightweight phase timing for the manageprojects commands.
+
+    Enabled by "--profile" (and "--profile-trace <file>" for a Chrome trace-event JSON,
+    viewable in chrome://tracing or https://ui.perfetto.dev). Without it, phase() costs
+    only a global lookup.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextlib
+import dataclasses
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Generator, Sequence
+from pathlib import Path
+
+from rich import print
+from rich.tree import Tree
+
+
+logger = logging.getLogger(__name__)
+
+PHASE = 'phase'
+SUBPROCESS = 'subprocess'
+
+
+@dataclasses.dataclass
+class Span:
+    name: str
+    category: str
+    start_ns: int
+    duration_ns: int = 0
+    thread_id: int = 0
+    children: list[Span] = dataclasses.field(default_factory=list)
+
+
+class Profiler:
+    """
+    Collect nested spans of all phases and subprocess calls of the current process.
+    """
+
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.root = Span(name='manageprojects', category=PHASE, start_ns=self.start_ns)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str) -> Generator[None, None, None]:
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = [self.root]
+        span = Span(name=name, category=category, start_ns=time.perf_counter_ns(), thread_id=threading.get_ident())
+        with self.lock:
+            stack[-1].children.append(span)
+        stack.append(span)
+        try:
+            yield
+        finally:
+            span.duration_ns = time.perf_counter_ns() - span.start_ns
+            stack.pop()
+
+    def finish(self) -> None:
+        self.root.duration_ns = time.perf_counter_ns() - self.start_ns
+
+    def iter_spans(self, span: Span | None = None) -> Generator[Span, None, None]:
+        span = span or self.root
+        yield span
+        for child in span.children:
+            yield from self.iter_spans(child)
+
+    def build_tree(self, span: Span | None = None, tree: Tree | None = None) -> Tree:
+        """
+        Build a rich tree of all phases. Siblings with the same name are merged.
+        """
+        span = span or self.root
+        if tree is None:
+            tree = Tree(f'[bold]{span.name}[/bold]: {span.duration_ns / 1e9:.3f}s')
+
+        merged: dict[str, list[Span]] = {}
+        for child in span.children:
+            merged.setdefault(child.name, []).append(child)
+        for name, spans in merged.items():
+            duration = sum(child.duration_ns for child in spans) / 1e9
+            count = f' ({len(spans)}x)' if len(spans) > 1 else ''
+            style = 'cyan' if spans[0].category == SUBPROCESS else 'green'
+            branch = tree.add(f'[{style}]{name}[/{style}]{count}: {duration:.3f}s')
+            merged_span = Span(
+                name=name,
+                category=spans[0].category,
+                start_ns=spans[0].start_ns,
+                children=[grandchild for child in spans for grandchild in child.children],
+            )
+            self.build_tree(merged_span, branch)
+        return tree
+
+    def print_summary(self) -> None:
+        print()
+        print(self.build_tree())
+        subprocesses = [span for span in self.iter_spans() if span.category == SUBPROCESS]
+        total = sum(span.duration_ns for span in subprocesses) / 1e9
+        print(f'{len(subprocesses)} subprocess calls in {total:.3f}s')
+
+    def get_trace_events(self) -> list[dict]:
+        pid = os.getpid()
+        return [
+            {
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',  # "Complete" event with duration
+                'ts': (span.start_ns - self.start_ns) / 1000,
+                'dur': span.duration_ns / 1000,
+                'pid': pid,
+                'tid': span.thread_id or threading.main_thread().ident,
+            }
+            for span in self.iter_spans()
+        ]
+
+    def write_trace(self, trace_path: Path) -> None:
+        trace_path.write_text(json.dumps({'traceEvents': self.get_trace_events(), 'displayTimeUnit': 'ms'}))
+        print(f'Chrome trace written to: {trace_path}')
+
+
+_PROFILER: Profiler | None = None
+
+
+@contextlib.contextmanager
+def phase(name: str, category: str = PHASE) -> Generator[None, None, None]:
+    """
+    Time a phase, if profiling is enabled. Usable as context manager and as decorator.
+    """
+    if _PROFILER is None:
+        yield
+    else:
+        with _PROFILER.span(name, category):
+            yield
+
+
+def get_subprocess_name(popenargs: Sequence) -> str:
+    """
+    >>> get_subprocess_name(['/usr/bin/git', 'diff', '--no-color'])
+    'git diff'
+    >>> get_subprocess_name([Path('/venv/bin/ruff')])
+    'ruff'
+    """
+    parts = [str(arg) for arg in popenargs[:2]]
+    parts[0] = Path(parts[0]).name
+    if parts[0] != 'git':
+        parts = parts[:1]
+    return ' '.join(parts)
+
+
+def instrument(module, func_name: str) -> None:
+    """
+    Time every call of `module.func_name` as subprocess span.
+    """
+    func = getattr(module, func_name)
+
+    @functools.wraps(func)
+    def wrapper(*popenargs, **kwargs):
+        with phase(get_subprocess_name(popenargs), category=SUBPROCESS):
+            return func(*popenargs, **kwargs)
+
+    setattr(module, func_name, wrapper)
+
+
+def enable_profiling(trace_path: Path | None = None) -> Profiler:
+    """
+    Enable the phase timing and subprocess accounting for the rest of the process.
+    Prints the summary tree (and writes the trace file) at exit.
+    """
+    global _PROFILER
+    if _PROFILER is not None:
+        return _PROFILER
+
+    from cli_base.cli_tools import git, subprocess_utils
+
+    # Git uses its own imported references, ToolsExecutor the module globals:
+    for module in (git, subprocess_utils):
+        instrument(module, 'verbose_check_call')
+        instrument(module, 'verbose_check_output')
+
+    profiler = _PROFILER = Profiler()
+
+    def at_exit():
+        profiler.finish()
+        profiler.print_summary()
+        if trace_path:
+            profiler.write_trace(trace_path)
+
+    atexit.register(at_exit)
+    return profiler
+
+
+def parse_profile_args(args: Sequence[str]) -> tuple[list[str], bool, Path | None]:
+    """
+    Remove the global profile options from the CLI arguments.
+    Returns the remaining arguments, if profiling is enabled and the trace file path.
+    Exit with a usage error if the trace file path is missing.
+
+    >>> parse_profile_args(['update-project', '--profile', '.'])
+    (['update-project', '.'], True, None)
+    >>> parse_profile_args(['update-project', '--profile-trace', 'trace.json', '.'])
+    (['update-project', '.'], True, PosixPath('trace.json'))
+    >>> parse_profile_args(['version'])
+    (['version'], False, None)
+    """
+    remaining = []
+    profile = False
+    trace_path = None
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == '--profile':
+            profile = True
+        elif arg == '--profile-trace' or arg.startswith('--profile-trace='):
+            profile = True
+            if arg == '--profile-trace':
+                trace_file = next(args_iter, None)
+            else:
+                trace_file = arg.partition('=')[2]
+            if not trace_file or trace_file.startswith('-'):
+                print('[red]Error: "--profile-trace" needs a file path, e.g.: --profile-trace trace.json')
+                sys.exit(1)
+            trace_path = Path(trace_file)
+        else:
+            remaining.append(arg)
+    return remaining, profile, trace_path
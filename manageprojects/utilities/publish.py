@@ -2,7 +2,6 @@ import logging
 import shutil
 import sys
 import tempfile
-import tomllib
 from collections.abc import Iterable
 from importlib.metadata import distribution, version
 from pathlib import Path
@@ -15,6 +14,8 @@ from cli_base.cli_tools.subprocess_utils import verbose_check_call, verbose_chec
 from packaging.version import Version
 from rich import print
 
+from manageprojects.utilities.pyproject_toml import load_toml
+
 
 logger = logging.getLogger(__name__)
 
@@ -182,7 +183,7 @@ def get_pyproject_toml_version(package_path: Path) -> Version | None:
     pyproject_toml_path = Path(package_path, 'pyproject.toml')
     assert_is_file(pyproject_toml_path)
 
-    pyproject_toml = tomllib.loads(pyproject_toml_path.read_text(encoding='UTF-8'))
+    pyproject_toml = load_toml(pyproject_toml_path)
 
     ver_str = dict_get(pyproject_toml, 'project', 'version')
     if not ver_str:
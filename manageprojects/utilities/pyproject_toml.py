@@ -1,6 +1,9 @@
+import copy
 import dataclasses
 import datetime
+import functools
 import logging
+import tomllib
 from pathlib import Path
 
 import tomlkit
@@ -38,6 +41,8 @@ def get_toml_document(path: Path) -> TomlDocument:
 
         doc: TOMLDocument = get_toml_document(path)
         toml: dict = doc.unwrap()
+
+    Use load_toml() instead, if the document will not be changed and written.
     """
     assert_is_file(path)
     doc: TOMLDocument = tomlkit.parse(path.read_text(encoding='UTF-8'))
@@ -45,26 +50,77 @@ def get_toml_document(path: Path) -> TomlDocument:
     return TomlDocument(file_path=path, doc=doc)
 
 
-def find_pyproject_toml(file_path: Path) -> Path | None:
+# Parsed TOML files: path -> ((mtime_ns, size), data)
+_TOML_CACHE: dict[Path, tuple[tuple[int, int], dict]] = {}
+
+
+def load_toml(path: Path) -> dict:
     """
-    Go back down the directory tree to find the "pyproject.toml" file.
+    Read-only access to a TOML file: Parsed with the fast tomllib and cached,
+    until the modification time or size of the file changed.
+    Returns a copy of the cached data, so the caller can change it.
     """
-    if file_path.is_file():
-        return find_pyproject_toml(file_path.parent)
+    path = path.absolute()
+    stat_result = path.stat()
+    stamp = (stat_result.st_mtime_ns, stat_result.st_size)
+    if (cached := _TOML_CACHE.get(path)) and cached[0] == stamp:
+        logger.debug('Use cached %s', path)
+        data = cached[1]
+    else:
+        with path.open('rb') as f:
+            data = tomllib.load(f)
+        _TOML_CACHE[path] = (stamp, data)
+    return copy.deepcopy(data)
 
-    pyproject_toml = file_path / 'pyproject.toml'
-    if pyproject_toml.is_file():
-        return pyproject_toml
 
-    if (parent_path := file_path.parent) and parent_path != file_path:
-        return find_pyproject_toml(parent_path)
+# Directory -> "pyproject.toml" found in this or a parent directory, see: find_pyproject_toml()
+_PYPROJECT_TOML_PATHS: dict[Path, Path] = {}
 
-    return None
 
+def clear_pyproject_toml_cache(directory: Path | None = None) -> None:
+    """
+    Invalidate the find_pyproject_toml() results of `directory` and all sub directories
+    (or of all directories), e.g.: after a new "pyproject.toml" was created.
+    """
+    if directory is None:
+        _PYPROJECT_TOML_PATHS.clear()
+    else:
+        directory = directory.absolute()
+        for path in [path for path in _PYPROJECT_TOML_PATHS if path.is_relative_to(directory)]:
+            del _PYPROJECT_TOML_PATHS[path]
 
-def get_pyproject_toml(*, file_path: Path | None = None) -> TomlDocument:
+
+def find_pyproject_toml(file_path: Path) -> Path | None:
     """
-    Find the "pyproject.toml" and return it.
+    Go back down the directory tree to find the "pyproject.toml" file.
+
+    The result is cached for all visited directories, so finding the "pyproject.toml"
+    for many files of the same project needs only one walk.
+    Only found files are cached and a cached file is checked if it still exists.
+    A new "pyproject.toml" in a sub directory needs a clear_pyproject_toml_cache() call.
+    """
+    file_path = file_path.absolute()
+    directory = file_path.parent if file_path.is_file() else file_path
+
+    visited = []
+    for path in (directory, *directory.parents):
+        if (pyproject_toml := _PYPROJECT_TOML_PATHS.get(path)) and pyproject_toml.is_file():
+            break
+        visited.append(path)
+        pyproject_toml = path / 'pyproject.toml'
+        if pyproject_toml.is_file():
+            break
+    else:
+        return None
+
+    for path in visited:
+        _PYPROJECT_TOML_PATHS[path] = pyproject_toml
+    return pyproject_toml
+
+
+def get_pyproject_toml_path(*, file_path: Path | None = None) -> Path:
+    """
+    Find the "pyproject.toml" and return the path to it.
     """
     if not file_path:
         file_path = Path.cwd()
@@ -73,6 +129,14 @@ def get_pyproject_toml(*, file_path: Path | None = None) -> TomlDocument:
         raise NoPyProjectTomlFound(f'Can not find "pyproject.toml" in {file_path}')
 
     assert_is_file(pyproject_toml_path)
+    return pyproject_toml_path
+
+
+def get_pyproject_toml(*, file_path: Path | None = None) -> TomlDocument:
+    """
+    Find the "pyproject.toml" and return it.
+    """
+    pyproject_toml_path = get_pyproject_toml_path(file_path=file_path)
     toml_document: TomlDocument = get_toml_document(pyproject_toml_path)
     return toml_document
 
@@ -88,20 +152,33 @@ class PyProjectToml:
 
         if self.path.exists():
             logger.debug('Read existing pyproject.toml')
-            self.doc: TOMLDocument = tomlkit.parse(self.path.read_text(encoding='UTF-8'))
         else:
             logger.debug('Create new pyproject.toml')
-            self.doc: TOMLDocument = tomlkit.document()  # type: ignore
-            self.doc.add(tomlkit.comment('Created by manageprojects'))
 
-        self.mp_table: Table = self.doc.get('manageprojects')  # type: ignore
-        if not self.mp_table:
+    @functools.cached_property
+    def doc(self) -> TOMLDocument:
+        """
+        The tomlkit document for changes. Parsed on first access, because tomlkit is slow
+        and only needed, if the "pyproject.toml" will be written.
+        """
+        if self.path.exists():
+            doc: TOMLDocument = tomlkit.parse(self.path.read_text(encoding='UTF-8'))
+        else:
+            doc = tomlkit.document()
+            doc.add(tomlkit.comment('Created by manageprojects'))
+
+        if not doc.get('manageprojects'):
             # Insert: [manageprojects]
             if self.path.exists():
-                self.doc.add(tomlkit.ws('\n\n'))  # Add a new empty line
-            self.mp_table = tomlkit.table()
-            self.mp_table.comment('https://github.com/jedie/manageprojects')
-            self.doc.append('manageprojects', self.mp_table)
+                doc.add(tomlkit.ws('\n\n'))  # Add a new empty line
+            mp_table = tomlkit.table()
+            mp_table.comment('https://github.com/jedie/manageprojects')
+            doc.append('manageprojects', mp_table)
+        return doc
+
+    @property
+    def mp_table(self) -> Table:
+        return self.doc['manageprojects']  # type: ignore
 
     def init(self, revision, dt: datetime.datetime, template: str, directory: str | None) -> None:
         assert INITIAL_REVISION not in self.mp_table
@@ -130,12 +207,21 @@ class PyProjectToml:
 
     def save(self) -> None:
         content = self.dumps()
+        created = not self.path.exists()
         self.path.write_text(content, encoding='UTF-8')
+        if created:
+            clear_pyproject_toml_cache(self.path.parent)
 
     ###############################################################################################
 
     def get_mp_meta(self) -> ManageProjectsMeta:
-        data = self.mp_table.unwrap()  # change tomlkit.Container to a normal dict
+        if 'doc' in self.__dict__:
+            # Use the (maybe changed) tomlkit document:
+            data = self.mp_table.unwrap()  # change tomlkit.Container to a normal dict
+        elif self.path.exists():
+            data = load_toml(self.path).get('manageprojects', {})
+        else:
+            data = {}
         result: ManageProjectsMeta = log_func_call(
             logger=logger,
             func=ManageProjectsMeta,
@@ -0,0 +1,179 @@
+"""
+    On-disk cache of rendered cookiecutter templates.
+
+    A rendered tree depends only on the template revision, the template directory
+    and the used context. So the same render can be reused, e.g.: if many projects
+    are updated from the same template.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import tempfile
+import time
+from pathlib import Path
+
+import cookiecutter
+from cli_base.cli_tools.git import Git, NoGitRepoError
+
+from manageprojects.utilities.file_copy import CopyStats, copy_tree
+from manageprojects.utilities.user_config import get_mp_cache_path
+
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_MAX_SIZE = 512 * 1024 * 1024  # Max. size of all cached renders in bytes
+INFO_FILE_NAME = 'info.json'
+TREE_DIR_NAME = 'tree'
+
+
+def get_render_cache_path() -> Path:
+    render_cache_path = get_mp_cache_path() / 'render'
+    render_cache_path.mkdir(exist_ok=True)
+    return render_cache_path
+
+
+def get_tree_size(path: Path) -> int:
+    return sum(item.stat().st_size for item in path.rglob('*') if item.is_file())
+
+
+def link_tree(src: Path, dst: Path) -> None:
+    """
+    Materialize a cached tree by reflinks or hardlinks. Fallback to a plain copy, e.g. on cross-device errors.
+    """
+    stats = CopyStats()
+    copy_tree(src, dst, hardlink=True, metadata=True, stats=stats, dirs_exist_ok=False)
+    logger.info('Materialize %s: %s', dst, stats)
+
+
+def make_read_only(path: Path) -> None:
+    """
+    Remove the write permissions of all files, because cached files may be hardlinked.
+    """
+    for item in path.rglob('*'):
+        if item.is_file() and not item.is_symlink():
+            mode = item.stat().st_mode
+            item.chmod(mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered cookiecutter templates with size-bounded LRU eviction.
+    """
+
+    def __init__(self, cache_path: Path | None = None, max_size: int = RENDER_CACHE_MAX_SIZE):
+        self.cache_path = cache_path or get_render_cache_path()
+        self.max_size = max_size
+
+    def get_key(self, *, repo_path: Path, extra_context: dict | None) -> str | None:
+        """
+        Build the cache key from the template repository revision, template directory and the normalized context.
+        The template url/path is not part of the key: The git revision identifies the content,
+        so all clones of the same template share the cache entries.
+        Returns None if the template can't be cached, e.g.: no git repository or uncommitted changes.
+        """
+        try:
+            git = Git(cwd=repo_path, detect_root=True)
+        except NoGitRepoError:
+            logger.info('Template %s is not a git repository: Render cache not used', repo_path)
+            return None
+
+        if git.status(verbose=False):
+            logger.info('Template repository %s is not clean: Render cache not used', git.cwd)
+            return None
+
+        revision = git.git_verbose_check_output('rev-parse', 'HEAD', verbose=False).strip()
+        try:
+            normalized = json.dumps(
+                {
+                    'revision': revision,
+                    'directory': repo_path.resolve().relative_to(git.cwd.resolve()).as_posix(),
+                    'extra_context': extra_context or {},
+                    'cookiecutter': cookiecutter.__version__,
+                },
+                sort_keys=True,
+            )
+        except TypeError as err:
+            logger.info('Context is not serializable (%s): Render cache not used', err)
+            return None
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    def get(self, *, key: str, output_dir: Path) -> tuple[dict, Path] | None:
+        """
+        Materialize a cached render into `output_dir`.
+        Returns the cookiecutter context and the destination path, or None on a cache miss.
+        """
+        entry_path = self.cache_path / key
+        info_path = entry_path / INFO_FILE_NAME
+        try:
+            info = json.loads(info_path.read_text())
+        except FileNotFoundError:
+            logger.info('Render cache miss: %s', key)
+            return None
+
+        destination_path = output_dir / info['destination_name']
+        output_dir.mkdir(parents=True, exist_ok=True)
+        link_tree(src=entry_path / TREE_DIR_NAME, dst=destination_path)
+
+        os.utime(info_path)  # Mark as recently used for the LRU eviction
+        logger.info('Render cache hit: %s -> %s', key, destination_path)
+        return info['context'], destination_path
+
+    def store(self, *, key: str, context: dict, destination_path: Path) -> None:
+        """
+        Store a rendered tree in the cache and evict old entries, if the cache is too big.
+        """
+        try:
+            context_json = json.dumps(context)
+        except TypeError as err:
+            logger.info('Context is not serializable (%s): Render not cached', err)
+            return
+
+        entry_path = self.cache_path / key
+        if entry_path.exists():
+            return
+
+        # Build the entry in a temp directory and rename it, so that concurrent runs never see half written entries:
+        temp_entry_path = Path(tempfile.mkdtemp(prefix=f'.{key}_', dir=self.cache_path))
+        copy_tree(destination_path, temp_entry_path / TREE_DIR_NAME, symlinks=True)
+        make_read_only(temp_entry_path / TREE_DIR_NAME)
+        info = {
+            'destination_name': destination_path.name,
+            'context': json.loads(context_json),
+            'size': get_tree_size(temp_entry_path / TREE_DIR_NAME),
+            'created': time.time(),
+        }
+        Path(temp_entry_path, INFO_FILE_NAME).write_text(json.dumps(info, indent=4))
+        try:
+            temp_entry_path.rename(entry_path)
+        except OSError:
+            # Stored by a concurrent run in the meantime
+            shutil.rmtree(temp_entry_path)
+        else:
+            logger.info('Render cached: %s (%i bytes)', key, info['size'])
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache size is below `max_size`.
+        """
+        entries = []
+        for info_path in self.cache_path.glob(f'*/{INFO_FILE_NAME}'):
+            try:
+                info = json.loads(info_path.read_text())
+                last_used = info_path.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            entries.append((last_used, info['size'], info_path.parent))
+
+        total_size = sum(size for _last_used, size, _entry_path in entries)
+        for _last_used, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            logger.info('Evict render cache entry: %s (%i bytes)', entry_path.name, size)
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= size
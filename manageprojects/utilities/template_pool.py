@@ -0,0 +1,192 @@
+"""
+    Pool of cookiecutter template repositories.
+
+    Keeps one bare mirror per template url and materialize every needed revision
+    as a separate snapshot (a "git clone --shared" with a detached HEAD).
+    So a checkout never resets a shared working copy and several revisions
+    can be rendered at the same time.
+    Snapshots that are not used for SNAPSHOT_MAX_AGE are removed, the mirrors keep the objects.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+from cli_base.cli_tools.git import Git
+
+
+logger = logging.getLogger(__name__)
+
+POOL_DIR_NAME = '.manageprojects_pool'  # Directory name in the cookiecutter "cookiecutters_dir"
+MIRRORS_DIR_NAME = 'mirrors'
+SNAPSHOTS_DIR_NAME = 'snapshots'
+SNAPSHOT_MAX_AGE = 30 * 24 * 60 * 60  # Remove snapshots that are not used for 30 days (in seconds)
+
+FULL_HASH_RE = re.compile(r'^[0-9a-f]{40}$')
+
+
+def get_repo_key(source: str) -> str:
+    """
+    A readable and unique directory name for a repository url or path.
+
+    >>> get_repo_key('https://github.com/jedie/cookiecutter_templates/')
+    'cookiecutter_templates_9a067373d5'
+    >>> get_repo_key('git@github.com:jedie/mp_test_template1.git')
+    'mp_test_template1_71f92f2eb5'
+    """
+    name = re.split(r'[/:]', source.rstrip('/'))[-1].removesuffix('.git')
+    name = re.sub(r'[^\w.-]', '_', name) or 'repo'
+    url_hash = hashlib.sha256(source.encode()).hexdigest()[:10]
+    return f'{name}_{url_hash}'
+
+
+@contextlib.contextmanager
+def locked(lock_path: Path) -> Generator[None, None, None]:
+    """
+    Exclusive inter-process lock, e.g.: for all changes on a mirror repository.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open('w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def resolve_commit(git: Git, revision: str) -> str | None:
+    """
+    Returns the full commit hash of `revision` or None if the revision is unknown.
+    """
+    try:
+        output = git.git_verbose_check_output(
+            'rev-parse', '--verify', '--quiet', f'{revision}^{{commit}}', verbose=False, print_output_on_error=False
+        )
+    except subprocess.CalledProcessError:
+        return None
+    return output.strip()
+
+
+class TemplateRepoPool:
+    """
+    Bare mirrors of template repositories and snapshots of the used revisions.
+    """
+
+    def __init__(self, pool_path: Path):
+        self.pool_path = pool_path
+        self.mirrors_path = pool_path / MIRRORS_DIR_NAME
+        self.snapshots_path = pool_path / SNAPSHOTS_DIR_NAME
+
+    def get_mirror(self, *, url: str, revision: str | None) -> tuple[Path, str]:
+        """
+        Create or update the bare mirror of `url`. Fetch only if `revision` is a moving reference
+        (or None for the default branch) or if the revision is missing in the mirror.
+        Returns the mirror path and the full commit hash of the revision.
+        """
+        key = get_repo_key(url)
+        mirror_path = self.mirrors_path / f'{key}.git'
+        with locked(self.mirrors_path / f'{key}.lock'):
+            if not mirror_path.exists():
+                logger.info('Create mirror of %s in %s', url, mirror_path)
+                Git(cwd=self.mirrors_path, detect_root=False).git_verbose_check_output(
+                    'clone', '--quiet', '--mirror', url, mirror_path, verbose=False
+                )
+                git = Git(cwd=mirror_path, detect_root=False)
+                # Never remove objects, because snapshots share them via "alternates":
+                git.git_verbose_check_output('config', 'gc.auto', '0', verbose=False)
+                fetched = True
+            else:
+                git = Git(cwd=mirror_path, detect_root=False)
+                fetched = False
+
+            commit = resolve_commit(git, revision or 'HEAD')
+            if not fetched and (commit is None or revision is None or not commit.startswith(revision)):
+                logger.info('Fetch %s into %s', url, mirror_path)
+                git.git_verbose_check_output('fetch', '--quiet', '--prune', 'origin', verbose=False)
+                commit = resolve_commit(git, revision or 'HEAD')
+
+        if commit is None:
+            raise KeyError(f'Revision {revision!r} not found in {url}')
+        return mirror_path, commit
+
+    def get_snapshot(self, *, source: Path, key: str, commit: str) -> Path:
+        """
+        Materialize `commit` of the git repository `source` as a snapshot.
+        Created in a temp directory and renamed, so concurrent runs never see a half created snapshot.
+        The modification time of the snapshot directory is the time of the last usage.
+        """
+        assert FULL_HASH_RE.match(commit), f'No full commit hash: {commit!r}'
+        snapshot_path = self.snapshots_path / key / commit
+        if snapshot_path.is_dir():
+            logger.info('Use existing snapshot: %s', snapshot_path)
+            os.utime(snapshot_path)
+            return snapshot_path
+
+        self.prune_snapshots()
+
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = Path(tempfile.mkdtemp(prefix=f'.{commit}_', dir=snapshot_path.parent))
+        try:
+            Git(cwd=snapshot_path.parent, detect_root=False).git_verbose_check_output(
+                'clone', '--quiet', '--shared', '--no-checkout', source, temp_path, verbose=False
+            )
+            Git(cwd=temp_path, detect_root=False).git_verbose_check_output(
+                'checkout', '--quiet', '--detach', commit, verbose=False
+            )
+            temp_path.rename(snapshot_path)
+        except OSError:
+            # Created by a concurrent run in the meantime
+            shutil.rmtree(temp_path)
+        except BaseException:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            raise
+        else:
+            logger.info('Snapshot of %s at %s created: %s', source, commit, snapshot_path)
+        return snapshot_path
+
+    def prune_snapshots(self, max_age: float = SNAPSHOT_MAX_AGE) -> int:
+        """
+        Remove all snapshots that are not used for `max_age` seconds. Returns the number of removed snapshots.
+        """
+        deadline = time.time() - max_age
+        count = 0
+        for snapshot_path in self.snapshots_path.glob('*/*'):
+            if not snapshot_path.is_dir() or snapshot_path.stat().st_mtime >= deadline:
+                continue
+            # Rename first, so concurrent runs never use a half removed snapshot:
+            trash_path = snapshot_path.with_name(f'.{snapshot_path.name}_{os.getpid()}_removed')
+            try:
+                snapshot_path.rename(trash_path)
+            except OSError:
+                continue  # Removed by a concurrent run in the meantime
+            logger.info('Remove unused snapshot: %s', snapshot_path)
+            shutil.rmtree(trash_path, ignore_errors=True)
+            count += 1
+        return count
+
+    def checkout_url(self, *, url: str, revision: str | None) -> Path:
+        """
+        Returns a snapshot of the template repository `url` in the given `revision` (None == default branch).
+        """
+        mirror_path, commit = self.get_mirror(url=url, revision=revision)
+        return self.get_snapshot(source=mirror_path, key=get_repo_key(url), commit=commit)
+
+    def checkout_local(self, *, git: Git, revision: str) -> Path:
+        """
+        Returns a snapshot of the local template repository in the given `revision`,
+        without touching the working copy of the local repository.
+        """
+        commit = resolve_commit(git, revision)
+        if commit is None:
+            raise KeyError(f'Revision {revision!r} not found in {git.cwd}')
+        key = get_repo_key(str(git.cwd.resolve()))
+        return self.get_snapshot(source=git.cwd, key=key, commit=commit)
@@ -0,0 +1,313 @@
+"""
+    Create a git compatible patch between two directory trees,
+    without creating a temporary git repository.
+"""
+
+import dataclasses
+import difflib
+import hashlib
+import logging
+import os
+import stat
+from collections import defaultdict
+from pathlib import Path
+
+from bx_py_utils.path import assert_is_dir
+
+from manageprojects.utilities.profiling import phase
+
+
+logger = logging.getLogger(__name__)
+
+NULL_HASH = '0000000'
+ABBREV_LENGTH = 7
+CONTEXT_LINES = 3  # Same as git default: --unified=3
+BINARY_SNIFF_SIZE = 8000  # Same as git: Only check the first bytes for NUL
+FUNCNAME_MAX_LENGTH = 80  # Same as git: Max. length of the function name in the hunk header
+
+
+@dataclasses.dataclass
+class TreeFile:
+    """
+    Information about one file in a directory tree
+    """
+
+    path: str  # Relative POSIX path
+    abs_path: Path
+    mode: str  # git file mode, e.g.: '100644'
+    blob_hash: str  # git blob hash, e.g.: 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+
+    @property
+    def short_hash(self) -> str:
+        return self.blob_hash[:ABBREV_LENGTH]
+
+    def read_bytes(self) -> bytes:
+        return self.abs_path.read_bytes()
+
+
+def git_blob_hash(content: bytes) -> str:
+    """
+    Calculate the same hash as `git hash-object`
+
+    >>> git_blob_hash(b'')
+    'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+    >>> git_blob_hash(b'Rev 1')[:7]
+    '4ec526a'
+    """
+    header = f'blob {len(content)}\0'.encode('ascii')
+    return hashlib.sha1(header + content, usedforsecurity=False).hexdigest()
+
+
+def git_file_mode(st_mode: int) -> str:
+    if st_mode & stat.S_IXUSR:
+        return '100755'
+    return '100644'
+
+
+def scan_tree(root: Path, ignore_names=('.git',)) -> dict[str, TreeFile]:
+    """
+    Collect all files (with there git blob hash) from the given directory tree.
+    Empty directories are ignored, just like git does.
+    """
+    assert_is_dir(root)
+    result = {}
+    for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+        dirnames[:] = [name for name in dirnames if name not in ignore_names]
+        for filename in filenames:
+            if filename in ignore_names:
+                continue
+            abs_path = Path(dirpath, filename)
+            rel_path = abs_path.relative_to(root).as_posix()
+            result[rel_path] = TreeFile(
+                path=rel_path,
+                abs_path=abs_path,
+                mode=git_file_mode(abs_path.stat().st_mode),
+                blob_hash=git_blob_hash(abs_path.read_bytes()),
+            )
+    logger.debug('%i files found in %s', len(result), root)
+    return result
+
+
+def is_binary(content: bytes) -> bool:
+    return b'\0' in content[:BINARY_SNIFF_SIZE]
+
+
+def split_lines(content: bytes) -> list[bytes]:
+    r"""
+    Split only on "\n" (like git) and keep the line endings.
+
+    >>> split_lines(b'a\r\nb\nc')
+    [b'a\r\n', b'b\n', b'c']
+    >>> split_lines(b'')
+    []
+    """
+    lines = content.split(b'\n')
+    last_line = lines.pop()
+    lines = [line + b'\n' for line in lines]
+    if last_line:
+        lines.append(last_line)
+    return lines
+
+
+def get_funcname(lines: list[bytes], before: int) -> str:
+    r"""
+    Search backwards for a "function" line, like the git default funcname pattern:
+    A line that starts with a alphabetic char, underscore or dollar sign.
+
+    >>> get_funcname([b'def foo():\n', b'    pass\n', b'    x = 1\n'], before=2)
+    'def foo():'
+    >>> get_funcname([b'    pass\n'], before=1)
+    ''
+    """
+    for index in range(before - 1, -1, -1):
+        line = lines[index]
+        first_char = line[:1]
+        if first_char.isalpha() or first_char in (b'_', b'$'):
+            line = line[:FUNCNAME_MAX_LENGTH].rstrip()
+            return line.decode('utf-8', errors='replace')
+    return ''
+
+
+def format_range(start: int, count: int) -> str:
+    """
+    Format a hunk range, like git does.
+
+    >>> format_range(0, 1)
+    '1'
+    >>> format_range(0, 0)
+    '0,0'
+    >>> format_range(9, 3)
+    '10,3'
+    """
+    if count == 1:
+        return f'{start + 1}'
+    if count == 0:
+        return f'{start},0'
+    return f'{start + 1},{count}'
+
+
+def unified_diff_hunks(old_lines: list[bytes], new_lines: list[bytes]) -> list[bytes]:
+    """
+    Create the unified diff hunks between two lists of lines.
+    Contains "No newline at end of file" markers like git.
+    """
+    output = []
+
+    def add_line(prefix: bytes, line: bytes):
+        if line.endswith(b'\n'):
+            output.append(prefix + line)
+        else:
+            output.append(prefix + line + b'\n')
+            output.append(b'\\ No newline at end of file\n')
+
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for group in matcher.get_grouped_opcodes(n=CONTEXT_LINES):
+        old_start, old_end = group[0][1], group[-1][2]
+        new_start, new_end = group[0][3], group[-1][4]
+
+        old_range = format_range(old_start, old_end - old_start)
+        new_range = format_range(new_start, new_end - new_start)
+        header = f'@@ -{old_range} +{new_range} @@'
+        if funcname := get_funcname(old_lines, before=old_start):
+            header += f' {funcname}'
+        output.append(header.encode() + b'\n')
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in old_lines[i1:i2]:
+                    add_line(b' ', line)
+                continue
+            for line in old_lines[i1:i2]:
+                add_line(b'-', line)
+            for line in new_lines[j1:j2]:
+                add_line(b'+', line)
+    return output
+
+
+def content_diff(*, old_path: str, new_path: str, old_content: bytes, new_content: bytes) -> list[bytes]:
+    if is_binary(old_content) or is_binary(new_content):
+        return [f'Binary files {old_path} and {new_path} differ\n'.encode()]
+
+    hunks = unified_diff_hunks(split_lines(old_content), split_lines(new_content))
+    if not hunks:
+        return []
+    return [
+        f'--- {old_path}\n'.encode(),
+        f'+++ {new_path}\n'.encode(),
+        *hunks,
+    ]
+
+
+def find_renames(deleted: dict[str, TreeFile], added: dict[str, TreeFile]) -> dict[str, TreeFile]:
+    """
+    Pair deleted and added files with the same content as "exact renames".
+    Prefer a candidate with the same file name (like git does) and then the same file mode.
+    Returns a mapping: new path -> old file
+    """
+    deleted_by_hash = defaultdict(list)
+    for old_path in sorted(deleted):
+        old_file = deleted[old_path]
+        deleted_by_hash[old_file.blob_hash].append(old_file)
+
+    renames = {}
+    for new_path in sorted(added):
+        new_file = added[new_path]
+        candidates = deleted_by_hash.get(new_file.blob_hash)
+        if not candidates:
+            continue
+        new_name = new_path.rsplit('/', 1)[-1]
+        scores = [
+            (old_file.path.rsplit('/', 1)[-1] == new_name, old_file.mode == new_file.mode) for old_file in candidates
+        ]
+        best_index = scores.index(max(scores))  # The first one wins, if scores are equal
+        renames[new_path] = candidates.pop(best_index)
+    return renames
+
+
+@phase('tree diff')
+def make_tree_diff(from_path: Path, to_path: Path) -> str | None:
+    """
+    Create a git-apply compatible patch between two directory trees.
+
+    Produces the same output as `git diff --no-indent-heuristic --irreversible-delete`
+    between two commits with the "from" and "to" content. Supports new, deleted, exact renamed,
+    binary and mode changed files. Only the text diff hunks may differ, because difflib
+    is used instead of the git Myers algorithm.
+    """
+    from_files = scan_tree(from_path)
+    to_files = scan_tree(to_path)
+
+    deleted = {path: file for path, file in from_files.items() if path not in to_files}
+    added = {path: file for path, file in to_files.items() if path not in from_files}
+    renames = find_renames(deleted, added)
+    renamed_sources = {old_file.path for old_file in renames.values()}
+
+    # git sorts by the destination path of a file pair:
+    pairs: list[tuple[str, TreeFile | None, TreeFile | None]] = []
+    for path, old_file in from_files.items():
+        if path in to_files:
+            pairs.append((path, old_file, to_files[path]))
+        elif path not in renamed_sources:
+            pairs.append((path, old_file, None))
+    for path, new_file in added.items():
+        pairs.append((path, renames.get(path), new_file))
+    pairs.sort(key=lambda pair: pair[0].encode())
+
+    output = []
+
+    def add_header(*lines: str):
+        output.extend(f'{line}\n'.encode() for line in lines)
+
+    for _sort_key, old_file, new_file in pairs:
+        if new_file is None:
+            # Deleted file -> like "git diff --irreversible-delete" without the content:
+            add_header(
+                f'diff --git a/{old_file.path} b/{old_file.path}',
+                f'deleted file mode {old_file.mode}',
+                f'index {old_file.short_hash}..{NULL_HASH}',
+            )
+            continue
+
+        if old_file is None:
+            # New file:
+            add_header(
+                f'diff --git a/{new_file.path} b/{new_file.path}',
+                f'new file mode {new_file.mode}',
+                f'index {NULL_HASH}..{new_file.short_hash}',
+            )
+            output += content_diff(
+                old_path='/dev/null',
+                new_path=f'b/{new_file.path}',
+                old_content=b'',
+                new_content=new_file.read_bytes(),
+            )
+            continue
+
+        content_changed = old_file.blob_hash != new_file.blob_hash
+        mode_changed = old_file.mode != new_file.mode
+        renamed = old_file.path != new_file.path
+        if not (content_changed or mode_changed or renamed):
+            continue
+
+        add_header(f'diff --git a/{old_file.path} b/{new_file.path}')
+        if mode_changed:
+            add_header(f'old mode {old_file.mode}', f'new mode {new_file.mode}')
+        if renamed:
+            # Only exact renames are detected, so the content is always the same:
+            add_header('similarity index 100%', f'rename from {old_file.path}', f'rename to {new_file.path}')
+
+        if content_changed:
+            index_line = f'index {old_file.short_hash}..{new_file.short_hash}'
+            if not mode_changed:
+                index_line += f' {new_file.mode}'
+            add_header(index_line)
+            output += content_diff(
+                old_path=f'a/{old_file.path}',
+                new_path=f'b/{new_file.path}',
+                old_content=old_file.read_bytes(),
+                new_content=new_file.read_bytes(),
+            )
+
+    if not output:
+        return None
+    return b''.join(output).decode(errors='replace')